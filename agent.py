@@ -0,0 +1,391 @@
+"""
+agent.py - Per-host fleet agent and the aggregator that merges agents into one view
+
+An agent runs on every machine that hosts clients. It discovers and polls the
+clients on its own ports with the same code the Bot Manager uses (monitor
+central_scan, PollScheduler, RequestBudget) and serves two things over HTTP:
+
+  GET  /fleet?since=SEQ&epoch=ID&wait=S
+      Long poll for status changes. Blocks until something changed after
+      SEQ (or S seconds pass) and returns only the clients whose status
+      changed plus the ports that went away. A client whose epoch differs
+      (the agent restarted) gets a full snapshot.
+
+  GET|POST /clients/<port>/<path>
+      Relays one request to a local client, so the GUI can fetch plugins
+      and logs and send commands to remote clients through monitor's usual
+      http_get / http_post (see monitor.RemotePort).
+
+If a token is configured, every request must carry it as X-Agent-Token.
+The agent listens on 127.0.0.1 unless told otherwise, and refuses to bind
+any other address without a token.
+
+The Aggregator runs in the GUI: one long-poll thread per configured host,
+merging every agent's clients under monitor.RemotePort keys.
+
+Usage:
+  python agent.py [--label NAME] [--bind 127.0.0.1] [--port 7300]
+                  [--ports 7070-7199] [--token SECRET]
+  BabyTankSwitcher.exe --agent [same options]
+
+Several agents can share one machine for testing, each with its own --port
+and --ports range.
+"""
+import argparse
+import hmac
+import http.client
+import ipaddress
+import json
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import monitor as mon
+import perf
+
+AGENT_PORT = 7300
+MAX_BODY = 64 * 1024    # client commands are small JSON objects
+
+# Fields left out of change detection — uptime ticks every second
+_VOLATILE = ("uptimeSeconds",)
+
+
+# ── Agent ──────────────────────────────────────────────────────────────────────
+
+class Agent:
+    """Polls the local clients on ``ports`` and keeps a sequence-numbered change log."""
+    TICK_S = 1.0
+    SCAN_S = 3.0        # ports with no live client are probed this often
+    MAX_WAIT_S = 25.0
+
+    def __init__(self, ports, label: str = "", token: str = ""):
+        self.ports = list(ports)
+        self.label = label or socket.gethostname()
+        self.token = token
+        self.epoch = uuid.uuid4().hex[:12]
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._clients = {}      # port -> {"status", "at", "seq"}
+        self._gone = {}         # port -> seq at which it went away
+        self._stop = threading.Event()
+        self._tick = 0
+
+    def poll(self):
+        """One pass: due live clients within the request budget, plus a discovery sweep every SCAN_S."""
+        discover = self._tick % max(1, int(self.SCAN_S / self.TICK_S)) == 0
+        self._tick += 1
+        with self._cond:
+            live = list(self._clients)
+        ports = []
+        for p in mon.poller.due(live):
+            if not mon.budget.take():
+                break
+            ports.append(p)
+        if discover:
+            ports += [p for p in self.ports if p not in self._clients]
+        if not ports:
+            return
+        scan = mon.central_scan(ports, detail=lambda st: False)
+        now = time.time()
+        with self._cond:
+            changed = False
+            for port in ports:
+                data = scan.get(port)
+                if data is None:
+                    if self._clients.pop(port, None) is not None:
+                        mon.poller.forget(port)
+                        self._seq += 1
+                        self._gone[port] = self._seq
+                        changed = True
+                    continue
+                st = data["status"]
+                mon.poller.observe(port, st)
+                cur = self._clients.get(port)
+                if cur is None or _strip(cur["status"]) != _strip(st):
+                    self._seq += 1
+                    self._clients[port] = {"status": st, "at": now, "seq": self._seq}
+                    self._gone.pop(port, None)
+                    changed = True
+                else:
+                    cur["status"], cur["at"] = st, now
+            if changed:
+                self._cond.notify_all()
+
+    def delta(self, since: int, epoch: str = "", wait: float = 0.0) -> dict:
+        """Changes after ``since``; waits up to ``wait`` seconds for one if there are none yet."""
+        wait = min(max(0.0, wait), self.MAX_WAIT_S)
+        with self._cond:
+            full = epoch != self.epoch or since > self._seq
+            if not full and wait:
+                self._cond.wait_for(lambda: self._seq > since or self._stop.is_set(), wait)
+            now = time.time()
+            clients = {str(p): dict(c["status"], uptimeSeconds=c["status"].get("uptimeSeconds", 0) + int(now - c["at"]))
+                       for p, c in self._clients.items() if full or c["seq"] > since}
+            gone = [] if full else [p for p, s in self._gone.items() if s > since]
+            return {"host": self.label, "epoch": self.epoch, "seq": self._seq, "full": full,
+                    "clients": clients, "gone": gone}
+
+    def run(self):
+        while not self._stop.is_set():
+            t0 = time.monotonic()
+            try:
+                self.poll()
+            except Exception:
+                perf.count("agent.poll_error")
+            self._stop.wait(max(0.0, self.TICK_S - (time.monotonic() - t0)))
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+
+def _strip(status: dict) -> dict:
+    return {k: v for k, v in status.items() if k not in _VOLATILE}
+
+
+def _make_handler(agent: Agent):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body: bytes, ctype="application/json"):
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, code, msg):
+            self._send(code, json.dumps({"error": msg}).encode())
+
+        def _route(self, method):
+            if agent.token and not hmac.compare_digest(self.headers.get("X-Agent-Token", "").encode(),
+                                                       agent.token.encode()):
+                self.close_connection = True    # the body, if any, is left unread
+                return self._error(403, "bad agent token")
+            try:
+                n = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                n = -1
+            if not 0 <= n <= MAX_BODY:
+                self.close_connection = True
+                return self._error(413, f"body must be 0-{MAX_BODY} bytes")
+            raw = self.rfile.read(n) if n else b""
+            url = urlsplit(self.path)
+            if method == "GET" and url.path == "/fleet":
+                q = {k: v[0] for k, v in parse_qs(url.query).items()}
+                try:
+                    d = agent.delta(int(q.get("since", 0)), q.get("epoch", ""), float(q.get("wait", 0)))
+                except ValueError:
+                    return self._error(400, "bad query")
+                return self._send(200, json.dumps(d).encode())
+            parts = url.path.split("/", 3)      # "", "clients", "<port>", "<path>"
+            if len(parts) < 3 or parts[1] != "clients" or not parts[2].isdigit():
+                return self._error(404, "not found")
+            port = int(parts[2])
+            if port not in agent.ports:
+                return self._error(404, f"port {port} is not served by this agent")
+            body = None
+            if method == "POST":
+                mon.poller.boost(port)
+                try:
+                    body = json.loads(raw or b"{}")
+                except ValueError:
+                    return self._error(400, "bad body")
+            res = mon.http_raw(port, method, "/" + (parts[3] if len(parts) > 3 else ""), body)
+            if res is None:
+                return self._error(502, f"client on port {port} is not answering")
+            self._send(res[0], res[1])
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_POST(self):
+            self._route("POST")
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def is_loopback(bind: str) -> bool:
+    if bind == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(bind).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(agent: Agent, bind: str = "127.0.0.1", port: int = AGENT_PORT) -> ThreadingHTTPServer:
+    """Start ``agent``'s poll loop and HTTP server on daemon threads; returns the server."""
+    srv = _Server((bind, port), _make_handler(agent))
+    threading.Thread(target=agent.run, name="agent-poll", daemon=True).start()
+    threading.Thread(target=srv.serve_forever, args=(0.2,), name="agent-http", daemon=True).start()
+    return srv
+
+
+# ── Aggregator ─────────────────────────────────────────────────────────────────
+
+def parse_hosts(text: str) -> list:
+    """
+    "box2=192.168.1.20:7300, 10.0.0.5" -> [("box2", "192.168.1.20:7300"),
+    ("10.0.0.5", "10.0.0.5:7300")]. Raises ValueError on malformed input.
+    """
+    out = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        label, _, addr = part.rpartition("=")
+        host, _, port = addr.strip().partition(":")
+        if not host or (port and not port.isdigit()):
+            raise ValueError(f"Bad host '{part}' — expected name=address:port")
+        out.append((label.strip() or host, f"{host}:{port or AGENT_PORT}"))
+    labels = [l for l, _ in out]
+    if len(set(labels)) != len(labels):
+        raise ValueError("Host names must be unique")
+    return out
+
+
+class _HostLink:
+    """Long-polls one agent and keeps its clients."""
+    RETRY_S = 5.0
+
+    def __init__(self, label: str, addr: str, token: str, wait: float):
+        self.label, self.addr, self.token, self.wait = label, addr, token, wait
+        self.clients = {}       # RemotePort -> (status, received at)
+        self.online = False
+        self.error = ""
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, name=f"agent-link-{label}", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        host, _, port = self.addr.rpartition(":")
+        seq, epoch, conn = 0, "", None
+        while not self._stop.is_set():
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection(host, int(port), timeout=self.wait + 5)
+                conn.request("GET", f"/fleet?since={seq}&epoch={epoch}&wait={self.wait:g}",
+                             headers={"X-Agent-Token": self.token})
+                r = conn.getresponse()
+                raw = r.read()
+                if r.status != 200:
+                    raise OSError(json.loads(raw or b"{}").get("error", f"HTTP {r.status}"))
+                d = json.loads(raw)
+            except Exception as e:
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                with self.lock:
+                    self.online, self.error = False, str(e) or type(e).__name__
+                    self.clients.clear()
+                seq, epoch = 0, ""
+                self._stop.wait(self.RETRY_S)
+                continue
+            now = time.time()
+            perf.count("agent.delta_clients", len(d["clients"]))
+            with self.lock:
+                if d["full"]:
+                    self.clients.clear()
+                for p, st in d["clients"].items():
+                    self.clients[mon.RemotePort(self.label, self.addr, int(p))] = (st, now)
+                for p in d["gone"]:
+                    self.clients.pop(mon.RemotePort(self.label, self.addr, int(p)), None)
+                self.online, self.error = True, ""
+            seq, epoch = d["seq"], d["epoch"]
+        if conn is not None:
+            conn.close()
+
+
+class Aggregator:
+    """Every configured agent's clients, keyed by monitor.RemotePort."""
+    WAIT_S = 20.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._links = {}        # label -> _HostLink
+
+    def configure(self, hosts, token: str = ""):
+        """``hosts`` is parse_hosts() output; links whose settings did not change are kept."""
+        mon.AGENT_TOKEN = token
+        want = {label: addr for label, addr in hosts}
+        with self._lock:
+            for label, link in list(self._links.items()):
+                if want.get(label) != link.addr or link.token != token:
+                    link.stop()
+                    del self._links[label]
+            for label, addr in want.items():
+                if label not in self._links:
+                    self._links[label] = _HostLink(label, addr, token, self.WAIT_S)
+
+    def stop(self):
+        self.configure([])
+
+    def clients(self) -> dict:
+        """RemotePort -> latest /status, uptime brought forward to now."""
+        now, out = time.time(), {}
+        with self._lock:
+            links = list(self._links.values())
+        for link in links:
+            with link.lock:
+                items = list(link.clients.items())
+            for rp, (st, at) in items:
+                out[rp] = dict(st, uptimeSeconds=st.get("uptimeSeconds", 0) + int(now - at))
+        return out
+
+    def hosts(self) -> dict:
+        """label -> {"address", "online", "clients", "error"}."""
+        with self._lock:
+            links = list(self._links.values())
+        out = {}
+        for link in links:
+            with link.lock:
+                out[link.label] = {"address": link.addr, "online": link.online,
+                                   "clients": len(link.clients), "error": link.error}
+        return out
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="agent", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--label", default="", help="host name shown in the Bot Manager (default: hostname)")
+    ap.add_argument("--bind", default="127.0.0.1", help="address to listen on; anything but loopback needs --token")
+    ap.add_argument("--port", type=int, default=AGENT_PORT)
+    ap.add_argument("--ports", default="7070-7199", help="client ports to watch, e.g. 7070-7199")
+    ap.add_argument("--token", default="", help="shared secret the GUI must send")
+    ap.add_argument("--budget", type=float, default=mon.POLL_BUDGET, help="status requests per second")
+    a = ap.parse_args(argv)
+    try:
+        ports = mon.parse_ports(a.ports)
+    except ValueError as e:
+        ap.error(str(e))
+    if not a.token and not is_loopback(a.bind):
+        ap.error(f"--bind {a.bind} would expose the clients to the network; set --token as well")
+    mon.budget.set_rate(a.budget)
+    agent = Agent(ports, a.label, a.token)
+    srv = serve(agent, a.bind, a.port)
+    print(f"Agent '{agent.label}' on {a.bind}:{a.port} watching {len(ports)} ports")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        agent.stop()
+        srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+alerts.py - Incremental alert rules over client status updates
+
+Rules (config.AlertRule) are compiled once into matchers, each indexed under
+the /status fields it reads. Engine.feed() diffs a client's new /status
+against the previous one and only runs the matchers indexed under fields
+that changed, so an update costs O(changed fields). Rules that depend on the
+passage of time ("profit flat for 15 minutes") arm a deadline in a heap that
+tick() drains; a change to the watched field simply re-arms it.
+
+Firing is edge-triggered: a rule fires once when its condition becomes true
+for an account and re-arms when the condition clears. After firing, the
+(rule, account) pair stays quiet for the rule's cooldown even if it flaps.
+Every fired alert goes to all sinks — plain callables taking an Alert, such
+as LogSink (alerts.log) and WebhookSink (JSON POST).
+"""
+
+import heapq
+import json
+import re
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass
+
+import perf
+
+# "12:34:56 INFO Script - msg" / "[12:34:56] msg" -> "INFO Script - msg"
+_LOG_STAMP = re.compile(r"^\[?\d{1,2}:\d{2}(:\d{2})?(\.\d+)?\]?\s*")
+
+
+@dataclass
+class Alert:
+    rule: str
+    kind: str
+    account_id: str
+    name: str           # account display name
+    message: str
+    at: float
+
+    def to_dict(self):
+        return {"rule": self.rule, "kind": self.kind, "account_id": self.account_id,
+                "name": self.name, "message": self.message, "at": self.at}
+
+
+# ── Matchers ───────────────────────────────────────────────────────────────────
+
+class _Matcher:
+    """One compiled rule. ``fields`` are the /status keys whose change re-evaluates it."""
+    fields = ()
+    timed = False
+
+    def __init__(self, idx, rule):
+        self.idx = idx
+        self.rule = rule
+        self.threshold = float(rule.threshold)
+        self.cooldown_s = max(0.0, float(rule.cooldown_min)) * 60
+
+    def check(self, status) -> str:
+        """Message if the condition holds for ``status``, else ""."""
+        return ""
+
+
+class _HpBelow(_Matcher):
+    fields = ("hp", "maxHp", "loginState")
+
+    def check(self, status):
+        hp, mhp = status.get("hp", 0), status.get("maxHp", 0)
+        if status.get("loginState") == "LOGGED_IN" and mhp and hp < mhp * self.threshold / 100:
+            return f"HP {hp}/{mhp} is below {self.threshold:g}%"
+        return ""
+
+
+class _ProfitFlat(_Matcher):
+    """Re-armed by every profitGp change; fires when the deadline passes unchanged."""
+    fields = ("profitGp", "loginState", "paused")
+    timed = True
+
+    def active(self, status):
+        # A paused or logged-out client is expected not to earn
+        return status.get("loginState") == "LOGGED_IN" and not status.get("paused")
+
+    def message(self):
+        return f"profit has not changed for {self.threshold:g} min"
+
+
+class _Offline(_Matcher):
+    """Driven by Engine.miss(); any status clears it."""
+
+
+class _LogRepeat(_Matcher):
+    """Driven by Engine.logs()."""
+
+
+_KINDS = {"hp_below": _HpBelow, "profit_flat": _ProfitFlat,
+          "offline": _Offline, "log_repeat": _LogRepeat}
+
+
+# ── Engine ─────────────────────────────────────────────────────────────────────
+
+class _Client:
+    __slots__ = ("name", "status", "misses", "log_tail", "log_line", "log_count", "gen")
+
+    def __init__(self, name):
+        self.name = name
+        self.status = {}
+        self.misses = 0
+        self.log_tail = None    # last log line seen, to find where new lines start
+        self.log_line = ""      # current run of identical lines (timestamps stripped)
+        self.log_count = 0
+        self.gen = {}           # timed matcher idx -> generation of its armed deadline
+
+
+class Engine:
+    """Thread-safe; feed / miss / logs may be called from any poller or stream thread."""
+
+    def __init__(self, rules=(), sinks=()):
+        self._lock = threading.RLock()
+        self._clients = {}      # account id -> _Client
+        self._active = {}       # account id -> {matcher idx: message}
+        self._fired = {}        # (matcher idx, account id) -> last fire time
+        self._heap = []         # (deadline, account id, matcher idx, generation)
+        self._gen = 0
+        self.sinks = list(sinks)
+        self._watchers = []
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        """Compile ``rules``; per-account alert state starts over."""
+        with self._lock:
+            rules = [r for r in rules if r.enabled and r.kind in _KINDS]
+            self._matchers = [_KINDS[r.kind](i, r) for i, r in enumerate(rules)]
+            self._by_field = {}
+            for m in self._matchers:
+                for f in m.fields:
+                    self._by_field.setdefault(f, []).append(m)
+            self._offline = [m for m in self._matchers if isinstance(m, _Offline)]
+            self._log = [m for m in self._matchers if isinstance(m, _LogRepeat)]
+            changed = [aid for aid, act in self._active.items() if act]
+            self._active.clear()
+            self._fired.clear()
+            self._heap.clear()
+            for c in self._clients.values():
+                c.status, c.gen = {}, {}
+        for aid in changed:
+            self._notify(aid)
+
+    def watch(self, fn):
+        """``fn(account_id)`` is called whenever an account's set of active alerts changes."""
+        self._watchers.append(fn)
+
+    def active(self, account_id) -> dict:
+        """rule name -> message for every alert currently active on ``account_id``."""
+        with self._lock:
+            act = self._active.get(account_id, {})
+            return {self._matchers[i].rule.name: msg for i, msg in act.items() if i < len(self._matchers)}
+
+    def _client(self, account_id, name):
+        c = self._clients.get(account_id)
+        if c is None:
+            c = self._clients[account_id] = _Client(name)
+        elif name:
+            c.name = name
+        return c
+
+    def feed(self, account_id, status, name="", now=None):
+        """A fresh /status for ``account_id``; only rules on the fields that changed run."""
+        if not status:
+            return
+        now = time.time() if now is None else now
+        with perf.stage("alerts.feed"), self._lock:
+            c = self._client(account_id, name)
+            old = c.status
+            changed = [k for k, v in status.items() if old.get(k) != v]
+            c.status = dict(status)
+            if c.misses:
+                c.misses = 0
+                for m in self._offline:
+                    self._set(m, account_id, "", now)
+            seen = set()
+            for f in changed:
+                for m in self._by_field.get(f, ()):
+                    if m.idx in seen:
+                        continue
+                    seen.add(m.idx)
+                    if m.timed:
+                        self._arm(m, c, account_id, now)
+                    else:
+                        self._set(m, account_id, m.check(status), now)
+            perf.count("alerts.evaluated", len(seen))
+
+    def miss(self, account_id, now=None):
+        """``account_id`` was not found by a scan; only counts for clients that were seen before."""
+        now = time.time() if now is None else now
+        with self._lock:
+            c = self._clients.get(account_id)
+            if c is None:
+                return
+            c.misses += 1
+            c.status = {}           # the first status after coming back counts as all-changed
+            for m in self._matchers:
+                if m.fields:        # status-driven rules say nothing about a missing client
+                    c.gen.pop(m.idx, None)
+                    self._set(m, account_id, "", now)
+            for m in self._offline:
+                if c.misses >= m.threshold:
+                    self._set(m, account_id, f"not found for {c.misses} scans", now)
+
+    def forget(self, account_id):
+        """Drop all state for ``account_id`` — e.g. after the user stopped it, so it is not reported offline."""
+        with self._lock:
+            self._clients.pop(account_id, None)
+            for key in [k for k in self._fired if k[1] == account_id]:
+                del self._fired[key]
+            had = bool(self._active.pop(account_id, None))
+        if had:
+            self._notify(account_id)
+
+    def logs(self, account_id, lines, name="", now=None):
+        """The client's current log tail (oldest first); only lines after the last one seen are new."""
+        if not lines or not self._log:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            c = self._client(account_id, name)
+            new = lines
+            if c.log_tail is not None:
+                try:
+                    new = lines[len(lines) - 1 - lines[::-1].index(c.log_tail) + 1:]
+                except ValueError:
+                    pass            # last seen line scrolled out: everything is new
+            c.log_tail = lines[-1]
+            for line in new:
+                text = _LOG_STAMP.sub("", line).strip()
+                if text and text == c.log_line:
+                    c.log_count += 1
+                else:
+                    c.log_line, c.log_count = text, 1
+            for m in self._log:
+                msg = f'"{c.log_line[:80]}" repeated {c.log_count} times' if c.log_count >= m.threshold else ""
+                self._set(m, account_id, msg, now)
+
+    def tick(self, now=None):
+        """Fire timed rules whose deadline passed without the watched field changing."""
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, aid, idx, gen = heapq.heappop(self._heap)
+                c = self._clients.get(aid)
+                if c is None or c.gen.get(idx) != gen or idx >= len(self._matchers):
+                    continue        # re-armed or cancelled since
+                m = self._matchers[idx]
+                self._set(m, aid, m.message(), now)
+
+    def _arm(self, m, c, account_id, now):
+        self._set(m, account_id, "", now)
+        if not m.active(c.status):
+            c.gen.pop(m.idx, None)
+            return
+        self._gen += 1
+        c.gen[m.idx] = self._gen
+        heapq.heappush(self._heap, (now + m.threshold * 60, account_id, m.idx, self._gen))
+
+    def _set(self, m, account_id, message, now):
+        act = self._active.setdefault(account_id, {})
+        if not message:
+            if act.pop(m.idx, None) is not None:
+                self._notify(account_id)
+            return
+        if m.idx in act:
+            return                  # still active: deduplicated
+        act[m.idx] = message
+        self._notify(account_id)
+        key = (m.idx, account_id)
+        if now - self._fired.get(key, float("-inf")) < m.cooldown_s:
+            perf.count("alerts.cooldown")
+            return
+        self._fired[key] = now
+        c = self._clients.get(account_id)
+        self._emit(Alert(m.rule.name, m.rule.kind, account_id, c.name if c else "", message, now))
+
+    def _notify(self, account_id):
+        for fn in list(self._watchers):
+            try:
+                fn(account_id)
+            except Exception:
+                perf.count("alerts.watcher_error")
+
+    def _emit(self, alert):
+        perf.count("alerts.fired")
+        for sink in list(self.sinks):
+            try:
+                sink(alert)
+            except Exception:
+                perf.count("alerts.sink_error")
+
+
+# ── Sinks ──────────────────────────────────────────────────────────────────────
+
+class LogSink:
+    """Appends one line per alert to ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, alert):
+        line = (f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(alert.at))}  "
+                f"[{alert.rule}] {alert.name}: {alert.message}\n")
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class WebhookSink:
+    """POSTs each alert as JSON to ``url`` from a background thread; failures are counted, not raised."""
+    TIMEOUT = 3.0
+
+    def __init__(self, url):
+        self.url = url
+
+    def __call__(self, alert):
+        threading.Thread(target=self._post, args=(alert,), daemon=True).start()
+
+    def _post(self, alert):
+        req = urllib.request.Request(self.url, data=json.dumps(alert.to_dict()).encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=self.TIMEOUT) as r:
+                r.read()
+        except Exception:
+            perf.count("alerts.webhook_error")
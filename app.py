@@ -1,13 +1,19 @@
 """Baby Tank Switcher - Windows only"""
-import sys, threading, time, json as _json, http.client
+import sys, threading, time
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
 
 import customtkinter as ctk
-import win32gui, win32con, win32process, psutil
+import alerts as al
 import config as cfg
+import groups as grp
+import journal as jr
+import metrics
+import monitor as mon
+import perf
+import rates as rt
+import scheduler as sched
 import switcher as sw
 
 _managed_plugins: set = cfg.load_managed_plugins()
@@ -32,7 +38,7 @@ class _SmoothScrollableFrame(ctk.CTkScrollableFrame):
 
     def _get_canvas(self):
         """Return the inner tk.Canvas regardless of CTK version (attribute name varies)."""
-        for attr in ("_canvas", "canvas", "_interior_frame"):
+        for attr in ("_parent_canvas", "_canvas", "canvas", "_interior_frame"):
             c = getattr(self, attr, None)
             if c is not None and hasattr(c, "update_idletasks"):
                 return c
@@ -45,6 +51,7 @@ class _SmoothScrollableFrame(ctk.CTkScrollableFrame):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._scroll_job = None
+        self.on_scroll_end = None  # optional callback once scrolling settles
         canvas = self._get_canvas()
         if canvas is not None:
             canvas.bind("<MouseWheel>", self._on_scroll, add="+")
@@ -68,6 +75,70 @@ class _SmoothScrollableFrame(ctk.CTkScrollableFrame):
             self.update_idletasks()
         except Exception:
             pass
+        # Cards that just scrolled into view pick up any updates parked while offscreen
+        bus = getattr(self.winfo_toplevel(), "bus", None)
+        if bus is not None: bus.wake()
+        if self.on_scroll_end is not None: self.on_scroll_end()
+
+    def is_visible(self, w):
+        """True if descendant ``w`` overlaps the visible part of the scroll area."""
+        try:
+            if not w.winfo_ismapped(): return False
+            canvas = self._get_canvas()
+            if canvas is None: return True
+            top = canvas.winfo_rooty(); bottom = top + canvas.winfo_height()
+            y = w.winfo_rooty()
+            return y < bottom and y + w.winfo_height() > top
+        except tk.TclError:
+            return False
+
+
+# ── Main-thread UI update bus ────────────────────────────────────────────────
+class _UiBus:
+    """
+    Background workers post UI updates here instead of calling after(0, ...).
+    One main-thread pump applies everything pending once per frame. Updates
+    share a key per widget, so only the latest one per key survives. Updates
+    whose ``visible`` check fails are parked and applied when wake() is called
+    (on scroll or page show).
+    """
+    FRAME_MS=50
+
+    def __init__(self, root):
+        self._root=root; self._lock=threading.Lock()
+        self._pending={}; self._parked={}; self._recheck=False
+        self.applied=0; self.coalesced=0
+        root.after(self.FRAME_MS,self._pump)
+
+    def post(self, key, fn, visible=None):
+        """Thread-safe. ``fn`` runs on the main thread; a later post with the same key replaces it."""
+        with self._lock:
+            if key in self._pending or key in self._parked: self.coalesced+=1
+            self._parked.pop(key,None); self._pending[key]=(fn,visible)
+
+    def wake(self):
+        with self._lock: self._recheck=bool(self._parked)
+
+    @perf.timed("ui.bus_frame")
+    def _apply(self, batch):
+        for key,(fn,visible) in batch.items():
+            try:
+                if visible is not None and not visible():
+                    with self._lock:
+                        if key not in self._pending: self._parked[key]=(fn,visible)
+                    continue
+                fn(); self.applied+=1
+            except Exception: pass
+
+    def _pump(self):
+        with self._lock:
+            batch,self._pending=self._pending,{}
+            if self._recheck:
+                for k,v in self._parked.items(): batch.setdefault(k,v)
+                self._parked={}; self._recheck=False
+        if batch: self._apply(batch)
+        try: self._root.after(self.FRAME_MS,self._pump)
+        except tk.TclError: pass
 
 RAM_OPTIONS=["","512","1024","2048","4096","8192"]
 PROXY_OPTIONS=["None","HTTP","SOCKS4","SOCKS5"]
@@ -76,58 +147,6 @@ show_error = lambda msg: messagebox.showerror("Error", msg)
 show_info  = lambda msg: messagebox.showinfo("Info", msg)
 ask_yn     = lambda t, m: messagebox.askyesno(t, m)
 
-# ── HTTP connection pool ──────────────────────────────────────────────────────
-_conns: dict = {}
-_conn_lock = threading.Lock()
-
-def _get_conn(port):
-    with _conn_lock:
-        c = _conns.get(port)
-        if not c:
-            c = http.client.HTTPConnection("127.0.0.1", port, timeout=0.3)
-            _conns[port] = c
-        return c
-
-def _http_get(port, path):
-    for _ in range(2):
-        try:
-            c = _get_conn(port)
-            c.request("GET", path, headers={"Accept":"application/json"})
-            return _json.loads(c.getresponse().read().decode())
-        except Exception:
-            with _conn_lock: _conns.pop(port, None)
-    return None
-
-def _http_post(port, path, body=None):
-    try:
-        import urllib.request
-        data = _json.dumps(body or {}).encode()
-        req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data,
-              method="POST", headers={"Content-Type":"application/json"})
-        urllib.request.urlopen(req, timeout=3)
-        return True
-    except Exception:
-        return False
-
-_SCAN_PORTS = list(range(7070, 7200))
-
-def _central_scan():
-    results, lock = {}, threading.Lock()
-    def _probe(port):
-        s = _http_get(port, "/status")
-        if s is None: return
-        with lock:
-            results[port] = {"status": s,
-                             "plugins": _http_get(port, "/plugins") or [],
-                             "logs":    _http_get(port, "/logs")    or []}
-    with ThreadPoolExecutor(max_workers=len(_SCAN_PORTS)) as ex:
-        futs = [ex.submit(_probe, p) for p in _SCAN_PORTS]
-        for f in futs:
-            try: f.result(timeout=1.2)
-            except Exception: pass
-    return results
-
-
 # ── Shared widget helpers ─────────────────────────────────────────────────────
 def _btn(parent, text, cmd, fg=None, hov=None, w=None, h=34, font=FS, **kw):
     return ctk.CTkButton(parent, text=text, command=cmd,
@@ -200,6 +219,85 @@ class ImportDialog(ctk.CTkToplevel):
         self.result=n; self.destroy()
 
 
+class BulkImportDialog(ctk.CTkToplevel):
+    """Every credentials file in a folder or archive: scanned in the background, reviewed, then committed in one go."""
+    ARCHIVE_TYPES=[("Archives","*.zip *.tar *.tar.gz *.tgz"),("All","*.*")]
+
+    def __init__(self, parent, app):
+        super().__init__(parent); self.title("Bulk Import"); self.geometry("680x480"); self.grab_set()
+        self.app=app; self._page=parent; self._plan=None; self._busy=False
+        top=ctk.CTkFrame(self,fg_color="transparent"); top.pack(fill="x",padx=12,pady=(12,6))
+        _btn(top,"Folder…",lambda:self._pick(False),w=90).pack(side="left")
+        _btn(top,"Archive…",lambda:self._pick(True),w=90).pack(side="left",padx=6)
+        self._src=_lbl(top,"Pick a folder or a .zip / .tar archive of credentials files.",font=FS,color=TEXT_SEC); self._src.pack(side="left",padx=6)
+        self._tb=ctk.CTkTextbox(self,font=FM,fg_color=BG_MID,border_color=BORDER,border_width=1,wrap="none")
+        self._tb.pack(fill="both",expand=True,padx=12,pady=6)
+        row=ctk.CTkFrame(self,fg_color="transparent"); row.pack(fill="x",padx=12,pady=(0,12))
+        self._ow=tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(row,text="Overwrite changed credentials of existing accounts",variable=self._ow,
+            font=FS,text_color=TEXT_PRI,checkbox_width=18,checkbox_height=18).pack(side="left")
+        self._bi=_btn(row,"Import",self._import,fg=ACCENT,hov="#388bfd",w=100); self._bi.pack(side="right"); self._bi.configure(state="disabled")
+        _btn(row,"Close",self.destroy,w=80).pack(side="right",padx=6)
+
+    def _show(self, txt): self._tb.delete("1.0","end"); self._tb.insert("1.0",txt)
+
+    def _pick(self, archive):
+        path=(filedialog.askopenfilename(title="Archive of credentials files",filetypes=self.ARCHIVE_TYPES) if archive
+              else filedialog.askdirectory(title="Folder of credentials files"))
+        if not path: return
+        self._src.configure(text=path); self._show("Scanning…"); self._bi.configure(state="disabled"); self._plan=None
+        accs=list(self.app.accounts)
+        def _bg():
+            import importer as im
+            try: plan=im.scan(path,accs); txt=self._plan_text(plan)
+            except im.BulkImportError as e: plan,txt=None,str(e)
+            try: self.app.after(0,lambda:self._scanned(plan,txt))
+            except RuntimeError: pass
+        threading.Thread(target=_bg,daemon=True).start()
+
+    @staticmethod
+    def _plan_text(plan):
+        import importer as im
+        lines=[plan.summary(),""]
+        order={im.NEW:0,im.UPDATE:1,im.DUPLICATE:2,im.SKIPPED:3}
+        for c in sorted(plan.candidates,key=lambda c:(order.get(c.status,4),c.label.lower())):
+            lines.append(f"{c.status:10s} {(c.name or '—')[:24]:24s} {c.label}"+(f"  ({c.reason})" if c.reason else ""))
+        return "\n".join(lines)
+
+    def _scanned(self, plan, txt):
+        try:
+            if not self.winfo_exists(): return
+        except tk.TclError: return
+        import importer as im
+        self._plan=plan; self._show(txt)
+        if plan and (plan.of(im.NEW) or plan.of(im.UPDATE)) and not self._busy: self._bi.configure(state="normal")
+
+    def _import(self):
+        if not self._plan or self._busy: return
+        plan,ow,accs=self._plan,self._ow.get(),list(self.app.accounts)
+        self._plan=None; self._busy=True; self._bi.configure(state="disabled"); self._show("Importing…")
+        def _bg():
+            import importer as im
+            n=len(accs)
+            try: rep,err=im.commit(plan,accs,ow),None
+            except im.BulkImportError as e: rep,err=None,str(e)
+            except Exception as e: rep,err=None,f"Import failed: {e}"
+            self.app.bus.post((id(self),"import"),lambda:self._imported(plan,rep,err,accs[n:]))
+        threading.Thread(target=_bg,daemon=True).start()
+
+    def _imported(self, plan, rep, err, added):
+        # accounts.json already holds the new accounts: adopt them even if the dialog was closed meanwhile
+        if added:
+            self.app.accounts.extend(added)
+            self._page.refresh(); self.app.refresh_handler(); self.app.refresh_bot_cards()
+        try:
+            if not self.winfo_exists(): return
+        except tk.TclError: return
+        self._busy=False
+        if err: self._plan=plan; self._bi.configure(state="normal"); self._show(err); show_error(err)
+        else: self._show(rep.summary())
+
+
 class HttpPortDialog(ctk.CTkToplevel):
     def __init__(self, parent, account):
         super().__init__(parent); self.title("Set HTTP Port (Manual Override)")
@@ -228,6 +326,24 @@ class HttpPortDialog(ctk.CTkToplevel):
     def _clear(self): self.result=0; self.destroy()
 
 
+class AccountGroupsDialog(ctk.CTkToplevel):
+    def __init__(self, parent, account):
+        super().__init__(parent); self.title("Account Groups")
+        self.geometry("420x210"); self.resizable(False,False); self.grab_set(); self.result=None
+        _lbl(self,f"Groups — {account.display_name}",font=FH).pack(anchor="w",padx=20,pady=(18,4))
+        known=grp.index.names()
+        _lbl(self,"Comma-separated, e.g. farm-B, mules."+(f"\nExisting: {', '.join(known[:8])}"+(" …" if len(known)>8 else "") if known else ""),
+             font=FS,color=TEXT_SEC,justify="left").pack(anchor="w",padx=20)
+        self._var=ctk.StringVar(value=", ".join(account.groups))
+        _entry(self,self._var,width=380,font=FB,placeholder_text="No groups").pack(padx=20,pady=(10,16))
+        row=ctk.CTkFrame(self,fg_color="transparent"); row.pack()
+        _btn(row,"Save",self._ok,fg=ACCENT,hov="#388bfd",w=120).pack(side="left",padx=6)
+        _btn(row,"Cancel",self.destroy,w=120).pack(side="left",padx=6)
+        self.bind("<Return>",lambda e:self._ok())
+
+    def _ok(self): self.result=grp.parse_groups(self._var.get()); self.destroy()
+
+
 class ClientArgsDialog(ctk.CTkToplevel):
     FLAGS=[
         ("clean_jagex_launcher","Clean Jagex Launcher","Remove Jagex launcher integration"),
@@ -299,13 +415,17 @@ class SettingsPage(ctk.CTkFrame):
 
     def _build(self):
         _lbl(self,"Settings",font=FT).pack(anchor="center",pady=(30,24))
-        c=ctk.CTkFrame(self,fg_color="transparent"); c.pack(fill="x",padx=40)
+        c=_SmoothScrollableFrame(self,fg_color="transparent",
+            scrollbar_button_color=BTN_GRAY,scrollbar_button_hover_color=BTN_GRAY2)
+        c.pack(fill="both",expand=True,padx=40)
         s=self.app.settings
         self.rl=ctk.StringVar(value=s.runelite_folder)
         self.cf=ctk.StringVar(value=s.config_location)
         self.jr=ctk.StringVar(value=s.jar_path)
         self.jv=ctk.StringVar(value=s.jvm_args)
         self.pr=tk.BooleanVar(value=s.protect_process)
+        self.pb=ctk.StringVar(value=str(s.poll_budget))
+        self.mp=ctk.StringVar(value=str(s.metrics_port)); self.sp=ctk.StringVar(value=s.scan_ports); self.rh=ctk.StringVar(value=s.remote_hosts); self.at=ctk.StringVar(value=s.agent_token)
 
         def field(label,var,browse=None):
             _lbl(c,label).pack(anchor="w",pady=(12,2))
@@ -317,6 +437,14 @@ class SettingsPage(ctk.CTkFrame):
         field("Configurations Location",self.cf,self._bcf)
         field("Microbot Jar Location",self.jr,self._bjr)
         field("JVM Arguments",self.jv)
+        _btn(c,"JVM Profiles…",lambda:JvmProfilesDialog(self,self.app),w=120,h=28).pack(anchor="w",pady=(6,0))
+        field("Poll Budget  (Bot Manager requests per second, all clients combined)",self.pb)
+        field("Scan Ports  (local client ports, e.g. 7070-7199)",self.sp)
+        field("Remote Hosts  (agents on other machines, e.g. box2=192.168.1.20:7300, box3=10.0.0.5)",self.rh)
+        field("Agent Token  (shared secret; must match each agent's --token)",self.at)
+        self._hl=_lbl(c,"",font=FS,color=TEXT_SEC,wraplength=560,justify="left"); self._hl.pack(anchor="w",pady=(4,0))
+        self._host_status()
+        field("Metrics Port  (serves http://127.0.0.1:<port>/metrics for Prometheus; 0 = off)",self.mp)
 
         pr=ctk.CTkFrame(c,fg_color="transparent"); pr.pack(anchor="w",pady=(16,0))
         ctk.CTkCheckBox(pr,text="Process Protection  (requires admin — hides clients from Jagex fingerprinting)",
@@ -324,6 +452,15 @@ class SettingsPage(ctk.CTkFrame):
         _lbl(c,"When enabled, Baby Tank Switcher must be run as Administrator. "
              "Applies Windows process hardening so Jagex cannot inspect launched clients.",
              font=FS,color=TEXT_SEC,wraplength=560,justify="left").pack(anchor="w",padx=28,pady=(2,0))
+
+        self.dg=tk.BooleanVar(value=s.diagnostics)
+        ctk.CTkCheckBox(c,text="Diagnostics  (record scan, poll, HTTP, launch and UI timings)",variable=self.dg,
+            command=lambda:perf.enable(self.dg.get()),font=FB,text_color=TEXT_PRI,
+            checkbox_width=20,checkbox_height=20).pack(anchor="w",pady=(16,0))
+        dr=ctk.CTkFrame(c,fg_color="transparent"); dr.pack(anchor="w",padx=28,pady=(6,0))
+        _btn(dr,"View Diagnostics",self._view_diag,w=130,h=28).pack(side="left")
+        _btn(dr,"Export…",self._export_diag,w=80,h=28).pack(side="left",padx=6)
+        self._pbtn=_btn(dr,"● Start Profiler",self._toggle_profiler,w=130,h=28); self._pbtn.pack(side="left")
         _btn(c,"Save Settings",self._save,fg=ACCENT,hov="#388bfd",w=160).pack(pady=24)
 
     def _brl(self):
@@ -338,11 +475,47 @@ class SettingsPage(ctk.CTkFrame):
             filetypes=[("JAR files","*.jar"),("All","*.*")],initialdir=init)
         if f: self.jr.set(f)
 
+    def _host_status(self):
+        """One line per remote host: online with N clients, or the last connection error."""
+        if not self.winfo_exists(): return
+        hs=self.app.remote_hosts()
+        self._hl.configure(text="\n".join(f"{'●' if h['online'] else '○'} {n} ({h['address']}): "
+            +(f"{h['clients']} client(s)" if h['online'] else (h['error'] or "connecting…")) for n,h in sorted(hs.items())))
+        self.after(2000,self._host_status)
+
+    def _view_diag(self): DiagnosticsDialog(self)
+    def _export_diag(self):
+        f=filedialog.asksaveasfilename(title="Export diagnostics",defaultextension=".json",
+            initialfile="diagnostics.json",filetypes=[("JSON","*.json")])
+        if f: perf.export(f); show_info(f"Diagnostics written to:\n{f}")
+    def _toggle_profiler(self):
+        if not perf.profiling():
+            perf.start_profile(); self._pbtn.configure(text="■ Stop Profiler",fg_color="#6e2020",hover_color="#8b2a2a"); return
+        self._pbtn.configure(text="● Start Profiler",fg_color=BTN_GRAY,hover_color=BTN_GRAY2)
+        f=filedialog.asksaveasfilename(title="Save profile",defaultextension=".txt",
+            initialfile="profile.txt",filetypes=[("Collapsed stacks","*.txt")])
+        prof=perf.stop_profile(f or None)
+        if f and prof: show_info(f"Profile written to:\n{f}\n\n{sum(prof.samples.values())} samples, collapsed-stack format.")
+
     def _save(self):
         s=self.app.settings
+        try: pb=int(self.pb.get().strip()); assert pb>0
+        except (ValueError,AssertionError): show_error("Poll Budget must be a whole number above 0."); return
+        import agent as ag
+        try: ports=mon.parse_ports(self.sp.get()); hosts=ag.parse_hosts(self.rh.get())
+        except ValueError as e: show_error(f"{e}\n\nScan Ports takes ranges like 7070-7199; Remote Hosts takes name=address:port entries."); return
+        try: mp=int(self.mp.get().strip() or 0); assert 0<=mp<65536
+        except (ValueError,AssertionError): show_error("Metrics Port must be a port number, or 0 to turn the endpoint off."); return
+        if mp!=s.metrics_port or (mp and not metrics.exporter.port):
+            try: metrics.exporter.start(mp,lambda:self.app.accounts)
+            except OSError as e: show_error(f"Could not serve metrics on port {mp}:\n{e}"); return
+        s.metrics_port=mp
+        s.poll_budget=pb; mon.budget.set_rate(pb)
+        s.scan_ports=self.sp.get().strip(); s.remote_hosts=self.rh.get().strip(); s.agent_token=self.at.get().strip()
+        mon.set_scan_ports(ports); self.app.configure_hosts(hosts,s.agent_token)
         s.runelite_folder=self.rl.get().strip(); s.config_location=self.cf.get().strip()
         s.jar_path=self.jr.get().strip(); s.jvm_args=self.jv.get().strip()
-        s.protect_process=self.pr.get(); cfg.save_settings(s)
+        s.protect_process=self.pr.get(); s.diagnostics=self.dg.get(); perf.enable(s.diagnostics); cfg.save_settings(s)
         if s.protect_process and not sw.is_admin():
             show_info("Settings saved.\n\nWarning: Process Protection is enabled but Baby Tank Switcher "
                       "is not running as Administrator. Protection will be skipped until you relaunch as admin.")
@@ -350,7 +523,407 @@ class SettingsPage(ctk.CTkFrame):
             show_info("Settings saved.")
 
 
+class DiagnosticsDialog(ctk.CTkToplevel):
+    REFRESH_MS=1000
+
+    def __init__(self, parent):
+        super().__init__(parent); self.title("Diagnostics"); self.geometry("620x420")
+        self._tb=ctk.CTkTextbox(self,font=FM,fg_color=BG_MID,border_color=BORDER,border_width=1,wrap="none")
+        self._tb.pack(fill="both",expand=True,padx=12,pady=(12,6))
+        row=ctk.CTkFrame(self,fg_color="transparent"); row.pack(fill="x",padx=12,pady=(0,12))
+        _btn(row,"Reset",lambda:(perf.reset(),self._tick(False)),w=80).pack(side="left")
+        _btn(row,"Close",self.destroy,w=80).pack(side="right")
+        self._tick()
+
+    def _tick(self, again=True):
+        try:
+            if not self.winfo_exists(): return
+        except tk.TclError: return
+        txt=perf.format_table() if perf.ENABLED else "Diagnostics are off. Enable them in Settings to record timings.\n\n"+perf.format_table()
+        self._tb.delete("1.0","end"); self._tb.insert("1.0",txt)
+        if again: self.after(self.REFRESH_MS,self._tick)
+
+
+class JournalDialog(ctk.CTkToplevel):
+    """Launch -> login times over the last week and the latest journal events."""
+    DAYS=7; EVENTS=300
+
+    def __init__(self, parent):
+        super().__init__(parent); self.title("Journal"); self.geometry("760x520")
+        self._tb=ctk.CTkTextbox(self,font=FM,fg_color=BG_MID,border_color=BORDER,border_width=1,wrap="none")
+        self._tb.pack(fill="both",expand=True,padx=12,pady=(12,6))
+        row=ctk.CTkFrame(self,fg_color="transparent"); row.pack(fill="x",padx=12,pady=(0,12))
+        _btn(row,"Refresh",self._load,w=80).pack(side="left")
+        _lbl(row,str(jr.JOURNAL_DIR),font=FS,color=TEXT_SEC).pack(side="left",padx=10)
+        _btn(row,"Close",self.destroy,w=80).pack(side="right")
+        self._load()
+
+    def _load(self):
+        since=time.time()-self.DAYS*86400
+        evs=[jr.format_event(e) for e in jr.journal.recent(self.EVENTS)]
+        txt=(f"Launch → login, last {self.DAYS} days\n\n"+jr.format_login_times(jr.journal.launch_to_login(since))
+             +"\n\nLatest events\n\n"+("\n".join(evs) or "(none)"))
+        self._tb.delete("1.0","end"); self._tb.insert("1.0",txt)
+
+
+class JvmProfilesDialog(ctk.CTkToplevel):
+    """Named JVM profiles; accounts pick one from their right-click menu in Account Overview."""
+    NONE="(no profiles yet)"; GC_DEFAULT="JVM default"
+
+    def __init__(self, parent, app):
+        super().__init__(parent); self.title("JVM Profiles"); self.geometry("560x560"); self.grab_set()
+        self.app=app; self._profiles=cfg.load_jvm_profiles(); self._cur=None
+        self._groups={g:cfg.GroupSettings.from_dict(s.to_dict()) for g,s in grp.index.all_settings().items()}
+        top=ctk.CTkFrame(self,fg_color="transparent"); top.pack(fill="x",padx=16,pady=(16,6))
+        self._sel=ctk.StringVar()
+        self._menu=ctk.CTkOptionMenu(top,variable=self._sel,values=[self.NONE],command=lambda _:self._load(),width=220,height=28,
+            font=FS,fg_color=BG_MID,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2)
+        self._menu.pack(side="left")
+        _btn(top,"+ New",self._new,w=70,h=28).pack(side="left",padx=6)
+        _btn(top,"Delete",self._delete,fg="#6e2020",hov="#8b2a2a",w=70,h=28).pack(side="left")
+        f=ctk.CTkFrame(self,fg_color=BG_MID,corner_radius=8); f.pack(fill="x",padx=16,pady=6); f.grid_columnconfigure(1,weight=1)
+        self._v={k:ctk.StringVar() for k in ("name","heap_min_mb","heap_max_mb","cds_archive","thread_stack_kb","extra")}
+        self._auto=tk.BooleanVar(value=False); self._gc=ctk.StringVar(value=self.GC_DEFAULT)
+        def row(r,label,widget):
+            _lbl(f,label,font=FS,color=TEXT_SEC).grid(row=r,column=0,padx=(12,8),pady=4,sticky="w")
+            widget.grid(row=r,column=1,padx=(0,12),pady=4,sticky="ew")
+        row(0,"Name",_entry(f,self._v["name"],font=FM,height=28))
+        row(1,"Heap min (MB, 0 = default)",_entry(f,self._v["heap_min_mb"],font=FM,height=28))
+        row(2,"Heap max (MB, 0 = global)",_entry(f,self._v["heap_max_mb"],font=FM,height=28))
+        row(3,"",ctk.CTkCheckBox(f,text="Auto heap — size max heap from each account's peak memory",variable=self._auto,
+            font=FS,text_color=TEXT_PRI,checkbox_width=18,checkbox_height=18))
+        row(4,"Garbage collector",ctk.CTkOptionMenu(f,variable=self._gc,values=[self.GC_DEFAULT]+list(cfg.GC_FLAGS),height=28,
+            font=FS,fg_color=BG_DARK,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2))
+        cds=ctk.CTkFrame(f,fg_color="transparent"); cds.grid_columnconfigure(0,weight=1)
+        _entry(cds,self._v["cds_archive"],font=FM,height=28).grid(row=0,column=0,sticky="ew")
+        _btn(cds,"Browse",self._browse_cds,w=70,h=28).grid(row=0,column=1,padx=(6,0))
+        row(5,"CDS archive (.jsa)",cds)
+        row(6,"Thread stack (KB, 0 = default)",_entry(f,self._v["thread_stack_kb"],font=FM,height=28))
+        row(7,"Extra JVM flags",_entry(f,self._v["extra"],font=FM,height=28))
+        self._info=_lbl(self,"",font=FS,color=TEXT_SEC,justify="left",anchor="w",wraplength=520)
+        self._info.pack(fill="x",padx=18,pady=(6,0))
+        _lbl(self,"A missing CDS archive is written on the first run and used from then on. "
+             "Profile flags replace the matching global JVM arguments (heap, GC, CDS).",
+             font=FS,color=TEXT_SEC,justify="left",anchor="w",wraplength=520).pack(fill="x",padx=18,pady=(4,0))
+        rw=ctk.CTkFrame(self,fg_color="transparent"); rw.pack(side="bottom",fill="x",padx=16,pady=14)
+        _btn(rw,"Save",self._save,fg=ACCENT,hov="#388bfd",w=100).pack(side="right")
+        _btn(rw,"Close",self.destroy,w=80).pack(side="right",padx=6)
+        self._refresh_menu(next(iter(sorted(self._profiles)),None))
+
+    def _refresh_menu(self, select):
+        names=sorted(self._profiles,key=str.lower)
+        self._menu.configure(values=names or [self.NONE]); self._sel.set(select or self.NONE); self._cur=None; self._load()
+
+    def _browse_cds(self):
+        f=filedialog.asksaveasfilename(title="CDS archive",defaultextension=".jsa",initialfile="microbot.jsa",
+            filetypes=[("CDS archive","*.jsa"),("All","*.*")],confirmoverwrite=False)
+        if f: self._v["cds_archive"].set(f)
+
+    def _store(self):
+        """Editor -> working copy of the current profile (renames included). False if the input is invalid."""
+        if self._cur is None: return True
+        v={k:var.get().strip() for k,var in self._v.items()}
+        try:
+            nums={k:int(v[k] or 0) for k in ("heap_min_mb","heap_max_mb","thread_stack_kb")}
+            assert all(n>=0 for n in nums.values())
+        except: show_error("Heap and stack sizes must be whole numbers (0 for default)."); return False
+        name=v["name"] or self._cur
+        if name!=self._cur and name in self._profiles: show_error(f"A profile named '{name}' already exists."); return False
+        self._profiles.pop(self._cur,None)
+        self._profiles[name]=cfg.JvmProfile(auto_heap=self._auto.get(),gc="" if self._gc.get()==self.GC_DEFAULT else self._gc.get(),
+            cds_archive=v["cds_archive"],extra=v["extra"],**nums)
+        if name!=self._cur:
+            for a in self.app.accounts:
+                if a.jvm_profile==self._cur: a.jvm_profile=name
+            for g in self._groups.values():
+                if g.jvm_profile==self._cur: g.jvm_profile=name
+        self._cur=name
+        return True
+
+    def _load(self):
+        if not self._store(): return
+        name=self._sel.get(); p=self._profiles.get(name)
+        self._cur=name if p else None; p=p or cfg.JvmProfile()
+        self._v["name"].set(self._cur or "")
+        for k in ("heap_min_mb","heap_max_mb","thread_stack_kb","cds_archive","extra"): self._v[k].set(str(getattr(p,k)))
+        self._auto.set(p.auto_heap); self._gc.set(p.gc or self.GC_DEFAULT)
+        users=[a for a in self.app.accounts if self._cur and a.jvm_profile==self._cur]
+        txt=f"Used by: {', '.join(a.display_name for a in users)}" if users else "Not used by any account yet."
+        if p.auto_heap and users:
+            txt+="\nNext auto heap: "+", ".join(f"{a.display_name} {sw.memory.auto_heap_mb(a.id) or '—'} MB" for a in users[:8])
+        self._info.configure(text=txt)
+
+    def _new(self):
+        if not self._store(): return
+        n=1
+        while f"Profile {n}" in self._profiles: n+=1
+        self._profiles[f"Profile {n}"]=cfg.JvmProfile(); self._refresh_menu(f"Profile {n}")
+
+    def _delete(self):
+        if self._cur is None: return
+        users=[a for a in self.app.accounts if a.jvm_profile==self._cur]
+        if users and not ask_yn("Delete profile",f"{len(users)} account(s) use '{self._cur}'. They will fall back to the global JVM arguments."): return
+        for a in users: a.jvm_profile=""
+        for g in self._groups.values():
+            if g.jvm_profile==self._cur: g.jvm_profile=""
+        self._profiles.pop(self._cur,None); self._cur=None; self._refresh_menu(next(iter(sorted(self._profiles)),None))
+
+    def _save(self):
+        if not self._store(): return
+        cfg.save_jvm_profiles(self._profiles); self.app.save(); self._refresh_menu(self._cur)
+        grp.index.set_settings(self._groups); cfg.save_groups(self._groups)
+        show_info("JVM profiles saved.")
+
+
+class GroupsDialog(ctk.CTkToplevel):
+    """Per-group JVM profile, launch concurrency and poll scale; membership is set per account in Account Overview."""
+    NONE="(no groups yet)"; NO_PROFILE="(none)"
+
+    def __init__(self, parent, app):
+        super().__init__(parent); self.title("Account Groups"); self.geometry("520x380"); self.grab_set()
+        self.app=app; self._groups={g:cfg.GroupSettings.from_dict(s.to_dict()) for g,s in grp.index.all_settings().items()}; self._cur=None
+        top=ctk.CTkFrame(self,fg_color="transparent"); top.pack(fill="x",padx=16,pady=(16,6))
+        self._sel=ctk.StringVar(); names=grp.index.names()
+        ctk.CTkOptionMenu(top,variable=self._sel,values=names or [self.NONE],command=lambda _:self._load(),width=240,height=28,
+            font=FS,fg_color=BG_MID,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2).pack(side="left")
+        f=ctk.CTkFrame(self,fg_color=BG_MID,corner_radius=8); f.pack(fill="x",padx=16,pady=6); f.grid_columnconfigure(1,weight=1)
+        self._jvm=ctk.StringVar(value=self.NO_PROFILE); self._conc=ctk.StringVar(); self._scale=ctk.StringVar()
+        def row(r,label,widget):
+            _lbl(f,label,font=FS,color=TEXT_SEC).grid(row=r,column=0,padx=(12,8),pady=4,sticky="w")
+            widget.grid(row=r,column=1,padx=(0,12),pady=4,sticky="ew")
+        row(0,"JVM profile",ctk.CTkOptionMenu(f,variable=self._jvm,values=[self.NO_PROFILE]+sorted(cfg.load_jvm_profiles(),key=str.lower),
+            height=28,font=FS,fg_color=BG_DARK,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2))
+        row(1,"Launch concurrency",_entry(f,self._conc,font=FM,height=28))
+        row(2,"Poll scale (1 = normal)",_entry(f,self._scale,font=FM,height=28))
+        self._info=_lbl(self,"",font=FS,color=TEXT_SEC,justify="left",anchor="w",wraplength=480)
+        self._info.pack(fill="x",padx=18,pady=(6,0))
+        _lbl(self,"The JVM profile applies to members without a profile of their own. Launch concurrency is how many "
+             "clients of the group boot at once in a group launch. Poll scale 2 polls idle members half as often, "
+             "0.5 twice as often. Add accounts to groups from their right-click menu in Account Overview.",
+             font=FS,color=TEXT_SEC,justify="left",anchor="w",wraplength=480).pack(fill="x",padx=18,pady=(4,0))
+        rw=ctk.CTkFrame(self,fg_color="transparent"); rw.pack(side="bottom",fill="x",padx=16,pady=14)
+        _btn(rw,"Save",self._save,fg=ACCENT,hov="#388bfd",w=100).pack(side="right")
+        _btn(rw,"Close",self.destroy,w=80).pack(side="right",padx=6)
+        self._sel.set(names[0] if names else self.NONE); self._load()
+
+    def _store(self):
+        """Editor -> working copy of the current group. False if the input is invalid."""
+        if self._cur is None: return True
+        try:
+            conc=int(self._conc.get().strip() or 1); scale=float(self._scale.get().strip() or 1)
+            assert 1<=conc<=64 and 0.1<=scale<=10
+        except: show_error("Launch concurrency must be a whole number from 1 to 64 and poll scale a number from 0.1 to 10."); return False
+        jvm="" if self._jvm.get()==self.NO_PROFILE else self._jvm.get()
+        self._groups[self._cur]=cfg.GroupSettings(jvm_profile=jvm,launch_concurrency=conc,poll_scale=scale)
+        return True
+
+    def _load(self):
+        if not self._store(): return
+        name=self._sel.get(); self._cur=None if name==self.NONE else name
+        g=self._groups.get(self._cur) or cfg.GroupSettings()
+        self._jvm.set(g.jvm_profile or self.NO_PROFILE); self._conc.set(str(g.launch_concurrency)); self._scale.set(f"{g.poll_scale:g}")
+        mem=grp.index.members(self._cur) if self._cur else []
+        self._info.configure(text=f"Members ({len(mem)}): "+", ".join(a.display_name for a in mem[:12])+(" …" if len(mem)>12 else "")
+                             if mem else "No members.")
+
+    def _save(self):
+        if not self._store(): return
+        grp.index.set_settings(self._groups); cfg.save_groups(grp.index.all_settings())
+        show_info("Group settings saved.")
+
+
+class ScheduleDialog(ctk.CTkToplevel):
+    """Session plans per account, launch-queue limits and a 24 h host-load preview."""
+    CHART_H=150
+
+    def __init__(self, parent, app):
+        super().__init__(parent); self.title("Launch Schedule"); self.geometry("760x640"); self.grab_set()
+        self.app=app; sch=app.scheduler.schedule
+        self._plans={aid:cfg.SessionPlan.from_dict(p.to_dict()) for aid,p in sch.plans.items()}
+        self._accs=[a for a in app.accounts if not a.skip_launch]; self._cur=None
+        top=ctk.CTkFrame(self,fg_color="transparent"); top.pack(fill="x",padx=16,pady=(14,4))
+        self._on=tk.BooleanVar(value=sch.enabled)
+        ctk.CTkCheckBox(top,text="Run schedule",variable=self._on,font=FB,text_color=TEXT_PRI,
+            checkbox_width=20,checkbox_height=20).pack(side="left")
+        def _spin(label,lo,hi,step,val):
+            _lbl(top,label,font=FS,color=TEXT_SEC).pack(side="left",padx=(16,4))
+            sp=Spinner(top,min_val=lo,max_val=hi,step=step,initial=val,width=44); sp.pack(side="left"); return sp
+        self._k=_spin("Max booting",1,32,1,sch.max_booting)
+        self._gap=_spin("Gap (s)",0,600,5,sch.launch_gap_s)
+        self._boot=_spin("Boot est. (s)",10,600,10,sch.boot_estimate_s)
+
+        ed=ctk.CTkFrame(self,fg_color=BG_MID,corner_radius=8); ed.pack(fill="x",padx=16,pady=8)
+        ed.grid_columnconfigure(1,weight=1)
+        _lbl(ed,"Account",font=FS,color=TEXT_SEC).grid(row=0,column=0,padx=(12,6),pady=(10,4),sticky="w")
+        names=[a.display_name for a in self._accs] or [""]
+        self._acc_var=ctk.StringVar(value=names[0])
+        ctk.CTkOptionMenu(ed,variable=self._acc_var,values=names,command=lambda _:self._load_plan(),width=200,height=28,
+            font=FS,fg_color=BG_DARK,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2).grid(row=0,column=1,pady=(10,4),sticky="w")
+        self._pe=tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(ed,text="Scheduled",variable=self._pe,font=FS,text_color=TEXT_PRI,
+            checkbox_width=18,checkbox_height=18).grid(row=0,column=2,padx=12,pady=(10,4))
+        self._fv={k:ctk.StringVar() for k in ("windows","session_min","break_min","jitter_min")}
+        for r,(k,label) in enumerate((("windows","Windows (HH:MM-HH:MM, …)"),("session_min","Max session (min)"),
+                                      ("break_min","Break (min)"),("jitter_min","Jitter ± (min)")),start=1):
+            _lbl(ed,label,font=FS,color=TEXT_SEC).grid(row=r,column=0,padx=(12,6),pady=3,sticky="w")
+            _entry(ed,self._fv[k],font=FM,height=28).grid(row=r,column=1,columnspan=2,padx=(0,12),pady=3,sticky="ew")
+        ctk.CTkFrame(ed,fg_color="transparent",height=6).grid(row=5,column=0)
+
+        pv=ctk.CTkFrame(self,fg_color="transparent"); pv.pack(fill="x",padx=16)
+        _btn(pv,"Preview next 24 h",self._preview,w=140,h=28).pack(side="left")
+        self._sum=_lbl(pv,"",font=FS,color=TEXT_SEC,anchor="w"); self._sum.pack(side="left",padx=10)
+        self._chart=tk.Canvas(self,height=self.CHART_H,bg=BG_TABLE,highlightthickness=0)
+        self._chart.pack(fill="x",padx=16,pady=(6,4))
+        _lbl(self,"Recent scheduler events",font=FS,color=TEXT_SEC,anchor="w").pack(fill="x",padx=16)
+        self._log=ctk.CTkTextbox(self,height=90,font=FM,fg_color=BG_MID,border_color=BORDER,border_width=1)
+        self._log.pack(fill="both",expand=True,padx=16,pady=(2,8))
+        self._log.insert("1.0","\n".join(app.sched_log) or "No events yet."); self._log.configure(state="disabled")
+        row=ctk.CTkFrame(self,fg_color="transparent"); row.pack(fill="x",padx=16,pady=(0,14))
+        _btn(row,"Save",self._save,fg=ACCENT,hov="#388bfd",w=100).pack(side="right")
+        _btn(row,"Close",self.destroy,w=80).pack(side="right",padx=6)
+        self._load_plan()
+
+    def _acc(self):
+        return next((a for a in self._accs if a.display_name==self._acc_var.get()),None)
+
+    def _store_plan(self):
+        """Copy the editor into the working plan of the current account. False if the input is invalid."""
+        if self._cur is None: return True
+        v={k:var.get().strip() for k,var in self._fv.items()}
+        try: sched.parse_windows(v["windows"])
+        except ValueError as e: show_error(str(e)); return False
+        try:
+            nums={k:int(v[k]) for k in ("session_min","break_min","jitter_min")}
+            assert nums["session_min"]>=5 and nums["break_min"]>=0 and nums["jitter_min"]>=0
+        except: show_error("Max session must be at least 5 minutes; break and jitter must be 0 or more."); return False
+        if self._pe.get() or self._cur in self._plans:
+            self._plans[self._cur]=cfg.SessionPlan(enabled=self._pe.get(),windows=v["windows"],**nums)
+        return True
+
+    def _load_plan(self):
+        if not self._store_plan(): return
+        acc=self._acc(); self._cur=acc.id if acc else None
+        p=self._plans.get(self._cur) or cfg.SessionPlan(enabled=False)
+        self._pe.set(p.enabled)
+        for k,var in self._fv.items(): var.set(str(getattr(p,k)))
+
+    def _schedule(self):
+        return cfg.Schedule(enabled=self._on.get(),max_booting=max(1,min(32,self._k.get())),
+            launch_gap_s=max(0,self._gap.get()),boot_estimate_s=max(10,self._boot.get()),
+            plans={aid:p for aid,p in self._plans.items() if p.enabled or aid in self.app.scheduler.schedule.plans})
+
+    def _preview(self):
+        if not self._store_plan(): return
+        pv=sched.preview(self.app.accounts,self._schedule(),self.app.settings)
+        self._sum.configure(text=f"Peak {pv['peak_running']} running · {pv['peak_booting']} booting · "
+            f"{pv['peak_mem_mb']/1024:.1f} GB · {pv['peak_cores']:.1f} cores   "
+            f"{len(pv['launches'])} launches"+(f", {pv['dropped']} dropped" if pv["dropped"] else ""))
+        self._draw(pv["timeline"])
+
+    def _draw(self, tl):
+        c=self._chart; c.delete("all"); c.update_idletasks()
+        w=max(c.winfo_width(),200); h=self.CHART_H; pad=18
+        if not tl: return
+        top=max(1,max(r[1] for r in tl)); dx=(w-2*pad)/max(1,len(tl)-1)
+        y=lambda n:h-pad-(h-2*pad)*n/top
+        for i,(t,run,boot,_,_) in enumerate(tl):
+            x=pad+i*dx
+            if boot: c.create_rectangle(x,y(boot),x+max(1,dx),h-pad,fill="#FFA500",outline="")
+        c.create_line(*[v for i,r in enumerate(tl) for v in (pad+i*dx,y(r[1]))],fill=GREEN,width=2)
+        for i,r in enumerate(tl):
+            if time.localtime(r[0]).tm_min<5 and time.localtime(r[0]).tm_hour%3==0:
+                c.create_text(pad+i*dx,h-6,text=time.strftime("%H:%M",time.localtime(r[0])),fill=TEXT_SEC,font=FS)
+        c.create_text(pad,8,text=f"{top} clients",fill=TEXT_SEC,font=FS,anchor="w")
+        c.create_text(w-pad,8,text="— running   ▮ booting",fill=TEXT_SEC,font=FS,anchor="e")
+
+    def _save(self):
+        if not self._store_plan(): return
+        self.app.scheduler.set_schedule(self._schedule()); show_info("Schedule saved."); self.destroy()
+
+
 # ── Guide page ────────────────────────────────────────────────────────────────
+class AlertsDialog(ctk.CTkToplevel):
+    """Recent alerts plus the rule editor; saved rules are recompiled into the running engine at once."""
+    REFRESH_MS=1000
+
+    def __init__(self, parent, app):
+        super().__init__(parent); self.title("Alerts"); self.geometry("680x600"); self.grab_set()
+        self.app=app; conf=cfg.load_alerts(); self._shown=False
+        self._kinds={lbl:k for k,(lbl,_) in cfg.ALERT_KINDS.items()}
+        _lbl(self,"Recent alerts",font=FB,anchor="w").pack(fill="x",padx=16,pady=(14,4))
+        self._tb=ctk.CTkTextbox(self,font=FM,fg_color=BG_MID,border_color=BORDER,border_width=1,wrap="none",height=150)
+        self._tb.pack(fill="x",padx=16)
+        hr=ctk.CTkFrame(self,fg_color="transparent"); hr.pack(fill="x",padx=16,pady=(12,4))
+        _lbl(hr,"Rules",font=FB).pack(side="left")
+        _btn(hr,"+ Add rule",lambda:self._add_row(cfg.AlertRule(name="New rule")),w=90,h=26,font=FS).pack(side="right")
+        self._sc=ctk.CTkScrollableFrame(self,fg_color=BG_MID,scrollbar_button_color=BTN_GRAY,scrollbar_button_hover_color=BTN_GRAY2)
+        self._sc.pack(fill="both",expand=True,padx=16); self._sc.grid_columnconfigure(0,weight=1)
+        self._rows=[]
+        for r in conf.rules: self._add_row(r)
+        wh=ctk.CTkFrame(self,fg_color="transparent"); wh.pack(fill="x",padx=16,pady=(10,0)); wh.grid_columnconfigure(1,weight=1)
+        _lbl(wh,"Webhook URL",font=FS,color=TEXT_SEC).grid(row=0,column=0,padx=(0,8),sticky="w")
+        self._hook=ctk.StringVar(value=conf.webhook_url)
+        _entry(wh,self._hook,font=FM,height=28,placeholder_text="optional — http://localhost:8080/alerts").grid(row=0,column=1,sticky="ew")
+        _lbl(self,"Each alert fires once when its condition starts and again only after the cooldown. "
+             "Everything fired is also written to alerts.log.",font=FS,color=TEXT_SEC,justify="left",anchor="w",
+             wraplength=640).pack(fill="x",padx=18,pady=(6,0))
+        rw=ctk.CTkFrame(self,fg_color="transparent"); rw.pack(side="bottom",fill="x",padx=16,pady=14)
+        _btn(rw,"Save",self._save,fg=ACCENT,hov="#388bfd",w=100).pack(side="right")
+        _btn(rw,"Close",self.destroy,w=80).pack(side="right",padx=6)
+        self._tick()
+
+    def _add_row(self, rule):
+        f=ctk.CTkFrame(self._sc,fg_color="transparent"); f.grid(row=len(self._rows),column=0,sticky="ew",pady=2)
+        f.grid_columnconfigure(0,weight=1)
+        v={"name":ctk.StringVar(value=rule.name),"kind":ctk.StringVar(value=cfg.ALERT_KINDS[rule.kind][0]),
+           "threshold":ctk.StringVar(value=f"{rule.threshold:g}"),"cooldown_min":ctk.StringVar(value=f"{rule.cooldown_min:g}"),
+           "enabled":tk.BooleanVar(value=rule.enabled)}
+        ctk.CTkCheckBox(f,text="",variable=v["enabled"],width=20,checkbox_width=18,checkbox_height=18).grid(row=0,column=0,padx=(8,0),sticky="w")
+        _entry(f,v["name"],font=FS,height=26,width=140).grid(row=0,column=1,padx=4)
+        unit=_lbl(f,"",font=FS,color=TEXT_SEC,width=90,anchor="w")
+        def _unit(_=None): unit.configure(text=cfg.ALERT_KINDS[self._kinds[v["kind"].get()]][1])
+        ctk.CTkOptionMenu(f,variable=v["kind"],values=list(self._kinds),command=_unit,width=130,height=26,font=FS,
+            fg_color=BG_DARK,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2).grid(row=0,column=2,padx=4)
+        _entry(f,v["threshold"],font=FS,height=26,width=50).grid(row=0,column=3,padx=4)
+        unit.grid(row=0,column=4,padx=(0,4)); _unit()
+        _lbl(f,"cooldown",font=FS,color=TEXT_SEC).grid(row=0,column=5,padx=(4,2))
+        _entry(f,v["cooldown_min"],font=FS,height=26,width=40).grid(row=0,column=6)
+        _lbl(f,"min",font=FS,color=TEXT_SEC).grid(row=0,column=7,padx=(2,4))
+        row=(f,v); self._rows.append(row)
+        _btn(f,"✕",lambda:self._remove(row),fg="#6e2020",hov="#8b2a2a",w=26,h=26,font=FS).grid(row=0,column=8,padx=(0,8))
+
+    def _remove(self, row):
+        self._rows.remove(row); row[0].destroy()
+        for i,(f,_) in enumerate(self._rows): f.grid(row=i,column=0,sticky="ew",pady=2)
+
+    def _tick(self):
+        try:
+            if not self.winfo_exists(): return
+        except tk.TclError: return
+        log=self.app.alert_log; last=log[-1] if log else None
+        if last is not self._shown:
+            self._shown=last
+            txt="\n".join(f"{time.strftime('%H:%M:%S',time.localtime(a.at))}  [{a.rule}] {a.name}: {a.message}"
+                           for a in reversed(log)) or "No alerts yet."
+            self._tb.configure(state="normal"); self._tb.delete("1.0","end"); self._tb.insert("1.0",txt); self._tb.configure(state="disabled")
+        self.after(self.REFRESH_MS,self._tick)
+
+    def _save(self):
+        rules=[]
+        for _,v in self._rows:
+            name=v["name"].get().strip()
+            try:
+                th,cd=float(v["threshold"].get()),float(v["cooldown_min"].get()); assert th>0 and cd>=0
+            except: show_error(f"Rule '{name or '?'}': threshold must be a positive number and cooldown 0 or more."); return
+            if not name: show_error("Every rule needs a name."); return
+            rules.append(cfg.AlertRule(name,self._kinds[v["kind"].get()],th,cd,v["enabled"].get()))
+        if len({r.name for r in rules})<len(rules): show_error("Rule names must be unique."); return
+        hook=self._hook.get().strip()
+        if hook and not hook.startswith(("http://","https://")): show_error("The webhook URL must start with http:// or https://"); return
+        conf=cfg.AlertConfig(rules,hook); cfg.save_alerts(conf); self.app.set_alerts(conf)
+        show_info("Alert rules saved.")
+
+
 class GuidePage(ctk.CTkFrame):
     def __init__(self, parent, app):
         super().__init__(parent,fg_color="transparent"); self._build()
@@ -422,10 +995,13 @@ class AccountOverviewPage(ctk.CTkFrame):
         bar=ctk.CTkFrame(self,fg_color=BG_MID,corner_radius=0,height=52)
         bar.grid(row=1,column=0,sticky="ew"); bar.grid_propagate(False)
         _btn(bar,"Import Account",self._import,w=130,font=FS).pack(side="left",padx=(12,4),pady=9)
+        _btn(bar,"Bulk Import…",lambda:BulkImportDialog(self,self.app),w=105,font=FS).pack(side="left",padx=4,pady=9)
         _btn(bar,"Refresh Active Account",self._refresh_active,w=165,font=FS).pack(side="left",padx=4,pady=9)
         _btn(bar,"Delete",self._delete,fg="#6e2020",hov="#8b2a2a",w=80,font=FS).pack(side="left",padx=4,pady=9)
         _btn(bar,"Switch to Account",self._switch,fg=ACCENT,hov="#388bfd",w=140,font=FS).pack(side="left",padx=4,pady=9)
+        _btn(bar,"Groups…",lambda:GroupsDialog(self,self.app),w=80,font=FS).pack(side="right",padx=12,pady=9)
 
+    @perf.timed("ui.overview_refresh")
     def refresh(self, sel_only=False):
         cur=[a.id for a in self.app.accounts]; cached=list(self._rows.keys())
         if not sel_only and cur!=cached:
@@ -469,6 +1045,12 @@ class AccountOverviewPage(ctk.CTkFrame):
         m.add_command(label="Set Client Arguments",command=lambda:self._set_args(acc))
         pl=f"Override HTTP Port  (pinned: {acc.http_port})" if acc.http_port else "Override HTTP Port  (auto)"
         m.add_command(label=pl,command=lambda:self._set_port(acc))
+        jm=tk.Menu(m,tearoff=0,bg=BG_MID,fg=TEXT_PRI,activebackground=BG_HOVER,activeforeground=TEXT_PRI,relief="flat",bd=1)
+        jv=tk.StringVar(value=acc.jvm_profile)
+        for name in [""]+sorted(cfg.load_jvm_profiles(),key=str.lower):
+            jm.add_radiobutton(label=name or "Global JVM arguments",variable=jv,value=name,command=lambda n=name:self._set_jvm(acc,n))
+        m.add_cascade(label=f"JVM Profile  ({acc.jvm_profile or 'global'})",menu=jm)
+        m.add_command(label=f"Set Groups  ({', '.join(acc.groups) or 'none'})",command=lambda:self._set_groups(acc))
         m.add_separator()
         m.add_command(label="Rename",command=lambda:self._rename(acc))
         m.add_command(label="Refresh Credentials",command=self._refresh_active)
@@ -506,7 +1088,7 @@ class AccountOverviewPage(ctk.CTkFrame):
         try: sw.import_current_credentials(acc,s)
         except sw.SwitcherError as e: show_error(str(e)); return
         self.app.accounts.append(acc); self.app.save(); self.refresh()
-        self.app.handler_page.refresh(); show_info(f"Imported account: {name}")
+        self.app.refresh_handler(); show_info(f"Imported account: {name}")
 
     def _refresh_active(self):
         acc=self._get_sel()
@@ -519,8 +1101,9 @@ class AccountOverviewPage(ctk.CTkFrame):
         acc=self._get_sel()
         if not acc: return
         if not ask_yn("Delete account",f"Delete '{acc.display_name}'?"): return
-        self.app.accounts=[a for a in self.app.accounts if a.id!=acc.id]
-        self._sel=None; self._rows.clear(); self.app.save(); self.refresh(); self.app.handler_page.refresh()
+        self.app.accounts=[a for a in self.app.accounts if a.id!=acc.id]; grp.index.remove(acc.id)
+        self._sel=None; self._rows.clear(); self.app.save(); self.refresh(); self.app.refresh_handler()
+        if acc.groups: self.app.refresh_groups()
 
     def _switch(self):
         acc=self._get_sel()
@@ -533,23 +1116,32 @@ class AccountOverviewPage(ctk.CTkFrame):
     def _set_args(self, acc):
         d=ClientArgsDialog(self,acc); self.wait_window(d)
         if d.result is not None:
-            acc.client_args=d.result; self.app.save(); self.refresh(); self.app.handler_page.refresh()
+            acc.client_args=d.result; self.app.save(); self.refresh(); self.app.refresh_handler()
 
     def _set_port(self, acc):
         d=HttpPortDialog(self,acc); self.wait_window(d)
         if d.result is not None:
             acc.http_port=d.result; self.app.save(); self.refresh()
-            self.app.handler_page.refresh(); self.app.bot_status_page._refresh_cards()
+            self.app.refresh_handler(); self.app.refresh_bot_cards()
+
+    def _set_jvm(self, acc, name):
+        acc.jvm_profile=name; self.app.save()
+
+    def _set_groups(self, acc):
+        d=AccountGroupsDialog(self,acc); self.wait_window(d)
+        if d.result is not None and d.result!=acc.groups:
+            grp.index.set_groups(acc,d.result); self.app.save(); self.app.refresh_groups()
 
     def _rename(self, acc):
         d=RenameDialog(self,acc.display_name); self.wait_window(d)
         if d.result:
-            acc.display_name=d.result; self.app.save(); self.refresh(); self.app.handler_page.refresh()
+            acc.display_name=d.result; self.app.save(); self.refresh(); self.app.refresh_handler()
 
 
 # ── Account Handler ───────────────────────────────────────────────────────────
 class AccountHandlerPage(ctk.CTkFrame):
     _COL_W=[(0,3),(1,1),(2,1),(3,2),(4,1)]
+    ALL="All accounts"
 
     def __init__(self, parent, app):
         super().__init__(parent,fg_color="transparent")
@@ -573,12 +1165,20 @@ class AccountHandlerPage(ctk.CTkFrame):
         self._bl.pack(side="left",padx=(12,4),pady=9)
         self._bla=_btn(bar,"▶ Launch All",self._launch_all,fg="#1a5e2a",hov="#238636",w=115,font=FS)
         self._bla.pack(side="left",padx=4,pady=9)
-        _btn(bar,"■ Kill",self._kill,fg="#6e2020",hov="#8b2a2a",w=80,font=FS).pack(side="left",padx=4,pady=9)
-        _btn(bar,"■ Kill All",self._kill_all,fg="#4a1010",hov="#6e2020",w=90,font=FS).pack(side="left",padx=4,pady=9)
+        self._bk=_btn(bar,"■ Kill",self._kill,fg="#6e2020",hov="#8b2a2a",w=80,font=FS); self._bk.pack(side="left",padx=4,pady=9)
+        self._bka=_btn(bar,"■ Kill All",self._kill_all,fg="#4a1010",hov="#6e2020",w=90,font=FS); self._bka.pack(side="left",padx=4,pady=9)
+        # Launch All / Kill All apply to every account or to one group
+        self._scope=ctk.StringVar(value=self.ALL)
+        self._scope_menu=ctk.CTkOptionMenu(bar,variable=self._scope,values=[self.ALL],width=130,height=28,font=FS,
+            fg_color=BG_DARK,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2)
+        self._scope_menu.pack(side="left",padx=4,pady=9); self.refresh_scope()
+        _btn(bar,"🕒 Schedule…",lambda:ScheduleDialog(self,self.app),w=100,font=FS).pack(side="right",padx=12,pady=9)
+        _btn(bar,"📜 Journal…",lambda:JournalDialog(self),w=95,font=FS).pack(side="right",padx=(4,0),pady=9)
         dw=ctk.CTkFrame(bar,fg_color="transparent"); dw.pack(side="left",padx=(18,4),pady=9)
-        _lbl(dw,"Delay between launches (ms):",font=FS,color=TEXT_SEC).pack(side="left",padx=(0,6))
+        _lbl(dw,"Delay (ms):",font=FS,color=TEXT_SEC).pack(side="left",padx=(0,6))
         self._ds=Spinner(dw,min_val=0,max_val=30000,step=100,initial=1000,width=70); self._ds.pack(side="left")
 
+    @perf.timed("ui.handler_refresh")
     def refresh(self):
         self._rw.clear()
         for w in self.lf.winfo_children():
@@ -607,7 +1207,7 @@ class AccountHandlerPage(ctk.CTkFrame):
         al.grid(row=rn,column=3,sticky="ew",ipady=9)
         sv=tk.BooleanVar(value=acc.skip_launch)
         def _on_skip(a=acc,v=sv):
-            a.skip_launch=v.get(); self.app.save(); self.refresh(); self.app.bot_status_page._refresh_cards()
+            a.skip_launch=v.get(); self.app.save(); self.refresh(); self.app.refresh_bot_cards()
         ctk.CTkCheckBox(self.lf,text="",variable=sv,command=_on_skip,width=20,height=20,
             checkbox_width=18,checkbox_height=18,fg_color=ACCENT,hover_color="#388bfd",
             border_color=BTN_GRAY2,bg_color=bg).grid(row=rn,column=4,sticky="",pady=9)
@@ -653,21 +1253,7 @@ class AccountHandlerPage(ctk.CTkFrame):
             self._bl.configure(state="normal",fg_color="#238636",hover_color="#2ea043",text="▶ Launch")
             self._bla.configure(state="normal",fg_color="#1a5e2a",hover_color="#238636",text="▶ Launch All")
 
-    def _wait_login(self, acc, deadline):
-        import urllib.request
-        nl=acc.display_name.strip().lower()
-        def _find():
-            ports=[acc.http_port] if acc.http_port else range(7070,7200)
-            for port in ports:
-                try:
-                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/status",timeout=0.1) as r:
-                        d=_json.loads(r.read())
-                    if d.get("playerName","").strip().lower()==nl: return d.get("loginState","")
-                except: pass
-        while time.time()<deadline:
-            if _find()=="LOGGED_IN": return True
-            time.sleep(2)
-        return False
+    def _wait_login(self, acc, deadline): return mon.wait_login(acc.display_name,acc.http_port,deadline)
 
     def _do_launch(self, acc, sequential=False, unlock=False):
         try:
@@ -675,7 +1261,8 @@ class AccountHandlerPage(ctk.CTkFrame):
             sw.launch(acc,self.app.settings,protect_process=self.app.settings.protect_process)
             self.app.after(0,self.refresh)
             if sequential or unlock:
-                if not self._wait_login(acc,time.time()+180): time.sleep(30)
+                if self._wait_login(acc,time.time()+180): jr.journal.login(acc)
+                else: jr.journal.login_timeout(acc); time.sleep(30)
             else:
                 time.sleep(3)
         except sw.SwitcherError as e: self.app.after(0,lambda err=e:show_error(str(err)))
@@ -690,23 +1277,42 @@ class AccountHandlerPage(ctk.CTkFrame):
         self._lock(True,acc.display_name)
         threading.Thread(target=self._do_launch,args=(acc,),kwargs={"unlock":True},daemon=True).start()
 
+    def refresh_scope(self):
+        vals=[self.ALL]+grp.index.names(); self._scope_menu.configure(values=vals)
+        if self._scope.get() not in vals: self._scope.set(self.ALL)
+
+    def _scope_accounts(self):
+        g=self._scope.get()
+        return list(self.app.accounts) if g==self.ALL else grp.index.members(g)
+
     def _launch_all(self):
         if self._launching: return
-        accs=[a for a in self.app.accounts if not sw.is_running(a) and not a.skip_launch]
-        if not accs: show_info("All non-skipped accounts are already running (or all accounts are set to skip)."); return
-        dm=self._ds.get(); self._cancel=False; self._lock(True,accs[0].display_name)
+        g=self._scope.get(); whole=g==self.ALL
+        accs=[a for a in self._scope_accounts() if not sw.is_running(a) and not a.skip_launch]
+        if not accs:
+            show_info("All non-skipped accounts are already running (or all accounts are set to skip)." if whole
+                      else f"Every non-skipped account in '{g}' is already running."); return
+        # A group launch keeps up to its launch concurrency clients booting at once; launches stay dm apart
+        conc=1 if whole else min(grp.index.launch_concurrency(g),len(accs))
+        dm=self._ds.get()/1000.0; self._cancel=False; self._lock(True,accs[0].display_name)
+        queue=list(reversed(accs)); gate=threading.Lock(); nxt=[0.0]
+        def _worker():
+            while not self._cancel:
+                with gate:
+                    if not queue: return
+                    first=len(queue)==len(accs); acc=queue.pop(); now=time.time()
+                    wait=0.0 if first else max(dm,nxt[0]-now); nxt[0]=now+wait+dm
+                el=0
+                while el<wait:
+                    if self._cancel: return
+                    time.sleep(0.1); el+=0.1
+                if self._cancel: return
+                self._do_launch(acc,sequential=True)
         def _do():
             try:
-                for i,acc in enumerate(accs):
-                    if self._cancel: break
-                    self.app.after(0,lambda n=acc.display_name:self._lock(True,n))
-                    if i>0 and dm>0:
-                        el=0
-                        while el<dm/1000.0:
-                            if self._cancel: break
-                            time.sleep(0.1); el+=0.1
-                    if self._cancel: break
-                    self._do_launch(acc,sequential=True)
+                ws=[threading.Thread(target=_worker,daemon=True) for _ in range(conc)]
+                for w in ws: w.start()
+                for w in ws: w.join()
             finally: self.app.after(0,lambda:self._lock(False))
         threading.Thread(target=_do,daemon=True).start()
 
@@ -714,60 +1320,118 @@ class AccountHandlerPage(ctk.CTkFrame):
         acc=self._get_sel()
         if not acc: return
         if not sw.is_running(acc): show_error(f"'{acc.display_name}' is not running."); return
-        try: sw.kill(acc); self.refresh()
-        except sw.SwitcherError as e: show_error(str(e))
+        self._stop_clients([acc])
 
     def _kill_all(self):
-        run=[a for a in self.app.accounts if sw.is_running(a)]
-        if not run: show_info("No clients are running."); return
-        if not ask_yn("Kill all",f"Kill all {len(run)} running clients?"): return
+        g=self._scope.get(); where="" if g==self.ALL else f" in '{g}'"
+        run=[a for a in self._scope_accounts() if sw.is_running(a)]
+        if not run: show_info(f"No clients{where} are running."); return
+        if not ask_yn("Kill all",f"Kill all {len(run)} running clients{where}?"): return
         self._cancel=True; self._lock(False)
-        for acc in run:
-            try: sw.kill(acc)
-            except: pass
-        self.refresh()
+        self._stop_clients(run)
+
+    def _stop_clients(self, accs):
+        """sw.shutdown off the Tk thread; the outcome is reported when every client has exited or been killed."""
+        self._bk.configure(state="disabled",text="⏳ Stopping…"); self._bka.configure(state="disabled")
+        def _do():
+            res=sw.shutdown(accs)
+            self.app.after(0,lambda:self._stopped(accs,res))
+        threading.Thread(target=_do,daemon=True).start()
+
+    def _stopped(self, accs, res):
+        self._bk.configure(state="normal",text="■ Kill"); self._bka.configure(state="normal"); self.refresh()
+        out=res["outcomes"]; by={}
+        for a in accs:
+            by.setdefault(out.get(a.id,sw.GONE),[]).append(a.display_name)
+            if out.get(a.id)!=sw.STUCK: self.app.alerts.forget(a.id)  # stopped on purpose: not "offline"
+        if len(accs)==1 and sw.STUCK not in by and sw.KILLED not in by: return
+        lines=[f"Stopped {len(accs)-len(by.get(sw.STUCK,[]))} of {len(accs)} client(s) in {res['elapsed_s']:.1f}s."]
+        for k,label in ((sw.STOPPED,"Exited cleanly"),(sw.KILLED,"Force-killed after the grace period"),
+                        (sw.GONE,"Already gone"),(sw.STUCK,"Still running")):
+            if by.get(k): lines.append(f"\n{label} ({len(by[k])}): "+", ".join(by[k][:12])+(" …" if len(by[k])>12 else ""))
+        (show_error if sw.STUCK in by else show_info)("\n".join(lines))
 
 
 # ── _ClientCard ───────────────────────────────────────────────────────────────
 class _ClientCard(ctk.CTkFrame):
-    POLL_MS=6000
+    RETRY_MS=500  # pinned-port poll retry when the fleet request budget is spent; intervals come from mon.poller
 
-    def __init__(self, parent, app, account):
+    def __init__(self, parent, app, account, feeds_alerts=True):
         super().__init__(parent,fg_color=BG_MID,corner_radius=8,border_width=1,border_color=BORDER)
-        self.app=app; self.account=account; self._alive=True
-        self._plugin_rows={}; self._auto_port=None; self._last_plugins=[]
-        self._last_log=""; self._offline_ticks=0; self._build()
+        self.app=app; self.account=account; self._alive=True; self._feeds_alerts=feeds_alerts
+        self._plugin_rows={}; self._row_state={}; self._rendered={}; self._auto_port=None; self._last_plugins=[]
+        self._last_log=""; self._offline_ticks=0; self._in_view=False; self._poll_job=None; self._polling=False
+        self._build(); self._apply_alerts()
         if account.http_port: self._self_poll()
 
     def update_account(self, account):
         op=self.account.http_port; self.account=account; self._update_port_lbl()
         if account.http_port and not op: self._self_poll()
 
+    def _on_screen(self):
+        vis=getattr(self.master,"is_visible",None)  # absent when the card sits in its own window
+        return self._alive and (vis(self) if vis else bool(self.winfo_ismapped()))
+
+    def set_in_view(self, v):
+        """Tk thread: the page reports whether the card overlaps the scroll viewport.
+        Pollers read _in_view to decide between a full poll and a /status heartbeat."""
+        was=self._in_view; self._in_view=v
+        if not v or was or not self._alive: return
+        # Just scrolled into view — fetch full detail now rather than on the next tick
+        if self.account.http_port:
+            if self._poll_job: self.after_cancel(self._poll_job); self._poll_job=None
+            if not self._polling: self._self_poll()
+        elif self._auto_port: self._fetch_detail(self._auto_port)
+
+    def _fetch_detail(self, port):
+        def _bg():
+            snap=mon.snapshot(port)
+            if not snap or not self._alive or port!=self._auto_port: return
+            mon.catalog.observe(port,snap["plugins"]); self._post_view(snap["status"],snap["plugins"],snap["logs"])
+        threading.Thread(target=_bg,daemon=True).start()
+
+    def _post_view(self, status, plugins, logs, detail=True):
+        """Queue a view update; coalesces with any update still pending for this card.
+        With detail=False only the status widgets are touched (heartbeat poll)."""
+        def _a():
+            if not self._alive: return
+            self._update_port_lbl()
+            if detail: self._apply_log(logs or [])
+            self._apply_status(status)
+            if detail: self._apply_plugins(plugins)
+        self.app.bus.post((id(self),"view"),_a,self._on_screen)
+
     def push_scan_result(self, port, status, plugins, logs=None):
+        """plugins is None when the scan only sent this card a /status heartbeat."""
         if not self._alive: return
         self._auto_port=port; self._offline_ticks=0
-        def _a():
-            self._update_port_lbl(); self._apply_log(logs or [])
-            self._apply_status(status); self._apply_plugins(plugins)
-        self.after(0,_a)
+        self._post_view(status,plugins,logs,plugins is not None)
+        # Scrolled into view while the scan was in flight — don't wait for the next one
+        if plugins is None and self._in_view: self._fetch_detail(port)
 
     def push_offline(self):
         if not self._alive or self.account.http_port: return
         self._offline_ticks+=1
         if self._offline_ticks<3: return
         self._auto_port=None
-        def _a():
-            self._update_port_lbl(); self._apply_log([])
-            self._apply_status(None); self._apply_plugins(None)
-        self.after(0,_a)
+        self._post_view(None,None,[])
+
+    def post_alerts(self):
+        """Thread-safe: the account's active alerts changed."""
+        if self._alive: self.app.bus.post((id(self),"alerts"),self._apply_alerts,self._on_screen)
+
+    def _apply_alerts(self):
+        if not self._alive: return
+        act=self.app.alerts.active(self.account.id)
+        self._render("alerts","⚠ "+", ".join(act) if act else "",lambda t:self._albl.configure(text=t))
 
     def destroy_card(self): self._alive=False; self.destroy()
     def _port(self): return self.account.http_port or self._auto_port
 
     def _update_port_lbl(self):
         p=self._port()
-        if p: self._plbl.configure(text=f":{p}{'' if self.account.http_port else ' (auto)'}")
-        else: self._plbl.configure(text="Scanning..." if not self.account.http_port else "No port set")
+        t=f"{mon.port_label(p)}{'' if self.account.http_port else ' (auto)'}" if p else ("Scanning..." if not self.account.http_port else "No port set")
+        self._render("port",t,lambda t:self._plbl.configure(text=t))
 
     def _build(self):
         self.grid_columnconfigure(0,weight=1)
@@ -777,7 +1441,8 @@ class _ClientCard(ctk.CTkFrame):
         self._dot.create_oval(2,2,8,8,fill=TEXT_SEC,outline="",tags="dot")
         self._dot.grid(row=0,column=0,padx=(12,6),pady=15)
         self._clbl=_lbl(hdr,self.account.display_name,font=FH); self._clbl.grid(row=0,column=1,sticky="w")
-        self._plbl=_lbl(hdr,"",font=FS,color=TEXT_SEC); self._plbl.grid(row=0,column=2,padx=(0,12))
+        self._albl=_lbl(hdr,"",font=FS,color="#FFA500"); self._albl.grid(row=0,column=2,padx=(0,8))
+        self._plbl=_lbl(hdr,"",font=FS,color=TEXT_SEC); self._plbl.grid(row=0,column=3,padx=(0,12))
         self._update_port_lbl()
         # Fixed-height stat row — never resizes regardless of content
         stat=ctk.CTkFrame(self,fg_color=BG_TABLE,corner_radius=0,height=56)
@@ -806,24 +1471,41 @@ class _ClientCard(ctk.CTkFrame):
         self._pf.grid(row=4,column=0,sticky="ew"); self._pf.grid_columnconfigure(0,weight=1)
         self._ep=_lbl(self._pf,"No managed plugins. Configure them in Plugin Manager.",font=FS,color=TEXT_SEC,justify="center")
         self._ep.grid(row=0,column=0,pady=10,padx=12,sticky="w")
+        self._vw={"title":self._clbl,"world":self._wv,"hp":self._hv,"uptime":self._uv,"profit":self._pv,"script":self._slbl}
 
     def _self_poll(self):
-        if not self._alive or not self.account.http_port: return
-        p=self.account.http_port
+        self._poll_job=None
+        if not self._alive or not self.account.http_port or self._polling: return
+        p=self.account.http_port; detail=self._in_view
+        # While the client pushes its changes (_FleetWatch._on_push) only check now and then that the stream is still up
+        if mon.push.live(p): self._poll_job=self.after(int(mon.poller.OFFSCREEN*1000),self._self_poll); return
+        if not mon.budget.take(3 if detail else 1): self._poll_job=self.after(self.RETRY_MS,self._self_poll); return
+        self._polling=True
         def _bg():
-            st=_http_get(p,"/status"); pl=_http_get(p,"/plugins") or []; lg=_http_get(p,"/logs") or []
-            if not self._alive: return
+            iv=mon.poller.BASE
             try:
-                self.after(0,lambda:self._apply_log(lg))
-                self.after(0,lambda:self._apply_status(st))
-                self.after(0,lambda:self._apply_plugins(pl))
-                self.after(self.POLL_MS,self._self_poll)
-            except: pass
+                with perf.stage("poll" if detail else "poll.heartbeat"):
+                    snap=mon.snapshot(p,detail) or {"status":None,"plugins":[],"logs":[]}
+                mon.catalog.observe(p,snap["plugins"]); iv=mon.poller.observe(p,snap["status"],self._in_view,grp.index.poll_scale(self.account))
+                if snap["status"]: mon.push.subscribe(p)
+                if not self._alive: return
+                if self._feeds_alerts:
+                    if snap["status"]: self.app.observe(self.account,snap["status"],snap["logs"])
+                    else: self.app.observe_missing(self.account)
+                self._post_view(snap["status"],snap["plugins"],snap["logs"],snap["plugins"] is not None)
+            finally: self._polling=False
+            self.app.bus.post((id(self),"poll"),lambda:self._schedule_poll(detail,iv))
         threading.Thread(target=_bg,daemon=True).start()
 
+    def _schedule_poll(self, was_detail=True, interval=0.0):
+        if not self._alive or self._poll_job or self._polling: return
+        # A heartbeat that finished after the card scrolled into view is followed by a full poll at once
+        ms=0 if self._in_view and not was_detail else int(interval*1000)
+        self._poll_job=self.after(ms,self._self_poll)
+
     def _do_post(self, path, body=None):
         p=self._port()
-        if p: threading.Thread(target=_http_post,args=(p,path,body),daemon=True).start()
+        if p: threading.Thread(target=mon.http_post,args=(p,path,body),daemon=True).start()
 
     def _apply_log(self, lines):
         if not lines: self._last_log=""; return
@@ -844,49 +1526,67 @@ class _ClientCard(ctk.CTkFrame):
         else:            t=f"{s}{v:,} gp"
         return t,c
 
-    def _apply_status(self, d):
+    @staticmethod
+    def _fmt_rate(per_h):
+        return "—" if per_h is None else _ClientCard._fmt_profit(int(per_h))[0]+"/h"
+
+    @staticmethod
+    def _status_view(name, d, last_log, plugins, rate=None):
+        """View-model for the header, stat row and script label: key -> (text, color); "dot" -> color.
+        ``rate`` is the profit per hour shown next to the total."""
         if d is None:
-            self._dot.itemconfig("dot",fill=TEXT_SEC)
-            self._clbl.configure(text=f"{self.account.display_name}  (offline)",text_color=TEXT_SEC)
-            for l in (self._wv,self._hv,self._uv): l.configure(text="—",text_color=TEXT_PRI)
-            self._pv.configure(text="—",text_color=TEXT_SEC)
-            self._slbl.configure(text="Script: —",text_color=TEXT_SEC); return
-        self._dot.itemconfig("dot",fill=GREEN)
-        self._clbl.configure(text=f"{self.account.display_name}  ({d.get('playerName','Unknown')})",text_color=TEXT_PRI)
+            return {"dot":TEXT_SEC,"title":(f"{name}  (offline)",TEXT_SEC),"world":("—",TEXT_PRI),
+                "hp":("—",TEXT_PRI),"uptime":("—",TEXT_PRI),"profit":("—",TEXT_SEC),"script":("Script: —",TEXT_SEC)}
         w=d.get("world",0); hp=d.get("hp",0); mhp=d.get("maxHp",0)
         up=d.get("uptimeSeconds",0); paused=d.get("paused",False)
         script=d.get("scriptStatus","IDLE"); profit=d.get("profitGp",None)
-        self._wv.configure(text=str(w) if w else "—")
-        self._hv.configure(text=f"{hp}/{mhp}" if mhp else "—",
-            text_color=RED if mhp and hp<mhp*0.3 else TEXT_PRI)
         h,m,s=up//3600,(up%3600)//60,up%60
-        self._uv.configure(text=f"{h}h {m}m" if h else f"{m}m {s}s")
-        if profit is not None:
-            t,c=self._fmt_profit(int(profit)); self._pv.configure(text=t,text_color=c)
+        v={"dot":GREEN,"title":(f"{name}  ({d.get('playerName','Unknown')})",TEXT_PRI),
+            "world":(str(w) if w else "—",TEXT_PRI),
+            "hp":(f"{hp}/{mhp}" if mhp else "—",RED if mhp and hp<mhp*0.3 else TEXT_PRI),
+            "uptime":(f"{h}h {m}m" if h else f"{m}m {s}s",TEXT_PRI),
+            "profit":_ClientCard._fmt_profit(int(profit)) if profit is not None else ("—",TEXT_SEC)}
+        if profit is not None and rate is not None: v["profit"]=(f"{v['profit'][0]} · {_ClientCard._fmt_rate(rate)}",v["profit"][1])
+        if paused: v["script"]=("Script: ⏸ PAUSED","#FFA500")
+        elif last_log: v["script"]=(f"Script: {last_log}",GREEN)
         else:
-            self._pv.configure(text="—",text_color=TEXT_SEC)
-        if paused: self._slbl.configure(text="Script: ⏸ PAUSED",text_color="#FFA500"); return
-        if self._last_log: self._slbl.configure(text=f"Script: {self._last_log}",text_color=GREEN); return
-        ds=script
-        if script in ("IDLE",""):
-            if any(p.get("active",False) and any(k in p.get("className","").lower()
-                   for k in ("dropparty","drop_party","babydropparty")) for p in self._last_plugins):
-                ds="DROP PARTY"
-        self._slbl.configure(text=f"Script: {ds}",text_color=GREEN if ds not in ("IDLE","") else TEXT_SEC)
+            ds=script
+            if script in ("IDLE",""):
+                if any(p.get("active",False) and any(k in p.get("className","").lower()
+                       for k in ("dropparty","drop_party","babydropparty")) for p in plugins):
+                    ds="DROP PARTY"
+            v["script"]=(f"Script: {ds}",GREEN if ds not in ("IDLE","") else TEXT_SEC)
+        return v
+
+    def _render(self, key, val, apply):
+        """Call ``apply(val)`` only if ``val`` differs from what ``key`` last rendered."""
+        if self._rendered.get(key)==val: perf.count("ui.card_configure_skipped"); return
+        self._rendered[key]=val; apply(val); perf.count("ui.card_configure")
+
+    @perf.timed("ui.card_status")
+    def _apply_status(self, d):
+        rate=rt.tracker.rates(self.account.id).get("profit",{}).get("1h") if d else None
+        v=self._status_view(self.account.display_name,d,self._last_log,self._last_plugins,rate)
+        self._render("dot",v.pop("dot"),lambda c:self._dot.itemconfig("dot",fill=c))
+        for key,tc in v.items():
+            self._render(key,tc,lambda tc,w=self._vw[key]:w.configure(text=tc[0],text_color=tc[1]))
 
+    @perf.timed("ui.card_plugins")
     def _apply_plugins(self, data):
         self._last_plugins=data or []
         managed=sorted([p for p in (data or []) if p.get("className","") in _managed_plugins],
             key=lambda p:p.get("name",p.get("className","")).lower())
         if not managed:
             for cls in list(self._plugin_rows): self._plugin_rows.pop(cls)[0].destroy()
-            self._plugin_rows.clear(); self._ep.grid(row=0,column=0,pady=10,padx=12,sticky="w"); return
+            self._plugin_rows.clear(); self._row_state.clear(); self._ep.grid(row=0,column=0,pady=10,padx=12,sticky="w"); return
         self._ep.grid_remove(); seen=set()
         for idx,plug in enumerate(managed):
             cls=plug.get("className",""); name=plug.get("name",cls.split(".")[-1])
             active=plug.get("active",False); seen.add(cls)
             bg=BG_ROW if idx%2==0 else BG_TABLE
             bt="■ Stop" if active else "▶ Start"; bf="#6e2020" if active else "#1a5e2a"; bh="#8b2a2a" if active else "#238636"
+            if self._row_state.get(cls)==(idx,active): perf.count("ui.card_configure_skipped"); continue
+            self._row_state[cls]=(idx,active); perf.count("ui.card_configure")
             if cls in self._plugin_rows:
                 rf,btn,dot=self._plugin_rows[cls]; rf.grid(row=idx,column=0,sticky="ew")
                 dot.itemconfig("dot",fill=GREEN if active else TEXT_SEC)
@@ -901,23 +1601,25 @@ class _ClientCard(ctk.CTkFrame):
                 btn=_btn(rf,bt,lambda c=cls,a=active:self._toggle(c,a),fg=bf,hov=bh,w=68,h=22,font=FS)
                 btn.grid(row=0,column=2,padx=8); self._plugin_rows[cls]=(rf,btn,dot)
         for cls in list(self._plugin_rows):
-            if cls not in seen: self._plugin_rows.pop(cls)[0].destroy()
+            if cls not in seen: self._plugin_rows.pop(cls)[0].destroy(); self._row_state.pop(cls,None)
 
     def _toggle(self, cls, active):
         p=self._port()
         if not p: return
         # Optimistic instant UI flip — no re-render, next scan corrects if needed
-        row=self._plugin_rows.get(cls)
+        row=self._plugin_rows.get(cls); self._row_state.pop(cls,None)
         if row:
             rf,btn,dot=row; new_active=not active
             bt="■ Stop" if new_active else "▶ Start"
             bf="#6e2020" if new_active else "#1a5e2a"; bh="#8b2a2a" if new_active else "#238636"
             dot.itemconfig("dot",fill=GREEN if new_active else TEXT_SEC)
             btn.configure(text=bt,fg_color=bf,hover_color=bh,command=lambda c=cls,a=new_active:self._toggle(c,a))
-        threading.Thread(target=_http_post,args=(p,"/plugins/stop" if active else "/plugins/start",{"className":cls}),daemon=True).start()
+        threading.Thread(target=mon.http_post,args=(p,"/plugins/stop" if active else "/plugins/start",{"className":cls}),daemon=True).start()
 
     def _expand(self):
         def _do():
+            # Window APIs are only needed here — importing them lazily keeps them off the startup path
+            import win32gui, win32con, win32process, psutil
             pid=sw.get_pid(self.account)
             if pid is None: return
             hwnd=None
@@ -962,65 +1664,304 @@ class _ClientCard(ctk.CTkFrame):
         active=[cls for cls,(_,btn,__) in self._plugin_rows.items() if btn.cget("text")=="■ Stop"]
         if not active: return
         # Optimistic: show all as stopped immediately, re-start fires in background
-        for cls in active:
-            row=self._plugin_rows.get(cls)
-            if row:
-                rf,btn,dot=row
-                dot.itemconfig("dot",fill=TEXT_SEC)
-                btn.configure(text="▶ Start",fg_color="#1a5e2a",hover_color="#238636",
-                    command=lambda c=cls:self._toggle(c,False))
+        for cls in active: self._paint_row(cls,False)
         def _bg():
-            for cls in active: _http_post(p,"/plugins/stop",{"className":cls})
-            time.sleep(1.2)
-            for cls in active: _http_post(p,"/plugins/start",{"className":cls})
+            # Restart is confirmed from the client's own plugin state, not a fixed sleep
+            res=mon.bulk_plugin_op([p],active,"restart").get(p,{})
             if not self._alive: return
-            # After restart, flip dots/buttons back to active
-            def _reactivate():
-                for cls in active:
-                    row=self._plugin_rows.get(cls)
-                    if row:
-                        rf,btn,dot=row
-                        dot.itemconfig("dot",fill=GREEN)
-                        btn.configure(text="■ Stop",fg_color="#6e2020",hover_color="#8b2a2a",
-                            command=lambda c=cls:self._toggle(c,True))
-            try: self.after(0,_reactivate)
+            # Failed: show what the client reports now, or what it showed before if it does not answer
+            states=None if res.get("ok") else mon.plugin_states(p,active)
+            def _done():
+                if not self._alive: return
+                for cls in active: self._paint_row(cls,True if states is None else states.get(cls,False))
+                if not res.get("ok"): show_error(f"Restart on {self.account.display_name} failed: {res.get('error') or 'no reply'}")
+            try: self.after(0,_done)
             except RuntimeError: pass
         threading.Thread(target=_bg,daemon=True).start()
 
+    def _paint_row(self, cls, active):
+        """Show one plugin row as running or stopped until the next poll re-renders it."""
+        row=self._plugin_rows.get(cls); self._row_state.pop(cls,None)
+        if not row: return
+        rf,btn,dot=row
+        dot.itemconfig("dot",fill=GREEN if active else TEXT_SEC)
+        btn.configure(text="■ Stop" if active else "▶ Start",fg_color="#6e2020" if active else "#1a5e2a",
+            hover_color="#8b2a2a" if active else "#238636",command=lambda c=cls,a=active:self._toggle(c,a))
+
     def _reset_profit(self):
         p=self._port()
         if not p: show_error("Client is offline — cannot reset profit."); return
+        rt.tracker.expect_reset(self.account.id)  # the coming drop in profitGp is not a loss
         def _bg():
-            ok=_http_post(p,"/profit/reset")
+            ok=mon.http_post(p,"/profit/reset")
             if not self._alive: return
             try:
-                if ok: self.after(0,lambda:self._pv.configure(text="0 gp",text_color=TEXT_SEC))
+                if ok: self.after(0,lambda:self._render("profit",("0 gp",TEXT_SEC),lambda tc:self._pv.configure(text=tc[0],text_color=tc[1])))
                 else: self.after(0,lambda:show_error("Could not reach client.\nMake sure the BabyTank HTTP Server plugin is running."))
             except RuntimeError: pass
         threading.Thread(target=_bg,daemon=True).start()
 
 
+# ── Compact fleet table ───────────────────────────────────────────────────────
+class _FleetTable(ctk.CTkFrame):
+    """One canvas row per client. Only rows inside the viewport are drawn, in a single pass."""
+    ROW_H=24; HEAD_H=26
+    # (title, row key, sort key, width) — width 0 stretches to fill
+    COLS=(("","dot","online",26),("Account","name","name_v",150),("Host","host","host_v",80),("World","world","world_v",64),
+        ("HP","hp","hp_v",80),("GP/h 5m","rate_5m","rate_5m_v",84),("GP/h 1h","rate_1h","rate_1h_v",84),
+        ("GP/h session","rate_session","rate_session_v",96),("Uptime","uptime","uptime_v",80),
+        ("Script","script","script_v",0))
+
+    def __init__(self, parent, on_open):
+        super().__init__(parent,fg_color=BG_TABLE,corner_radius=0)
+        self._on_open=on_open; self._rows=[]; self._view=[]; self._top=0; self._xs=[]
+        self._sort=("name_v",False); self._filter=""
+        self.grid_rowconfigure(1,weight=1); self.grid_columnconfigure(0,weight=1)
+        self._hc=tk.Canvas(self,height=self.HEAD_H,bg=BG_DARK,highlightthickness=0,cursor="hand2")
+        self._hc.grid(row=0,column=0,columnspan=2,sticky="ew")
+        self._c=tk.Canvas(self,bg=BG_TABLE,highlightthickness=0,cursor="hand2"); self._c.grid(row=1,column=0,sticky="nsew")
+        self._sb=ctk.CTkScrollbar(self,command=self._yview,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2)
+        self._sb.grid(row=1,column=1,sticky="ns")
+        self._c.bind("<Configure>",lambda e:self.redraw())
+        for ev in ("<MouseWheel>","<Button-4>","<Button-5>"): self._c.bind(ev,self._wheel)
+        self._c.bind("<Button-1>",self._click); self._hc.bind("<Button-1>",self._head_click)
+
+    def set_rows(self, rows):
+        self._rows=rows; self._apply_view(); self.redraw()
+
+    def set_filter(self, text):
+        self._filter=text.strip().lower(); self._top=0; self._apply_view(); self.redraw()
+
+    def _apply_view(self):
+        f=self._filter
+        rows=[r for r in self._rows if not f or f in r["name_v"] or f in r["script_v"] or f in (r["host_v"] or "") or f==str(r["world_v"])]
+        key,rev=self._sort
+        # Rows without a value (offline clients) always sort last
+        have=[r for r in rows if r[key] is not None]; none=[r for r in rows if r[key] is None]
+        self._view=sorted(have,key=lambda r:r[key],reverse=rev)+sorted(none,key=lambda r:r["name_v"])
+
+    def _page_rows(self): return max(1,self._c.winfo_height()//self.ROW_H)
+
+    @perf.timed("ui.fleet_table")
+    def redraw(self):
+        c=self._c; c.delete("all"); w=max(c.winfo_width(),300); n=len(self._view); page=self._page_rows()
+        fixed=sum(cw for *_,cw in self.COLS); x=0; self._xs=[]
+        for *_,cw in self.COLS: self._xs.append(x); x+=cw or max(120,w-fixed)
+        self._top=max(0,min(self._top,n-page))
+        for i,r in enumerate(self._view[self._top:self._top+page+1]):
+            y=i*self.ROW_H; cy=y+self.ROW_H//2
+            c.create_rectangle(0,y,w,y+self.ROW_H,fill=BG_ROW if (self._top+i)%2==0 else BG_TABLE,outline="")
+            for x0,(_,key,_,_) in zip(self._xs,self.COLS):
+                if key=="dot": c.create_oval(x0+9,cy-4,x0+17,cy+4,fill=r["dot"],outline="")
+                else:
+                    t,col=r[key]; c.create_text(x0+8,cy,text=t,fill=col,font=FS,anchor="w")
+        if not n: c.create_text(w//2,40,text="No clients match." if self._rows else "No accounts yet.",fill=TEXT_SEC,font=FB)
+        self._draw_head(w)
+        self._sb.set(self._top/n,min(1.0,(self._top+page)/n)) if n else self._sb.set(0.0,1.0)
+
+    def _draw_head(self, w):
+        h=self._hc; h.delete("all"); key,rev=self._sort
+        for x0,(title,_,sk,_) in zip(self._xs,self.COLS):
+            if title: h.create_text(x0+8,self.HEAD_H//2,text=title+((" ▼" if rev else " ▲") if sk==key else ""),
+                fill=TEXT_HEAD,font=("Segoe UI",10,"bold"),anchor="w")
+        h.create_line(0,self.HEAD_H-1,w,self.HEAD_H-1,fill=BORDER)
+
+    def _scroll_to(self, top):
+        top=max(0,min(int(top),len(self._view)-self._page_rows()))
+        if top!=self._top: self._top=top; self.redraw()
+
+    def _yview(self, *args):
+        if args[0]=="moveto": self._scroll_to(float(args[1])*len(self._view))
+        elif args[0]=="scroll": self._scroll_to(self._top+int(args[1])*(self._page_rows() if args[2]=="pages" else 1))
+
+    def _wheel(self, e):
+        step=-1 if getattr(e,"num",0)==4 or getattr(e,"delta",0)>0 else 1
+        self._scroll_to(self._top+step*3)
+
+    def _click(self, e):
+        idx=self._top+e.y//self.ROW_H
+        if 0<=idx<len(self._view): self._on_open(self._view[idx]["id"])
+
+    def _head_click(self, e):
+        for x0,(title,_,sk,cw) in zip(self._xs,self.COLS):
+            if title and x0<=e.x<x0+(cw or 10**6):
+                key,rev=self._sort; self._sort=(sk,not rev if sk==key else False)
+                self._apply_view(); self.redraw(); return
+
+
+class _CardWindow(ctk.CTkToplevel):
+    """A single full _ClientCard opened from the compact table."""
+
+    def __init__(self, parent, app, account, on_close):
+        super().__init__(parent); self.title(account.display_name); self.geometry("520x420")
+        self.configure(fg_color=BG_DARK); self._on_close=on_close
+        self.card=_ClientCard(self,app,account,feeds_alerts=False); self.card.pack(fill="both",expand=True,padx=10,pady=10)
+        self.protocol("WM_DELETE_WINDOW",self.close)
+
+    def close(self):
+        self.card.destroy_card(); self._on_close(); self.destroy()
+
+
+# ── Fleet watch ───────────────────────────────────────────────────────────────
+class _FleetWatch:
+    """
+    Finds and polls every client and feeds App.observe whether or not the Bot
+    Manager has been opened, so alerts, rates, metrics and the journal keep
+    running in the background. The page attaches itself as ``view`` when it is
+    first shown; it then lends its cards' view state (which ones are on screen,
+    which pinned ports poll themselves) and renders what each scan found.
+    """
+    TICK_MS=1000   # live clients are polled when mon.poller says they are due
+    SCAN_MS=3000   # ports with no live client are probed for new clients this often
+    OFFLINE_S=9    # compact table shows a client offline after this long without a reply
+
+    def __init__(self, app):
+        self.app=app; self.view=None; self._scanning=False; self._tick=0
+        self._live={}  # port -> player name of every live client
+        # Latest /status per account (id -> {"port","status","seen"}) — what the compact table draws from
+        self.snaps={}
+        mon.push.listen(self._on_push)
+
+    def start(self): self.app.after(self.TICK_MS,self._schedule)
+
+    def _schedule(self):
+        if not self.app._alive: return
+        v=self.view
+        if v is not None: v.before_scan()
+        own=v.own_ports() if v is not None else set()
+        if not self._scanning and any(not a.skip_launch and a.http_port not in own for a in self.app.accounts): self._scan_now()
+        self.app.after(self.TICK_MS,self._schedule)
+
+    def refresh(self):
+        """Everything is due now: every live client and a full port sweep."""
+        for p in list(self._live): mon.poller.boost(p,0)
+        self._tick=0
+        if not self._scanning: self._scan_now()
+
+    def _scan_now(self):
+        self._scanning=True; threading.Thread(target=self._run,daemon=True).start()
+
+    def _run(self):
+        try:
+            # Live clients are polled on their own adaptive interval, within the fleet request budget.
+            # Only on-screen cards get /plugins + /logs, and pinned-port grid cards poll themselves.
+            v=self.view; grid,pops=v.scan_cards() if v is not None else ([],[]); table=v is not None and v.table_shown()
+            discover=self._tick%max(1,self.SCAN_MS//self.TICK_MS)==0; self._tick+=1
+            accounts=[a for a in list(self.app.accounts) if not a.skip_launch]
+            own={c.account.http_port for c in grid if c.account.http_port}
+            pinned=sorted({a.http_port for a in accounts if a.http_port and a.http_port not in own}-set(mon.SCAN_PORTS))
+            visible={c.account.display_name.strip().lower() for c in grid+pops if c._in_view}
+            scales={a.display_name.strip().lower():s for a in accounts for s in [grp.index.poll_scale(a)] if s!=1.0}
+            # Other hosts' clients arrive as agent-pushed heartbeats; on-screen ones are also polled for detail
+            remote=self.app.remote_clients()
+            rvis={rp for rp,st in remote.items() if st.get("playerName","").strip().lower() in visible}
+            # Clients with an open push stream are not polled; their latest pushed state is dispatched instead
+            streamed={p:mon.push.snapshot(p) for p in self._live if p not in own and mon.push.live(p)}
+            ports=[]
+            for p in mon.poller.due([p for p in self._live if p not in own and p not in streamed]+list(rvis)):
+                if not mon.budget.take(3 if p in rvis or self._live[p] in visible else 1): break
+                ports.append(p)
+            if discover: ports+=[p for p in mon.SCAN_PORTS+pinned if p not in self._live and p not in own]
+            if not ports and not remote and not streamed: return
+            scan=mon.central_scan(ports,detail=lambda st:st.get("playerName","").strip().lower() in visible) if ports else {}
+            ntd={}; probed=set(ports)
+            for port in ports:
+                data=scan.get(port); local=not isinstance(port,mon.RemotePort)
+                if data is None:
+                    if local and self._live.pop(port,None) is not None: mon.poller.forget(port)
+                    continue
+                pl=data["status"].get("playerName","").strip().lower()
+                if local: self._live[port]=pl; mon.push.subscribe(port)
+                mon.poller.observe(port,data["status"],table or pl in visible,scales.get(pl,1.0))
+                if pl and pl not in ntd: ntd[pl]=(port,data)
+            for port,data in streamed.items():
+                pl=data["status"].get("playerName","").strip().lower() if data else ""
+                if pl and pl not in ntd: ntd[pl]=(port,data)
+            for rp,st in remote.items():
+                pl=st.get("playerName","").strip().lower()
+                if pl and pl not in ntd and rp not in rvis: ntd[pl]=(rp,{"status":st,"plugins":None,"logs":None})
+            if not self.app._alive: return
+            now=time.time()
+            def _gone(port):
+                if isinstance(port,mon.RemotePort): return port not in remote  # the agent decides
+                return port in probed or (discover and port not in self._live)
+            with perf.stage("ui.dispatch"):
+                rows=[]
+                for acc in accounts:
+                    if acc.http_port:
+                        port,data=acc.http_port,scan.get(acc.http_port)
+                    else:
+                        port,data=ntd.get(acc.display_name.strip().lower(),(None,None))
+                    sn=self.snaps.get(acc.id)
+                    if data: self.snaps[acc.id]={"port":port,"status":data["status"],"seen":now}
+                    elif sn and _gone(sn["port"]) and now-sn["seen"]>self.OFFLINE_S: sn["status"]=None
+                    if acc.http_port not in own:  # pinned grid cards feed the alert and rate engines from their own polls
+                        if data: self.app.observe(acc,data["status"],data["logs"],now)
+                        elif sn and _gone(sn["port"]): self.app.observe_missing(acc,now)
+                    if not acc.http_port: rows.append((acc,port,data))
+                if v is not None: v.show_scan(rows,_gone)
+        finally: self._scanning=False
+
+    def _on_push(self, port, kind):
+        """Stream thread: a client pushed a change — observe it now instead of on the next tick."""
+        if not self.app._alive or kind=="closed": return
+        snap=mon.push.snapshot(port)
+        if not snap: return
+        pl=snap["status"].get("playerName","").strip().lower()
+        acc=next((a for a in list(self.app.accounts) if not a.skip_launch and
+                  (a.http_port==port if a.http_port else pl and a.display_name.strip().lower()==pl)),None)
+        if acc is None: return
+        self.snaps[acc.id]={"port":port,"status":snap["status"],"seen":time.time()}
+        self.app.observe(acc,snap["status"],snap["logs"])
+        if self.view is not None: self.view.show_push(acc,port,snap)
+
+
 # ── BotStatusPage ─────────────────────────────────────────────────────────────
 class BotStatusPage(ctk.CTkFrame):
-    CARDS_PER_ROW=2; SCAN_MS=3000
+    CARDS_PER_ROW=2
+    ALL_ONLINE="All online clients"
 
     def __init__(self, parent, app):
         super().__init__(parent,fg_color=BG_DARK)
-        self.app=app; self._cards={}; self._scanning=False; self._paused=False; self._alive=True
-        self._build(); self._refresh_cards(); self._schedule_scan()
+        self.app=app; self._cards={}; self._paused=True; self._alive=True; self._started=False
+        self._pops={}; self._compact=app.settings.compact_bot_manager
+        self._build(); app.alerts.watch(self._on_alert_change)
 
     def _build(self):
-        self.grid_rowconfigure(1,weight=1); self.grid_columnconfigure(0,weight=1)
+        self.grid_rowconfigure(2,weight=1); self.grid_columnconfigure(0,weight=1)
         hdr=ctk.CTkFrame(self,fg_color=BG_MID,corner_radius=0,height=48)
         hdr.grid(row=0,column=0,sticky="ew"); hdr.grid_propagate(False); hdr.grid_columnconfigure(0,weight=1)
         _lbl(hdr,"Bot Manager",font=FH).pack(side="left",padx=16,pady=12)
         _lbl(hdr,"Auto-detects clients by player name  •  right-click account to set manual port",font=FS,color=TEXT_SEC).pack(side="left",padx=4)
         _btn(hdr,"↺ Refresh",self._manual_refresh,h=30,w=90,font=FS).pack(side="right",padx=12,pady=9)
+        _btn(hdr,"⚠ Alerts",lambda:AlertsDialog(self,self.app),h=30,w=80,font=FS).pack(side="right",padx=(0,4),pady=9)
+        self._mode_btn=_btn(hdr,"",lambda:self._set_compact(not self._compact),h=30,w=100,font=FS)
+        self._mode_btn.pack(side="right",padx=(0,4),pady=9)
+        self._flt=ctk.CTkEntry(hdr,placeholder_text="Filter name / host / script / world",fg_color=BG_MID,border_color=BORDER,
+            width=200,height=30,font=FS)
+        self._flt.bind("<KeyRelease>",lambda e:self._tbl.set_filter(self._flt.get()))
+        # Fleet-wide plugin control — applies to every online card at once
+        bb=ctk.CTkFrame(self,fg_color=BG_TABLE,corner_radius=0,height=40)
+        bb.grid(row=1,column=0,sticky="ew"); bb.grid_propagate(False)
+        self._bscope=ctk.StringVar(value=self.ALL_ONLINE)
+        self._bscope_menu=ctk.CTkOptionMenu(bb,variable=self._bscope,values=[self.ALL_ONLINE],width=150,height=26,font=FS,
+            fg_color=BG_MID,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2)
+        self._bscope_menu.pack(side="left",padx=(16,6),pady=6)
+        self._bulk_var=ctk.StringVar(value=""); self._bulk_cls={}
+        self._bulk_menu=ctk.CTkOptionMenu(bb,variable=self._bulk_var,values=[""],width=180,height=26,font=FS,
+            fg_color=BG_MID,button_color=BTN_GRAY,button_hover_color=BTN_GRAY2)
+        self._bulk_menu.pack(side="left",padx=4,pady=6)
+        self._bulk_btns=[_btn(bb,"▶ Start",lambda:self._bulk("start"),fg="#1a5e2a",hov="#238636",w=70,h=26,font=FS),
+            _btn(bb,"■ Stop",lambda:self._bulk("stop"),fg="#6e2020",hov="#8b2a2a",w=70,h=26,font=FS),
+            _btn(bb,"↺ Restart",lambda:self._bulk("restart"),w=80,h=26,font=FS)]
+        for b in self._bulk_btns: b.pack(side="left",padx=(4,0),pady=6)
+        self._fleet_lbl=_lbl(bb,"",font=FS,color=TEXT_SEC); self._fleet_lbl.pack(side="right",padx=16,pady=6)
         self._sf=_SmoothScrollableFrame(self,fg_color=BG_DARK,
             scrollbar_button_color=BTN_GRAY,scrollbar_button_hover_color=BTN_GRAY2)
-        self._sf.grid(row=1,column=0,sticky="nsew")
+        self._sf.grid(row=2,column=0,sticky="nsew")
         self._sf.grid_columnconfigure(0,weight=1); self._sf.grid_columnconfigure(1,weight=1)
-        self._gf=self._sf
+        self._gf=self._sf; self._sf.on_scroll_end=self._update_viewport
+        self._tbl=_FleetTable(self,self._open_card)
         self._el=_lbl(self._gf,
             "No accounts yet.\nAdd accounts in Account Overview first.\n\n"
             "Enable the BabyTank HTTP Server plugin in each Microbot client.\n"
@@ -1028,10 +1969,28 @@ class BotStatusPage(ctk.CTkFrame):
             "and matches clients to accounts by player name automatically.",
             color=TEXT_SEC,justify="center")
         self._el.grid(row=0,column=0,columnspan=2,padx=60,pady=80)
+        self._set_compact(self._compact,save=False)
+
+    def _set_compact(self, on, save=True):
+        """Switch between the card grid and the compact table; cards are only kept alive in card mode."""
+        self._compact=on; self._mode_btn.configure(text="▦ Cards" if on else "▤ Compact")
+        if on:
+            self._sf.grid_remove(); self._tbl.grid(row=2,column=0,sticky="nsew")
+            self._flt.pack(side="right",padx=(0,4),pady=9,after=self._mode_btn)
+            for aid in list(self._cards): self._cards.pop(aid).destroy_card()
+            self._redraw_table()
+        else:
+            self._tbl.grid_remove(); self._flt.pack_forget(); self._sf.grid(row=2,column=0,sticky="nsew")
+            if self._started: self._refresh_cards(); self.after(100,self._update_viewport)
+        if save: self.app.settings.compact_bot_manager=on; cfg.save_settings(self.app.settings)
 
     def _refresh_cards(self):
         all_acc=[a for a in self.app.accounts if not a.skip_launch]
         cur=set(self._cards); new={a.id for a in all_acc}
+        for aid in [a for a in self._pops if a not in new]: self._pops[aid].close()
+        for acc in all_acc:
+            if acc.id in self._pops: self._pops[acc.id].card.update_account(acc)
+        if self._compact: self._redraw_table(); return
         for aid in cur-new: self._cards.pop(aid).destroy_card()
         for acc in all_acc:
             if acc.id not in self._cards: self._cards[acc.id]=_ClientCard(self._gf,self.app,acc)
@@ -1043,48 +2002,141 @@ class BotStatusPage(ctk.CTkFrame):
         if self._cards: self._el.grid_remove()
         else: self._el.grid(row=0,column=0,columnspan=2,padx=60,pady=80)
 
-    def _schedule_scan(self):
+    def _table_rows(self):
+        rows=[]
+        for acc in self.app.accounts:
+            if acc.skip_launch: continue
+            sn=self.app.fleet.snaps.get(acc.id); d=sn["status"] if sn else None
+            v=_ClientCard._status_view(acc.display_name,d,"",[])
+            up=d.get("uptimeSeconds",0) if d else 0
+            hp,mhp=(d.get("hp",0),d.get("maxHp",0)) if d else (0,0); script=v["script"][0].split(": ",1)[-1]
+            host=(sn["port"].host if isinstance(sn["port"],mon.RemotePort) else "local") if d else None
+            name=("⚠ " if self.app.alerts.active(acc.id) else "")+acc.display_name
+            row={"id":acc.id,"dot":v["dot"],"name":(name,TEXT_PRI if d else TEXT_SEC),"host":(host or "—",TEXT_SEC),"host_v":host,
+                "world":v["world"],"hp":v["hp"],"uptime":v["uptime"],"script":(script,v["script"][1]),
+                "online":1 if d else None,"name_v":acc.display_name.lower(),"world_v":(d.get("world") or None) if d else None,
+                "hp_v":hp/mhp if mhp else None,"uptime_v":up if d else None,"script_v":script.lower() if d else ""}
+            # Rates outlive the session for a while (a stopped bot decays to 0/h), so they show offline too
+            rates=rt.tracker.rates(acc.id).get("profit",{})
+            for w in ("5m","1h","session"):
+                r=rates.get(w); row[f"rate_{w}_v"]=r
+                row[f"rate_{w}"]=(_ClientCard._fmt_rate(r),(GREEN if r>0 else RED if r<0 else TEXT_SEC) if r is not None else TEXT_SEC)
+            rows.append(row)
+        return rows
+
+    def _redraw_table(self):
+        if self._compact and self._alive: self._tbl.set_rows(self._table_rows())
+
+    def _open_card(self, aid):
+        w=self._pops.get(aid)
+        if w is not None: w.lift(); w.focus(); return
+        acc=next((a for a in self.app.accounts if a.id==aid),None)
+        if acc is None: return
+        w=self._pops[aid]=_CardWindow(self,self.app,acc,lambda:self._pops.pop(aid,None))
+        sn=self.app.fleet.snaps.get(aid)
+        if sn and sn["status"] and not acc.http_port: w.card._auto_port=sn["port"]
+        w.card.set_in_view(True)  # always on screen: full detail right away
+
+    def _update_viewport(self):
+        """Tell every grid card whether it is on screen; newly visible cards fetch full detail."""
         if not self._alive: return
-        auto=[a for a in self.app.accounts if not a.http_port and not a.skip_launch]
-        if auto and not self._scanning and not self._paused:
-            self._scanning=True; threading.Thread(target=self._run_scan,daemon=True).start()
-        self.after(self.SCAN_MS,self._schedule_scan)
-
-    def _run_scan(self):
-        try:
-            scan=_central_scan(); ntd={}
-            for port,data in scan.items():
-                pl=data["status"].get("playerName","").strip().lower()
-                if pl and pl not in ntd: ntd[pl]=(port,data)
-            if not self._alive: return
-            def _dispatch():
-                if not self._alive: return
-                for acc in list(self.app.accounts):
-                    if acc.http_port: continue
-                    card=self._cards.get(acc.id)
-                    if not card: continue
-                    key=acc.display_name.strip().lower()
-                    if key in ntd:
-                        port,data=ntd[key]; card.push_scan_result(port,data["status"],data["plugins"],data.get("logs",[]))
-                    else: card.push_offline()
-            try: self.after(0,_dispatch)
-            except RuntimeError: pass
-        finally: self._scanning=False
+        for card in list(self._cards.values()): card.set_in_view(not self._paused and self._sf.is_visible(card))
+
+    # View hooks for App.fleet: called on the Tk thread (before_scan) or the scan / stream threads (the rest)
+    def before_scan(self): self._update_viewport()
+    def own_ports(self):
+        """Pinned ports whose grid cards poll themselves and feed App.observe."""
+        return {c.account.http_port for c in list(self._cards.values()) if c.account.http_port}
+    def scan_cards(self): return list(self._cards.values()),[w.card for w in list(self._pops.values())]
+    def table_shown(self): return self._compact and not self._paused
+
+    def show_scan(self, rows, gone):
+        """Scan thread: rows are (account, port, data or None) for every auto-port account; cards only record state."""
+        if not self._alive: return
+        for acc,port,data in rows:
+            for card in (self._cards.get(acc.id),getattr(self._pops.get(acc.id),"card",None)):
+                if card is None: continue
+                if data: card.push_scan_result(port,data["status"],data["plugins"],data["logs"])
+                elif gone(card._auto_port): card.push_offline()
+        if self._paused: return
+        if self._compact: self.app.bus.post(("fleet","table"),self._redraw_table)
+        self.app.bus.post(("fleet","rates"),self._show_fleet_rates)
+
+    def _show_fleet_rates(self):
+        r=rt.tracker.fleet().get("profit")
+        t=f"Fleet  {_ClientCard._fmt_rate(r['5m'])} (5 min)  •  {_ClientCard._fmt_rate(r['1h'])} (1 h)  •  " \
+          f"{_ClientCard._fmt_rate(r['session'])} (session)" if r else ""
+        self._fleet_lbl.configure(text=t)
+
+    def show_push(self, acc, port, snap):
+        """Stream thread: a client pushed a change — hand it to its card now instead of on the next scan."""
+        if not self._alive: return
+        for card in (self._cards.get(acc.id),getattr(self._pops.get(acc.id),"card",None)):
+            if card is None: continue
+            if acc.http_port: card._post_view(snap["status"],snap["plugins"],snap["logs"])
+            else: card.push_scan_result(port,snap["status"],snap["plugins"],snap["logs"])
+        if self.table_shown(): self.app.bus.post(("fleet","table"),self._redraw_table)
+
+    def _on_alert_change(self, aid):
+        """Engine thread: an account's active alerts changed — refresh its badges."""
+        if not self._alive: return
+        for card in (self._cards.get(aid),getattr(self._pops.get(aid),"card",None)):
+            if card is not None: card.post_alerts()
+        if self._compact: self.app.bus.post(("fleet","table"),self._redraw_table)
 
     def _manual_refresh(self):
-        self._refresh_cards()
-        if not self._scanning:
-            self._scanning=True; threading.Thread(target=self._run_scan,daemon=True).start()
+        self._refresh_cards(); self.update_idletasks(); self._update_viewport(); self.app.fleet.refresh()
+
+    def _refresh_bulk_menu(self):
+        names=mon.catalog.names()
+        self._bulk_cls={names.get(c,c.split(".")[-1]):c for c in sorted(_managed_plugins)}
+        vals=sorted(self._bulk_cls,key=str.lower) or [""]
+        self._bulk_menu.configure(values=vals)
+        if self._bulk_var.get() not in self._bulk_cls: self._bulk_var.set(vals[0])
+
+    def refresh_scope(self):
+        vals=[self.ALL_ONLINE]+grp.index.names(); self._bscope_menu.configure(values=vals)
+        if self._bscope.get() not in vals: self._bscope.set(self.ALL_ONLINE)
+
+    def _bulk(self, action):
+        cls=self._bulk_cls.get(self._bulk_var.get())
+        if not cls: show_error("No managed plugin selected.\nChoose plugins to manage in Plugin Manager."); return
+        g=self._bscope.get(); ids=None if g==self.ALL_ONLINE else grp.index.member_ids(g)
+        accs=self.app.accounts if ids is None else grp.index.members(g)
+        targets={sn["port"]:a.display_name for a in accs for sn in [self.app.fleet.snaps.get(a.id)] if sn and sn["status"]}
+        targets.update({c._port():c.account.display_name for c in self._cards.values() if c._port() and (ids is None or c.account.id in ids)})
+        if not targets: show_error("No online clients." if ids is None else f"No online clients in '{g}'."); return
+        for b in self._bulk_btns: b.configure(state="disabled")
+        def _bg():
+            t0=time.time(); res=mon.bulk_plugin_op(list(targets),[cls],action); el=time.time()-t0
+            ok=[p for p,r in res.items() if r["ok"] and not r["skipped"]]; idle=sum(r["skipped"] for r in res.values())
+            failed=[f"{targets[p]}: {r['error']}" for p,r in res.items() if not r["ok"]]
+            msg=f"{action.title()} {self._bulk_var.get()}{'' if ids is None else f' in {g}'}: {len(ok)}/{len(res)} clients OK in {el:.1f}s."
+            if idle: msg+=f"\n{idle} client(s) left alone: the plugin was not running."
+            if failed: msg+="\n\nFailed:\n"+"\n".join(failed[:20])+("\n…" if len(failed)>20 else "")
+            def _done():
+                for b in self._bulk_btns: b.configure(state="normal")
+                if self._alive: self._manual_refresh()
+                (show_error if failed else show_info)(msg)
+            try: self.after(0,_done)
+            except RuntimeError: pass
+        threading.Thread(target=_bg,daemon=True).start()
 
-    def on_show(self): self._paused=False
-    def on_hide(self): self._paused=True
+    def on_show(self):
+        self._paused=False; self._refresh_bulk_menu(); self.refresh_scope(); self.app.bus.wake()
+        # Cards are only built the first time the page is shown; App.fleet has been scanning all along
+        if not self._started: self._started=True; self._refresh_cards(); self.app.fleet.view=self
+        self._redraw_table(); self._show_fleet_rates(); self.after(100,self._update_viewport)
+    def on_hide(self): self._paused=True; self._update_viewport()
 
 
 # ── Plugin Manager ────────────────────────────────────────────────────────────
 class PluginManagerPage(ctk.CTkFrame):
+    STALE_S=60  # catalog older than this gets one background refresh when the page opens
+
     def __init__(self, parent, app):
         super().__init__(parent,fg_color="transparent")
-        self.app=app; self._pvars={}; self._known={}; self._prows={}; self._alive=True; self._build()
+        self.app=app; self._pvars={}; self._known={}; self._prows={}; self._alive=True; self._scanning=False; self._build()
 
     def _build(self):
         self.grid_rowconfigure(1,weight=1); self.grid_columnconfigure(0,weight=1)
@@ -1100,17 +2152,19 @@ class PluginManagerPage(ctk.CTkFrame):
             "BabyTank HTTP Server plugin enabled, then click '↺ Scan Clients'.",color=TEXT_SEC,justify="center")
         self._el.grid(row=0,column=0,pady=60)
 
-    def on_show(self): self._scan()
+    def on_show(self):
+        # Read whatever the Bot Manager / card pollers already collected — no scan needed
+        self._populate(mon.catalog.names())
+        if mon.catalog.age()>self.STALE_S: self._scan()
 
     def _scan(self):
+        if self._scanning: return
+        self._scanning=True
         def _bg():
-            plugins={}
-            for port,data in _central_scan().items():
-                for plug in data.get("plugins",[]):
-                    cls=plug.get("className",""); name=plug.get("name",cls.split(".")[-1])
-                    if cls and cls not in plugins: plugins[cls]=name
+            try: mon.central_scan()  # feeds mon.catalog
+            finally: self._scanning=False
             if not self._alive: return
-            try: self.after(0,lambda:self._populate(plugins))
+            try: self.after(0,lambda:self._populate(mon.catalog.names()))
             except RuntimeError: pass
         threading.Thread(target=_bg,daemon=True).start()
 
@@ -1148,24 +2202,103 @@ class PluginManagerPage(ctk.CTkFrame):
 
 # ── App ───────────────────────────────────────────────────────────────────────
 class App(ctk.CTk):
+    # Pages are built on first navigation: nav name -> (App attribute, page class)
+    PAGES={"Account Overview":("overview_page",AccountOverviewPage),
+        "Account Handler":("handler_page",AccountHandlerPage),
+        "Bot Manager":("bot_status_page",BotStatusPage),
+        "Plugin Manager":("plugin_manager_page",PluginManagerPage),
+        "Settings":("settings_page",SettingsPage),"Guide":("guide_page",GuidePage)}
+    BACKGROUND_MS=200  # fleet watch, metrics, memory sampler, alert tick, adoption and scheduler start after the first frame
+
     def __init__(self):
         super().__init__(); self.title("Baby Tank Switcher")
         self.geometry("860x520"); self.minsize(720,420); self.configure(fg_color=BG_DARK)
-        self.settings=cfg.load_settings(); self.accounts=cfg.load_accounts()
-        self._pages={}; self._alive=True; self._build(); self._nav_to("Account Overview")
+        self.settings=cfg.load_settings(); self.accounts=cfg.load_accounts(); grp.index.rebuild(self.accounts,cfg.load_groups())
+        perf.enable(self.settings.diagnostics); mon.budget.set_rate(self.settings.poll_budget); self.bus=_UiBus(self)
+        try: mon.set_scan_ports(mon.parse_ports(self.settings.scan_ports))
+        except ValueError: pass  # bad values are rejected when Settings are saved; keep the defaults
+        self._hosts=None  # agent.Aggregator, created (and agent imported) once there is a remote host
+        self.sched_log=[]; self.scheduler=sched.Scheduler(lambda:self.accounts,lambda:self.settings,self._on_sched_event)
+        self.alert_log=[]; self.alerts=al.Engine(); self.set_alerts(cfg.load_alerts())
+        self._pages={}; self._alive=True; self.fleet=_FleetWatch(self)
+        self._build(); self._nav_to("Account Overview")
         self.bind("<Map>",self._on_restore); self.protocol("WM_DELETE_WINDOW",self._on_close)
+        self.after(self.BACKGROUND_MS,self._start_background)
+
+    def _start_background(self):
+        """Everything the first page does not need, started once it has drawn."""
+        if not self._alive: return
+        if self.settings.remote_hosts:
+            import agent as ag
+            try: self.configure_hosts(ag.parse_hosts(self.settings.remote_hosts),self.settings.agent_token)
+            except ValueError: pass
+        try: metrics.exporter.start(self.settings.metrics_port,lambda:self.accounts)
+        except OSError: pass  # port taken; Settings reports it on the next save
+        sw.memory.start(); self.fleet.start(); self.after(1000,self._alert_tick)
+        # Re-attaching clients from the last run opens their processes: off the Tk thread. The scheduler
+        # waits for it so it does not launch a client that is already running.
+        accs=list(self.accounts)
+        def _adopt():
+            try: sw.adopt(accs)
+            finally: self.bus.post(("app","adopted"),self._adopted)
+        threading.Thread(target=_adopt,name="adopt",daemon=True).start()
+
+    def _adopted(self):
+        if not self._alive: return
+        self.refresh_handler()
+        if self.scheduler.schedule.enabled: self.scheduler.start()
+
+    def configure_hosts(self, hosts, token=""):
+        if self._hosts is None:
+            if not hosts: return
+            import agent as ag; self._hosts=ag.Aggregator()
+        self._hosts.configure(hosts,token)
+    def remote_clients(self): return self._hosts.clients() if self._hosts else {}
+    def remote_hosts(self): return self._hosts.hosts() if self._hosts else {}
 
     def _on_close(self):
         self._alive=False
         for page in self._pages.values():
             if hasattr(page,"_alive"): page._alive=False
-        with _conn_lock:
-            for c in _conns.values():
-                try: c.close()
-                except: pass
-            _conns.clear()
+        if self._hosts: self._hosts.stop()
+        self.scheduler.stop(); metrics.exporter.stop(); sw.memory.stop(); sw.memory.save(); mon.close_all(); mon.catalog.save(); jr.journal.close()
         self.destroy()
 
+    def observe(self, account, status, logs=None, now=None):
+        """Thread-safe: hand a client's fresh /status (and log tail) to the alert and rate engines."""
+        self.alerts.feed(account.id,status,account.display_name,now)
+        if logs: self.alerts.logs(account.id,logs,account.display_name,now)
+        rt.tracker.observe(account.id,status,now); metrics.exporter.observe(account,status)
+        if status.get("loginState")=="LOGGED_IN": jr.journal.login(account)
+
+    def observe_missing(self, account, now=None):
+        """Thread-safe: a client that was being watched was not found."""
+        self.alerts.miss(account.id,now); metrics.exporter.offline(account)
+
+    def set_alerts(self, conf):
+        """(Re)compile the alert rules; fired alerts go to alerts.log, the Alerts dialog and the webhook if one is set."""
+        self.alerts.sinks=[al.LogSink(cfg.ALERTS_LOG_FILE),self._on_alert]+([al.WebhookSink(conf.webhook_url)] if conf.webhook_url else [])
+        self.alerts.set_rules(conf.rules)
+
+    def _on_alert(self, alert):
+        # Poller / stream thread -> Tk thread
+        def _a(): self.alert_log.append(alert); del self.alert_log[:-200]
+        try: self.after(0,_a)
+        except RuntimeError: pass
+
+    def _alert_tick(self):
+        if not self._alive: return
+        self.alerts.tick(); self.after(1000,self._alert_tick)
+
+    def _on_sched_event(self, kind, account, text):
+        if kind=="stop" and account: self.alerts.forget(account.id)
+        # Scheduler thread -> Tk thread
+        def _a():
+            self.sched_log.append(f"{time.strftime('%H:%M:%S')}  {text}"); del self.sched_log[:-200]
+            if kind in ("launch","stop","exit"): self.refresh_handler()
+        try: self.after(0,_a)
+        except RuntimeError: pass
+
     def _build(self):
         self.grid_rowconfigure(0,weight=1); self.grid_columnconfigure(1,weight=1)
         sb=ctk.CTkFrame(self,fg_color=BG_SIDE,corner_radius=0,width=180)
@@ -1180,23 +2313,32 @@ class App(ctk.CTk):
         self.content=ctk.CTkFrame(self,fg_color=BG_DARK,corner_radius=0)
         self.content.grid(row=0,column=1,sticky="nsew")
         self.content.grid_rowconfigure(0,weight=1); self.content.grid_columnconfigure(0,weight=1)
-        self.overview_page=AccountOverviewPage(self.content,self)
-        self.handler_page=AccountHandlerPage(self.content,self)
-        self.bot_status_page=BotStatusPage(self.content,self)
-        self.plugin_manager_page=PluginManagerPage(self.content,self)
-        self.settings_page=SettingsPage(self.content,self)
-        self.guide_page=GuidePage(self.content,self)
-        self._pages={"Account Overview":self.overview_page,"Account Handler":self.handler_page,
-            "Bot Manager":self.bot_status_page,"Plugin Manager":self.plugin_manager_page,
-            "Settings":self.settings_page,"Guide":self.guide_page}
+        for attr,_ in self.PAGES.values(): setattr(self,attr,None)
+
+    def _page(self, name):
+        page=self._pages.get(name)
+        if page is None:
+            attr,cls=self.PAGES[name]; page=cls(self.content,self)
+            setattr(self,attr,page); self._pages[name]=page
+        return page
 
     def _nav_to(self, name):
         for n,page in self._pages.items():
             if n!=name: page.grid_forget(); (hasattr(page,"on_hide") and page.on_hide())
-        self._pages[name].grid(row=0,column=0,sticky="nsew")
-        if hasattr(self._pages[name],"on_show"): self._pages[name].on_show()
+        page=self._page(name)
+        page.grid(row=0,column=0,sticky="nsew")
+        if hasattr(page,"on_show"): page.on_show()
         for n,b in self._nb.items(): b.configure(fg_color=BG_HOVER if n==name else "transparent")
 
+    # Cross-page refreshes are no-ops for pages that have not been built yet
+    def refresh_handler(self):
+        if self.handler_page: self.handler_page.refresh()
+    def refresh_bot_cards(self):
+        if self.bot_status_page and self.bot_status_page._started: self.bot_status_page._refresh_cards()
+    def refresh_groups(self):
+        for page in (self.handler_page,self.bot_status_page):
+            if page: page.refresh_scope()
+
     def _on_restore(self, event):
         if event.widget is self: self.after(80,self._do_restore)
 
@@ -1208,6 +2350,9 @@ class App(ctk.CTk):
 
 
 if __name__ == "__main__":
+    if "--agent" in sys.argv:
+        import agent as ag
+        ag.main([a for a in sys.argv[1:] if a!="--agent"]); sys.exit()
     if sys.platform != "win32":
         print("This tool is Windows-only."); sys.exit(1)
     App().mainloop()
@@ -0,0 +1,93 @@
+"""
+bench_credentials.py - Account name detection over a synthetic .runelite folder
+
+Builds a throwaway .runelite folder with thousands of RuneLite profiles and
+times config.read_account_name_from_credentials for each detection path:
+
+  credentials   name found in credentials.properties
+  profile-stem  name taken from the newest profile's file name
+  profile-scan  worst case: newest profile is "default" and no profile holds a
+                name key, so every profile file is read
+
+Each case is timed cold (caches dropped) and warm (unchanged files).
+
+Usage:  python benchmarks/bench_credentials.py [--profiles 5000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config as cfg  # noqa: E402
+
+TOKEN = "x" * 64
+
+
+def make_runelite(root: Path, profiles: int, case: str) -> Path:
+    """Create a synthetic .runelite folder for ``case`` and return its credentials path."""
+    rl = root / case / ".runelite"
+    p2 = rl / "profiles2"
+    p2.mkdir(parents=True)
+    lines = [f"JX_SESSION_ID={TOKEN}", f"JX_CHARACTER_ID={TOKEN}", f"JX_REFRESH_TOKEN={TOKEN}"]
+    if case == "credentials":
+        lines.append("JX_DISPLAY_NAME=BenchAccount")
+    creds = rl / cfg.CREDENTIALS_FILENAME
+    creds.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    body = "".join(f"runelite.plugin{i}=true\n" for i in range(40))
+    now = time.time()
+    for i in range(profiles):
+        pf = p2 / f"profile{i:05d}.profile"
+        pf.write_text(body, encoding="utf-8")
+        os.utime(pf, (now - profiles + i, now - profiles + i))
+    if case in ("profile-stem", "profile-scan"):
+        newest = p2 / ("BenchAccount.profile" if case == "profile-stem" else "default.profile")
+        newest.write_text(body, encoding="utf-8")
+        os.utime(newest, (now + 1, now + 1))
+    return creds
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(profiles: int = 5000, repeat: int = 5) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for case in ("credentials", "profile-stem", "profile-scan"):
+            creds = make_runelite(Path(tmp), profiles, case)
+
+            def cold():
+                cfg.invalidate_file_cache()
+                return cfg.read_account_name_from_credentials(creds)
+
+            name = cold()
+            results[case] = {
+                "name": name,
+                "cold_ms": round(_time(cold, repeat) * 1000, 3),
+                "warm_ms": round(_time(lambda: cfg.read_account_name_from_credentials(creds),
+                                       repeat) * 1000, 3),
+            }
+    return {"profiles": profiles, "cases": results}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--profiles", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    a = ap.parse_args()
+    print(json.dumps(run(a.profiles, a.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
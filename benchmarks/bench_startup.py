@@ -0,0 +1,95 @@
+"""
+bench_startup.py - App startup timing
+
+Reports, each from a fresh interpreter so nothing is already imported:
+
+  imports         cumulative import time per top-level module pulled in by
+                  `import app` (from python -X importtime)
+  first_frame     import app -> App() -> first update() processed, i.e. the
+                  time until the window has drawn its first frame
+  first_nav       time to build and show each page on first navigation
+
+The first-frame and navigation timings need a display (and, for page
+contents, the Windows-only dependencies); on a headless box they are
+reported as skipped.
+
+Usage:  python benchmarks/bench_startup.py [--top 15]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_FRAME_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+a = app.App(); a.update()
+t2 = time.perf_counter()
+nav = {}
+for name in app.NAV_ITEMS:
+    n0 = time.perf_counter(); a._nav_to(name); a.update()
+    nav[name] = round((time.perf_counter() - n0) * 1000, 2)
+a._on_close()
+print(json.dumps({"import_app_ms": round((t1 - t0) * 1000, 2),
+                  "first_frame_ms": round((t2 - t0) * 1000, 2),
+                  "first_nav_ms": nav}))
+"""
+
+
+def import_times(module: str = "app", top: int = 15) -> dict:
+    """Cumulative import time (ms) of ``module`` and of each module it imports directly."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1:]}
+    # importtime prints children before their parent, indented two spaces per level
+    pending, total = {}, None
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1]) / 1000.0
+        except ValueError:
+            continue
+        name = parts[2][1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if depth == 1:
+            pending[name] = cumulative
+        elif depth == 0:
+            if name == module:
+                total = cumulative
+                break
+            pending = {}
+    ranked = sorted(pending.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {"total": round(total or 0.0, 2), "modules": {n: round(ms, 2) for n, ms in ranked}}
+
+
+def first_frame() -> dict:
+    proc = subprocess.run([sys.executable, "-c", _FRAME_PROBE],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        return {"skipped": tail[0]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(top: int = 15) -> dict:
+    return {"imports_ms": import_times("app", top), "startup": first_frame()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--top", type=int, default=15)
+    a = ap.parse_args()
+    print(json.dumps(run(a.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
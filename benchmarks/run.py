@@ -0,0 +1,475 @@
+"""
+run.py - Benchmark harness for the discovery, polling, launch and UI hot paths
+
+Runs every suite against the fake fleet in simulator.py (no real clients
+needed) and prints one JSON document:
+
+  scan             monitor.central_scan wall / CPU time at 0, 10, 50, 130 live ports
+  snapshots        full /status + /plugins + /logs snapshots per second, 50 clients
+  wait_login       time from a client reporting LOGGED_IN to wait_login noticing
+  push             pure polling vs push streams at 50 clients: time from a client's
+                   state change to the Bot Manager having it, and requests per minute
+  metrics          /metrics scrape latency and size with 50 simulated clients plus
+                   500 synthetic accounts, and the cost of feeding one /status
+  launch           switch_to and switcher.launch latency, and launch -> first
+                   /status, using the simulator's stub java (POSIX only)
+  accounts         config.save_accounts / load_accounts at 100, 1k, 10k accounts
+  import           bulk credential import of 500 files against 500 saved accounts:
+                   scan on one thread vs the pool, and the commit
+  handler_refresh  AccountHandlerPage.refresh at 100 accounts (needs a display)
+  credentials      account name detection (see bench_credentials.py)
+  startup          import and first-frame timings (see bench_startup.py)
+
+Metrics ending in _ms are lower-is-better, metrics ending in _per_s are
+higher-is-better. With --baseline, each is compared to the saved baseline
+and the run exits non-zero if any is worse by more than --tolerance percent.
+A suite that raises is reported under "error" and also fails the run.
+
+Usage:
+  python benchmarks/run.py [--quick] [--only scan,accounts] [--out results.json]
+  python benchmarks/run.py --baseline benchmarks/baseline.json [--tolerance 30]
+
+Everything runs against a throwaway APPDATA folder; ports 7070-7199 must be free.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+# Imported by main() once APPDATA points at a throwaway folder: config resolves its folders at import time
+cfg = mon = sim = None
+
+
+def _import_app_modules():
+    global cfg, mon, sim
+    import config as cfg
+    import monitor as mon
+    import simulator as sim
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _timed(fn, repeat: int):
+    """Run ``fn`` ``repeat`` times; return (median wall s, median CPU s, last result)."""
+    walls, cpus, out = [], [], None
+    for _ in range(repeat):
+        w0, c0 = time.perf_counter(), time.process_time()
+        out = fn()
+        walls.append(time.perf_counter() - w0)
+        cpus.append(time.process_time() - c0)
+    return statistics.median(walls), statistics.median(cpus), out
+
+
+# ── Suites ─────────────────────────────────────────────────────────────────────
+
+def bench_scan(repeat):
+    res = {}
+    for n in (0, 10, 50, 130):
+        with sim.Fleet(n):
+            mon.central_scan()  # warm the connection pool
+            wall, cpu, found = _timed(mon.central_scan, repeat)
+        mon.close_all()
+        res[f"ports_{n}"] = {"wall_ms": _ms(wall), "cpu_ms": _ms(cpu), "found": len(found)}
+    return res
+
+
+def bench_snapshots(repeat, clients=50, seconds=2.0):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _snap(port):
+        return (mon.http_get(port, "/status") is not None
+                and mon.http_get(port, "/plugins") is not None
+                and mon.http_get(port, "/logs") is not None)
+
+    with sim.Fleet(clients) as fleet:
+        ports = list(fleet.clients)
+        done, t0 = 0, time.perf_counter()
+        with ThreadPoolExecutor(max_workers=16) as ex:
+            while time.perf_counter() - t0 < seconds:
+                done += sum(ex.map(_snap, ports))
+        el = time.perf_counter() - t0
+    mon.close_all()
+    return {"clients": clients, "snapshots_per_s": round(done / el, 1)}
+
+
+def bench_wait_login(repeat, login_delay=1.0):
+    res = {}
+    for label, pinned in (("scan", False), ("pinned_port", True)):
+        lags = []
+        for _ in range(repeat):
+            with sim.Fleet(1, sim.SimOptions(login_delay=login_delay), names=["LoginBot"]) as fleet:
+                port = next(iter(fleet.clients))
+                ready = fleet.clients[port].started + login_delay
+                ok = mon.wait_login("LoginBot", port if pinned else 0, time.time() + 10)
+                lags.append(time.time() - ready if ok else float("nan"))
+        res[label] = {"detect_lag_ms": _ms(statistics.median(lags))}
+    return res
+
+
+def _watch_fleet(clients, seconds, push):
+    """
+    Run the Bot Manager's tick rules (1 s tick, per-client PollScheduler
+    intervals, request budget, discovery every 3 ticks) against ``clients``
+    fake clients while pausing / resuming a random client twice a second.
+    With ``push`` the clients serve /events and streamed clients are not
+    polled. Returns latency from each change to the monitor having it.
+    """
+    lock, flips, lags = threading.Lock(), {}, []   # flips: port -> (expected paused, t0)
+
+    def seen(port, status):
+        with lock:
+            f = flips.get(port)
+            if f and status and status.get("paused") == f[0]:
+                lags.append(time.perf_counter() - f[1])
+                del flips[port]
+
+    def on_push(port, kind):
+        if kind == "status":
+            snap = mon.push.snapshot(port)
+            seen(port, snap and snap["status"])
+
+    poller, budget, stop = mon.PollScheduler(), mon.RequestBudget(mon.POLL_BUDGET), threading.Event()
+    with sim.Fleet(clients, sim.SimOptions(push=push)) as fleet:
+        ports, live = list(fleet.clients), set()
+
+        def loop():
+            tick = 0
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                sel = []
+                for p in poller.due([p for p in live if not mon.push.live(p)]):
+                    if not budget.take():
+                        break
+                    sel.append(p)
+                if tick % 3 == 0:
+                    sel += [p for p in ports if p not in live]
+                scan = mon.central_scan(sel, detail=lambda st: False) if sel else {}
+                for p, data in scan.items():
+                    live.add(p)
+                    poller.observe(p, data["status"])
+                    if push:
+                        mon.push.subscribe(p)
+                    seen(p, data["status"])
+                tick += 1
+                stop.wait(max(0.0, 1.0 - (time.perf_counter() - t0)))
+
+        mon.push.listen(on_push)
+        th = threading.Thread(target=loop, daemon=True)
+        th.start()
+        time.sleep(3.0)     # discovery and stream setup are not part of the steady state
+        base, rng, t_end = fleet.total_requests(), random.Random(1), time.perf_counter() + seconds
+        while time.perf_counter() < t_end:
+            port = rng.choice(ports)
+            with lock:
+                if port not in flips:
+                    c = fleet.clients[port]
+                    c.set_paused(not c.paused)
+                    flips[port] = (c.paused, time.perf_counter())
+            time.sleep(0.5)
+        time.sleep(1.0)
+        requests = fleet.total_requests() - base
+        stop.set()
+        th.join()
+        mon.push.unlisten(on_push)
+        mon.close_all()
+    lags.sort()
+    pick = (lambda q: _ms(lags[min(len(lags) - 1, int(q * len(lags)))])) if lags else (lambda q: float("nan"))
+    return {"clients": clients, "changes": len(lags) + len(flips), "missed": len(flips),
+            "event_to_ui_p50_ms": pick(0.5), "event_to_ui_p90_ms": pick(0.9),
+            "requests_per_min": round(requests / (seconds + 1.0) * 60)}
+
+
+def bench_push(repeat, clients=50):
+    seconds = 4.0 * repeat
+    return {"poll": _watch_fleet(clients, seconds, push=False),
+            "push": _watch_fleet(clients, seconds, push=True)}
+
+
+def bench_metrics(repeat, clients=50, accounts=500):
+    import socket
+    import urllib.request
+    import metrics
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    accs = [cfg.Account(display_name=f"SimBot{i:03d}", credentials_file="") for i in range(accounts)]
+    exp = metrics.Exporter()
+    exp.start(port, lambda: accs)
+    try:
+        with sim.Fleet(clients) as fleet:
+            scan = mon.central_scan(list(fleet.clients), detail=lambda st: False)
+            byname = {a.display_name: a for a in accs}
+            for data in scan.values():
+                exp.observe(byname[data["status"]["playerName"]], data["status"])
+            mon.close_all()
+        # The rest of the accounts are fed synthetic statuses of the same shape
+        fakes = [sim.FakeClient(a.display_name, sim.SimOptions(), seed=i + 1) for i, a in enumerate(accs)]
+        feed = []
+        for _ in range(repeat * 3):
+            for a, fc in zip(accs, fakes):
+                st = fc.status()
+                t0 = time.perf_counter()
+                exp.observe(a, st)
+                feed.append(time.perf_counter() - t0)
+        exp.collect()
+        url = f"http://127.0.0.1:{port}/metrics"
+        scrape, body = [], b""
+        for _ in range(repeat * 10):
+            t0 = time.perf_counter()
+            with urllib.request.urlopen(url, timeout=5) as r:
+                body = r.read()
+            scrape.append(time.perf_counter() - t0)
+    finally:
+        exp.stop()
+    assert body.endswith(b"# EOF\n")
+    return {"clients": clients, "accounts": accounts, "samples": body.count(b"\n") - body.count(b"# "),
+            "body_kb": round(len(body) / 1024, 1), "scrape_ms": _ms(statistics.median(scrape)),
+            "observe_ms": _ms(statistics.median(feed))}
+
+
+def bench_launch(repeat):
+    if os.name != "posix":
+        return {"skipped": "stub java launcher is POSIX-only"}
+    with tempfile.TemporaryDirectory(prefix="bt_launch_") as tmp:
+        path = os.environ.get("PATH", "")
+        try:
+            return _launch(Path(tmp), repeat)
+        finally:
+            os.environ["PATH"] = path
+
+
+def _launch(tmp, repeat):
+    import switcher as sw
+    sim.write_stub_java(tmp / "bin")
+    os.environ["PATH"] = str(tmp / "bin") + os.pathsep + os.environ.get("PATH", "")
+    rl = tmp / ".runelite"
+    rl.mkdir()
+    jar = tmp / "microbot.jar"
+    jar.write_bytes(b"")
+    settings = cfg.Settings(runelite_folder=str(rl), jar_path=str(jar))
+    cfg.ensure_dirs()
+    accounts = []
+    for i in range(2):
+        acc = cfg.Account(display_name=f"LaunchBot{i}", credentials_file=f"credentials.properties.LaunchBot{i}")
+        acc.client_args.profile = acc.display_name
+        (cfg.PROFILES_DIR / acc.credentials_file).write_text(f"JX_DISPLAY_NAME={acc.display_name}\n")
+        accounts.append(acc)
+
+    switch = []
+    for i in range(repeat * 10):
+        t0 = time.perf_counter()
+        sw.switch_to(accounts[i % 2], settings)
+        switch.append(time.perf_counter() - t0)
+
+    launch, first_status = [], []
+    for _ in range(repeat):
+        acc = accounts[0]
+        t0 = time.perf_counter()
+        sw.launch(acc, settings)
+        launch.append(time.perf_counter() - t0)
+        while time.perf_counter() - t0 < 15:
+            if mon.find_login_state(acc.display_name) == "LOGGED_IN":
+                first_status.append(time.perf_counter() - t0)
+                break
+            time.sleep(0.02)
+        sw.kill(acc)
+        time.sleep(0.2)
+    return {"switch_to_ms": _ms(statistics.median(switch)),
+            "launch_ms": _ms(statistics.median(launch)),
+            "launch_to_status_ms": _ms(statistics.median(first_status or [float("nan")]))}
+
+
+def bench_accounts(repeat):
+    res = {}
+    for n in (100, 1000, 10000):
+        accounts = [cfg.Account(display_name=f"Account{i:05d}",
+                                credentials_file=f"credentials.properties.Account{i:05d}")
+                    for i in range(n)]
+        save, _, _ = _timed(lambda: cfg.save_accounts(accounts), repeat)
+        load, _, loaded = _timed(cfg.load_accounts, repeat)
+        assert len(loaded) == n
+        res[f"accounts_{n}"] = {"save_ms": _ms(save), "load_ms": _ms(load)}
+    return res
+
+
+def bench_import(repeat, files=500, existing=500):
+    with tempfile.TemporaryDirectory(prefix="bt_import_") as src:
+        return _import(Path(src), repeat, files, existing)
+
+
+def _import(src, repeat, files, existing):
+    import importer as im
+    cfg.ensure_dirs()
+    accounts = []
+    for i in range(existing):
+        a = cfg.Account(display_name=f"Saved{i:04d}", credentials_file=f"credentials.properties.Saved{i:04d}")
+        (cfg.PROFILES_DIR / a.credentials_file).write_text(f"jx_display_name=Saved{i:04d}\nk={i}\n")
+        accounts.append(a)
+    for i in range(files):
+        # every fifth file is a copy of an already saved account
+        body = f"jx_display_name=Saved{i:04d}\nk={i}\n" if i % 5 == 0 else f"jx_display_name=New{i:04d}\nk={i}\n"
+        (src / f"credentials.properties.{i:04d}").write_text(body)
+    serial, _, _ = _timed(lambda: im.scan(src, accounts, workers=1), repeat)
+    pooled, _, plan = _timed(lambda: im.scan(src, accounts), repeat)
+    t0 = time.perf_counter()
+    rep = im.commit(plan, accounts)
+    commit = time.perf_counter() - t0
+    assert len(rep.added) == files - files // 5 and len(rep.duplicates) == files // 5
+    return {"files": files, "existing": existing, "scan_serial_ms": _ms(serial),
+            "scan_ms": _ms(pooled), "commit_ms": _ms(commit)}
+
+
+def bench_handler_refresh(repeat, n=100):
+    try:
+        import app
+        root = app.ctk.CTk()
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+
+    class _App:
+        accounts = [cfg.Account(display_name=f"Account{i:03d}",
+                                credentials_file=f"credentials.properties.Account{i:03d}")
+                    for i in range(n)]
+        settings = cfg.Settings()
+        after = root.after
+
+        def save(self):
+            pass
+
+        def refresh_bot_cards(self):
+            pass
+
+    try:
+        page = app.AccountHandlerPage(root, _App())
+        page.pack(fill="both", expand=True)
+        root.update()
+
+        def _refresh():
+            page.refresh()
+            root.update_idletasks()
+        wall, _, _ = _timed(_refresh, repeat)
+        page._alive = False
+        return {"accounts": n, "refresh_ms": _ms(wall)}
+    finally:
+        root.destroy()
+
+
+def bench_credentials(repeat):
+    import bench_credentials
+    return bench_credentials.run(profiles=2000, repeat=repeat)["cases"]
+
+
+def bench_startup(repeat):
+    import bench_startup
+    return bench_startup.run(top=10)
+
+
+SUITES = {
+    "scan": bench_scan,
+    "snapshots": bench_snapshots,
+    "wait_login": bench_wait_login,
+    "push": bench_push,
+    "metrics": bench_metrics,
+    "launch": bench_launch,
+    "accounts": bench_accounts,
+    "import": bench_import,
+    "handler_refresh": bench_handler_refresh,
+    "credentials": bench_credentials,
+    "startup": bench_startup,
+}
+
+
+# ── Baseline compare ───────────────────────────────────────────────────────────
+
+def flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            out.update(flatten(v, key))
+        elif isinstance(v, (int, float)) and (k.endswith("_ms") or k.endswith("_per_s")):
+            out[key] = v
+    return out
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return [(metric, baseline, current, change %)] for metrics worse than ``tolerance`` %."""
+    cur, base = flatten(results), flatten(baseline)
+    regressions = []
+    for key, b in base.items():
+        c = cur.get(key)
+        if c is None or not b or c != c or b != b:  # missing or NaN
+            continue
+        change = (c - b) / b * 100 if key.endswith("_ms") else (b - c) / b * 100
+        if change > tolerance:
+            regressions.append((key, b, c, round(change, 1)))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--only", default="", help="comma-separated suites (default: all)")
+    ap.add_argument("--quick", action="store_true", help="fewer repeats")
+    ap.add_argument("--out", help="also write results to this file")
+    ap.add_argument("--baseline", help="compare against this results file")
+    ap.add_argument("--tolerance", type=float, default=30.0, help="allowed regression in percent")
+    a = ap.parse_args()
+
+    repeat = 3 if a.quick else 7
+    names = [n for n in a.only.split(",") if n] or list(SUITES)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bt_bench_", ignore_cleanup_errors=True) as appdata:
+        os.environ["APPDATA"] = appdata
+        _import_app_modules()
+        for name in names:
+            t0 = time.perf_counter()
+            try:
+                results[name] = SUITES[name](repeat)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"  {name:16s} {time.perf_counter() - t0:6.1f}s", file=sys.stderr)
+
+    doc = {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": repeat},
+           "results": results}
+    text = json.dumps(doc, indent=2)
+    print(text)
+    if a.out:
+        Path(a.out).write_text(text + "\n", encoding="utf-8")
+
+    failed = [name for name, r in results.items() if "error" in r]
+    for name in failed:
+        print(f"ERROR {name}: {results[name]['error']}", file=sys.stderr)
+    regressions = []
+    if a.baseline:
+        bp = Path(a.baseline)
+        if not bp.exists():
+            print(f"No baseline at {bp}; skipping compare.", file=sys.stderr)
+        else:
+            base = json.loads(bp.read_text(encoding="utf-8")).get("results", {})
+            regressions = compare(results, base, a.tolerance)
+            for key, b, c, pct in regressions:
+                print(f"REGRESSION {key}: {b} -> {c} ({pct:+.1f}%)", file=sys.stderr)
+            if not regressions:
+                print(f"No regressions beyond {a.tolerance:g}% against {bp}.", file=sys.stderr)
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
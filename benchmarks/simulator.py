@@ -0,0 +1,372 @@
+"""
+simulator.py - Fake BabyTank HTTP Server clients and a stub "java" launcher
+
+Stands in for real Microbot/RuneLite clients so discovery, polling, launching
+and plugin control can be benchmarked and regression-tested on any box.
+
+Each FakeClient serves the same endpoints as the BabyTank HTTP Server plugin:
+
+  GET  /status  /plugins  /logs
+  POST /pause  /resume  /plugins/start  /plugins/stop  /profit/reset
+
+with configurable latency, payload sizes, login delay and failure injection.
+With --push it also serves GET /events, a Server-Sent Events stream of
+status / plugins / log changes (the format monitor.PushHub reads).
+
+Usage:
+  python benchmarks/simulator.py fleet -n 50 [--latency-ms 5] [--fail-rate 0.01]
+      Serve 50 fake clients on ports 7070+ until Ctrl+C.
+
+  python benchmarks/simulator.py stub-java DIR
+      Write a stub "java" executable into DIR. Prepend DIR to PATH and
+      switcher.launch will spawn a fake client instead of a JVM; the client
+      takes its player name from the --profile argument and picks the first
+      free port in 7070-7199, like the real plugin.
+
+  python benchmarks/simulator.py client --name Alice
+      Serve a single fake client (what the stub java runs).
+
+The stub launcher is a POSIX shell script; on Windows subprocess cannot run
+it as "java", so launch benchmarks are Linux/macOS only.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import stat
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PORT_RANGE = range(7070, 7200)
+
+
+@dataclass
+class SimOptions:
+    latency_ms: float = 0.0      # added to every response
+    jitter_ms: float = 0.0       # uniform random extra latency
+    login_delay: float = 0.0     # seconds until loginState becomes LOGGED_IN
+    toggle_delay: float = 0.2    # seconds until a plugin start/stop takes effect
+    plugins: int = 30            # plugins reported by /plugins
+    logs: int = 20               # lines returned by /logs
+    pad_bytes: int = 0           # extra padding in /status to grow the payload
+    fail_rate: float = 0.0       # probability of a 500 response
+    drop_rate: float = 0.0       # probability of closing the socket without a response
+    profit_per_hour: int = 250_000
+    push: bool = False           # serve GET /events
+    push_tick: float = 1.0       # seconds between /events change checks (a game-state "tick")
+    ping_s: float = 15.0         # keep-alive comment interval on an idle /events stream
+
+
+class FakeClient:
+    """State of one simulated client."""
+
+    def __init__(self, name: str, opts: SimOptions, seed: int = 0):
+        self.name = name
+        self.opts = opts
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed or hash(name))
+        self.started = time.time()
+        self.profit_since = self.started
+        self.paused = False
+        self.world = 300 + self.rng.randrange(1, 200)
+        self.max_hp = 99
+        self.plugins = {f"net.runelite.client.plugins.microbot.sim{i}.Sim{i}Plugin":
+                        {"name": f"Sim Plugin {i}", "active": i < 3}
+                        for i in range(opts.plugins)}
+        self.requests = 0
+        self.changed = threading.Condition(self.lock)   # wakes /events streams early
+
+    def set_paused(self, paused: bool):
+        with self.lock:
+            self.paused = paused
+            self.changed.notify_all()
+
+    def logged_in(self) -> bool:
+        return time.time() - self.started >= self.opts.login_delay
+
+    def status(self) -> dict:
+        now = time.time()
+        with self.lock:
+            logged = self.logged_in()
+            d = {
+                "playerName": self.name if logged else "",
+                "loginState": "LOGGED_IN" if logged else "LOGGING_IN",
+                "world": self.world if logged else 0,
+                "hp": self.rng.randint(20, self.max_hp) if logged else 0,
+                "maxHp": self.max_hp if logged else 0,
+                "runEnergy": self.rng.randint(0, 100),
+                "uptimeSeconds": int(now - self.started),
+                "paused": self.paused,
+                "scriptStatus": "PAUSED" if self.paused else "RUNNING",
+                "profitGp": int((now - self.profit_since) * self.opts.profit_per_hour / 3600),
+            }
+        if self.opts.pad_bytes:
+            d["padding"] = "x" * self.opts.pad_bytes
+        return d
+
+    def plugin_list(self) -> list:
+        with self.lock:
+            return [{"className": c, "name": p["name"], "active": p["active"]}
+                    for c, p in self.plugins.items()]
+
+    def log_lines(self) -> list:
+        t = time.strftime("%H:%M:%S")
+        return [f"{t} INFO SimScript - tick {i} for {self.name}" for i in range(self.opts.logs)]
+
+    def set_plugin(self, cls: str, active: bool) -> bool:
+        if cls not in self.plugins:
+            return False
+
+        def _apply():
+            with self.lock:
+                self.plugins[cls]["active"] = active
+                self.changed.notify_all()
+        threading.Timer(self.opts.toggle_delay, _apply).start()
+        return True
+
+
+def _make_handler(client: FakeClient):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without TCP_NODELAY a
+        # keep-alive client stalls ~40 ms per request on delayed ACKs.
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _inject(self) -> bool:
+            o = client.opts
+            client.requests += 1
+            delay = o.latency_ms + (client.rng.random() * o.jitter_ms if o.jitter_ms else 0)
+            if delay:
+                time.sleep(delay / 1000.0)
+            if o.drop_rate and client.rng.random() < o.drop_rate:
+                self.close_connection = True
+                return False
+            if o.fail_rate and client.rng.random() < o.fail_rate:
+                self._send({"error": "injected failure"}, 500)
+                return False
+            return True
+
+        def _send(self, obj, code=200):
+            body = json.dumps(obj).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _events(self):
+            """Stream changes until the client hangs up; uptime is left to the reader to extrapolate."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            o, last, plugins, idle = client.opts, None, None, 0.0
+            try:
+                while True:
+                    out = []
+                    st = client.status()
+                    diff = st if last is None else {k: v for k, v in st.items()
+                                                    if k != "uptimeSeconds" and last.get(k) != v}
+                    if diff:
+                        out.append(_sse("status", diff))
+                        last = st
+                    pl = client.plugin_list()
+                    if pl != plugins:
+                        out.append(_sse("plugins", pl))
+                        plugins = pl
+                    if diff and client.logged_in():
+                        out.append(_sse("log", [f"{time.strftime('%H:%M:%S')} INFO SimScript - "
+                                                f"hp {st['hp']} for {client.name}"]))
+                    if not out and idle >= o.ping_s:
+                        out.append(b": ping\n\n")
+                    idle = 0.0 if out else idle + o.push_tick
+                    if out:
+                        self.wfile.write(b"".join(out))
+                        self.wfile.flush()
+                    with client.lock:
+                        client.changed.wait(o.push_tick)
+            except OSError:
+                pass
+
+        def _body(self) -> dict:
+            n = int(self.headers.get("Content-Length") or 0)
+            try:
+                return json.loads(self.rfile.read(n) or b"{}")
+            except ValueError:
+                return {}
+
+        def do_GET(self):
+            if not self._inject():
+                return
+            if self.path == "/events" and client.opts.push:
+                self._events()
+                return
+            route = {"/status": client.status, "/plugins": client.plugin_list,
+                     "/logs": client.log_lines}.get(self.path)
+            if route is None:
+                self._send({"error": "not found"}, 404)
+            else:
+                self._send(route())
+
+        def do_POST(self):
+            body = self._body()
+            if not self._inject():
+                return
+            if self.path in ("/pause", "/resume"):
+                client.set_paused(self.path == "/pause")
+                self._send({"ok": True})
+            elif self.path in ("/plugins/start", "/plugins/stop"):
+                ok = client.set_plugin(body.get("className", ""), self.path.endswith("start"))
+                self._send({"ok": ok}, 200 if ok else 404)
+            elif self.path == "/profit/reset":
+                with client.lock:
+                    client.profit_since = time.time()
+                self._send({"ok": True})
+            else:
+                self._send({"error": "not found"}, 404)
+
+    return Handler
+
+
+def _sse(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Fleet:
+    """
+    N fake clients on consecutive ports starting at ``start_port``.
+    Usable as a context manager; servers run on daemon threads.
+    """
+
+    def __init__(self, n: int, opts: SimOptions = None, start_port: int = PORT_RANGE.start,
+                 names=None, host: str = "127.0.0.1"):
+        self.opts = opts or SimOptions()
+        self.host = host
+        names = list(names or [f"SimBot{i:03d}" for i in range(n)])
+        self.clients = {start_port + i: FakeClient(names[i], self.opts, seed=i + 1)
+                        for i in range(n)}
+        self._servers = []
+
+    def start(self) -> "Fleet":
+        for port, client in self.clients.items():
+            srv = _Server((self.host, port), _make_handler(client))
+            # Short poll interval so stop() on a large fleet doesn't take 0.5 s per server
+            threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True).start()
+            self._servers.append(srv)
+        return self
+
+    def stop(self):
+        for srv in self._servers:
+            srv.shutdown()
+            srv.server_close()
+        self._servers.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def names(self) -> dict:
+        return {port: c.name for port, c in self.clients.items()}
+
+    def total_requests(self) -> int:
+        return sum(c.requests for c in self.clients.values())
+
+
+def serve_single(name: str, opts: SimOptions, host: str = "127.0.0.1"):
+    """Serve one client on the first free port in PORT_RANGE until killed."""
+    client = FakeClient(name, opts)
+    for port in PORT_RANGE:
+        try:
+            srv = _Server((host, port), _make_handler(client))
+        except OSError:
+            continue
+        srv.serve_forever()
+        return
+    raise SystemExit("No free port in 7070-7199")
+
+
+def write_stub_java(directory) -> Path:
+    """Write an executable stub named ``java`` into ``directory`` and return its path."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stub = directory / "java"
+    stub.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).resolve()}" '
+                    f'client --from-java "$@"\n', encoding="utf-8")
+    stub.chmod(stub.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return stub
+
+
+def port_open(port: int, host: str = "127.0.0.1") -> bool:
+    with socket.socket() as s:
+        s.settimeout(0.05)
+        return s.connect_ex((host, port)) == 0
+
+
+def _add_sim_args(ap):
+    for f in SimOptions.__dataclass_fields__.values():
+        flag = "--" + f.name.replace("_", "-")
+        if isinstance(f.default, bool):
+            ap.add_argument(flag, action="store_true", default=f.default)
+        else:
+            ap.add_argument(flag, type=type(f.default), default=f.default)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    fl = sub.add_parser("fleet", help="serve N fake clients")
+    fl.add_argument("-n", type=int, default=10)
+    fl.add_argument("--start-port", type=int, default=PORT_RANGE.start)
+    _add_sim_args(fl)
+    cl = sub.add_parser("client", help="serve one fake client on the first free port",
+                        allow_abbrev=False)
+    cl.add_argument("--name", default="")
+    cl.add_argument("--from-java", action="store_true", help=argparse.SUPPRESS)
+    _add_sim_args(cl)
+    sj = sub.add_parser("stub-java", help="write a stub java executable")
+    sj.add_argument("directory")
+    a, extra = ap.parse_known_args()
+
+    if a.cmd == "stub-java":
+        print(write_stub_java(a.directory))
+        return
+    opts = SimOptions(**{k: getattr(a, k) for k in SimOptions.__dataclass_fields__})
+    if a.cmd == "fleet":
+        fleet = Fleet(a.n, opts, a.start_port).start()
+        print(f"Serving {a.n} fake clients on ports {a.start_port}-{a.start_port + a.n - 1}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            fleet.stop()
+        return
+    # client: when spawned as "java ... -jar x.jar --profile NAME", take the name from --profile
+    name = a.name
+    if not name and "--profile" in extra:
+        i = extra.index("--profile")
+        name = extra[i + 1] if i + 1 < len(extra) else ""
+    login = os.environ.get("BT_SIM_LOGIN_DELAY")
+    if login:
+        opts.login_delay = float(login)
+    serve_single(name or f"SimBot{os.getpid()}", opts)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ config.py - Settings and account storage
 """
 import json
 import os
+import threading
 import uuid
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
@@ -14,6 +15,14 @@ SETTINGS_FILE = APP_DATA_DIR / "settings.json"
 ACCOUNTS_FILE = APP_DATA_DIR / "accounts.json"
 CREDENTIALS_FILENAME = "credentials.properties"
 MANAGED_PLUGINS_FILE = APP_DATA_DIR / "managed_plugins.json"
+PLUGIN_CATALOG_FILE = APP_DATA_DIR / "plugin_catalog.json"
+SCHEDULE_FILE = APP_DATA_DIR / "schedule.json"
+JVM_PROFILES_FILE = APP_DATA_DIR / "jvm_profiles.json"
+GROUPS_FILE = APP_DATA_DIR / "groups.json"
+MEMORY_HISTORY_FILE = APP_DATA_DIR / "memory_history.json"
+PROCESS_REGISTRY_FILE = APP_DATA_DIR / "running.json"
+ALERTS_FILE = APP_DATA_DIR / "alerts.json"
+ALERTS_LOG_FILE = APP_DATA_DIR / "alerts.log"
 
 
 def _detect_runelite_folder() -> str:
@@ -29,54 +38,224 @@ def ensure_dirs():
     PROFILES_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# ── Credential cache ───────────────────────────────────────────────────────────
+#
+# Credential blobs are tiny but are read on every import, switch and launch.
+# Entries are keyed by path and validated against (st_mtime_ns, st_size), so a
+# cache hit costs one stat() and a file changed behind our back is re-read.
+# Directory listings are validated the same way against the directory's own
+# mtime, which changes whenever a file is created, deleted or renamed in it.
+
+_cache_lock = threading.Lock()
+_file_cache: dict = {}   # path -> ((mtime_ns, size), bytes)
+_dir_cache: dict = {}    # dir  -> ((mtime_ns, size), frozenset of names)
+_name_cache: dict = {}   # credentials path -> (stat keys, detected name, profile file it came from or None,
+                         #                     newest *.profile mtime when profiles were consulted or None)
+
+
+def _stat_key(path: Path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def read_file_cached(path: Path):
+    """Return the bytes of ``path`` (None if missing), re-reading only when it changed."""
+    key = _stat_key(path)
+    if key is None:
+        with _cache_lock:
+            _file_cache.pop(path, None)
+        return None
+    with _cache_lock:
+        hit = _file_cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return None
+    with _cache_lock:
+        # The stat from before the read: if the file changed while it was read, the next call re-reads it
+        _file_cache[path] = (key, data)
+    return data
+
+
+def write_file_cached(path: Path, data: bytes) -> bool:
+    """
+    Write ``data`` to ``path`` unless it already holds exactly those bytes.
+    Returns True if the file was written.
+    """
+    if read_file_cached(path) == data:
+        return False
+    Path(path).write_bytes(data)
+    key = _stat_key(path)
+    with _cache_lock:
+        if key is not None:
+            _file_cache[path] = (key, data)
+        else:
+            _file_cache.pop(path, None)
+    return True
+
+
+def dir_names_cached(directory: Path) -> frozenset:
+    """Return the file names in ``directory``, re-listing only when it changed."""
+    key = _stat_key(directory)
+    if key is None:
+        return frozenset()
+    with _cache_lock:
+        hit = _dir_cache.get(directory)
+    if hit and hit[0] == key:
+        return hit[1]
+    try:
+        names = frozenset(os.listdir(directory))
+    except OSError:
+        return frozenset()
+    with _cache_lock:
+        _dir_cache[directory] = (key, names)
+    return names
+
+
+def file_exists_cached(path: Path) -> bool:
+    return Path(path).name in dir_names_cached(Path(path).parent)
+
+
+def invalidate_file_cache(path: Path = None):
+    """Drop cached entries for ``path``, or everything when no path is given."""
+    with _cache_lock:
+        if path is None:
+            _file_cache.clear()
+            _dir_cache.clear()
+            _name_cache.clear()
+        else:
+            _file_cache.pop(path, None)
+            _name_cache.pop(path, None)
+            _dir_cache.pop(Path(path).parent, None)
+
+
 def read_account_name_from_credentials(credentials_path: Path) -> str:
+    """
+    Detect the account name for a credentials file.
+    The result is cached against the credentials file and the profiles2
+    folder. A name looked up in profiles2 is also keyed on the newest
+    ``*.profile`` mtime (RuneLite rewrites profiles in place, which leaves the
+    folder's own stat alone) and on the profile file it came from. Repeated
+    imports of an unchanged file cost two stats, plus one scandir when the
+    name came from a profile.
+    """
+    profiles2 = credentials_path.parent / "profiles2"
+    key = (_stat_key(credentials_path), _stat_key(profiles2))
+    with _cache_lock:
+        hit = _name_cache.get(credentials_path)
+    if (hit and hit[0][:2] == key and (hit[2] is None or _stat_key(hit[2]) == hit[0][2])
+            and (hit[3] is None or _newest_profile_ns(_scan_profiles(profiles2)) == hit[3])):
+        return hit[1]
+    name, source, newest = _detect_account_name(credentials_path, profiles2, key[1] is not None)
+    with _cache_lock:
+        _name_cache[credentials_path] = (key + ((_stat_key(source) if source else None),), name, source, newest)
+    return name
+
+
+# Keys checked in priority order; the first one holding a usable value wins.
+_CREDENTIAL_NAME_KEYS = ("jx_display_name", "displayname", "display_name", "accountname",
+                         "account_name", "username", "name", "id", "accountid")
+_PROFILE_NAME_KEYS = frozenset(("name", "displayname", "accountname"))
+
+
+def _parse_credential_keys(text: str) -> dict:
+    """
+    Single pass over a credentials file: lower-cased key -> first usable value.
+    Empty values and values that look like session tokens are skipped, so a
+    later line with the same key can still supply the name.
+    """
+    found = {}
+    for line in text.splitlines():
+        key, sep, val = line.strip().partition("=")
+        if not sep:
+            continue
+        key = key.lower()
+        if key in found:
+            continue
+        val = val.strip()
+        if val and not _looks_like_token(val):
+            found[key] = val
+    return found
+
+
+def _scan_profiles(profiles2: Path) -> list:
+    """Return ``*.profile`` entries in profiles2, newest first, from one scandir pass."""
+    entries = []
     try:
-        text = credentials_path.read_text(encoding="utf-8", errors="ignore")
-        for key in ("JX_DISPLAY_NAME", "displayName", "display_name", "accountName",
-                    "account_name", "username", "name", "id", "accountId"):
-            for line in text.splitlines():
-                line = line.strip()
-                if line.lower().startswith(key.lower() + "="):
-                    val = line.split("=", 1)[1].strip()
-                    if val and not _looks_like_token(val):
+        with os.scandir(profiles2) as it:
+            for entry in it:
+                if not entry.name.endswith(".profile"):
+                    continue
+                try:
+                    # DirEntry caches its stat; on Windows it comes free with the listing
+                    entries.append((entry.stat().st_mtime_ns, entry))
+                except OSError:
+                    continue
+    except OSError:
+        return []
+    entries.sort(key=lambda e: e[0], reverse=True)
+    return [e for _, e in entries]
+
+
+def _newest_profile_ns(profiles: list) -> int:
+    """mtime of the first (newest) entry from _scan_profiles(), 0 when there is none."""
+    try:
+        return profiles[0].stat().st_mtime_ns if profiles else 0
+    except OSError:
+        return 0
+
+
+def _profile_name_from_file(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as fh:
+            for line in fh:
+                key, sep, val = line.strip().partition("=")
+                if sep and key.lower() in _PROFILE_NAME_KEYS:
+                    val = val.strip()
+                    if val:
                         return val
-    except Exception:
+    except OSError:
         pass
+    return ""
 
-    runelite_folder = credentials_path.parent
-    profiles2 = runelite_folder / "profiles2"
-    if profiles2.exists():
-        try:
-            profile_files = sorted(
-                profiles2.glob("*.profile"),
-                key=lambda p: p.stat().st_mtime,
-                reverse=True
-            )
-            if profile_files:
-                name = profile_files[0].stem
-                if name and name.lower() not in ("default", ""):
-                    return name
-        except Exception:
-            pass
-
-    if profiles2.exists():
-        try:
-            for pfile in sorted(profiles2.glob("*.profile"),
-                                key=lambda p: p.stat().st_mtime, reverse=True):
-                text = pfile.read_text(encoding="utf-8", errors="ignore")
-                for line in text.splitlines():
-                    line = line.strip()
-                    for key in ("name", "displayName", "accountName"):
-                        if line.lower().startswith(key.lower() + "="):
-                            val = line.split("=", 1)[1].strip()
-                            if val:
-                                return val
-        except Exception:
-            pass
 
+def account_name_from_text(text: str) -> str:
+    """The account name held in the text of a credentials file ("" if none)."""
+    found = _parse_credential_keys(text)
+    for key in _CREDENTIAL_NAME_KEYS:
+        if key in found:
+            return found[key]
     return ""
 
 
+def _detect_account_name(credentials_path: Path, profiles2: Path, has_profiles: bool) -> tuple:
+    """(name, the profile file it came from or None, newest profile mtime or None if not consulted)."""
+    text = (read_file_cached(credentials_path) or b"").decode("utf-8", errors="ignore")
+    name = account_name_from_text(text)
+    if name:
+        return name, None, None
+
+    if not has_profiles:
+        return "", None, None
+    profiles = _scan_profiles(profiles2)
+    newest = _newest_profile_ns(profiles)
+    if profiles:
+        name = profiles[0].name[:-len(".profile")]
+        if name and name.lower() != "default":
+            return name, profiles[0].path, newest
+
+    for entry in profiles:
+        name = _profile_name_from_file(entry.path)
+        if name:
+            return name, entry.path, newest
+    return "", None, newest
+
+
 def _looks_like_token(val: str) -> bool:
     return len(val) > 40 and " " not in val
 
@@ -108,6 +287,185 @@ def save_managed_plugins(managed: set):
         pass
 
 
+# ── Plugin catalog persistence ─────────────────────────────────────────────────
+
+def load_plugin_catalog() -> dict:
+    """
+    Load the plugin catalog: className -> {"name": str, "last_seen": float}.
+    Returns an empty dict if nothing has been seen yet.
+    """
+    try:
+        if PLUGIN_CATALOG_FILE.exists():
+            data = json.loads(PLUGIN_CATALOG_FILE.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {cls: e for cls, e in data.items()
+                        if isinstance(e, dict) and e.get("name")}
+    except Exception:
+        pass
+    return {}
+
+
+def save_plugin_catalog(catalog: dict):
+    """Persist the plugin catalog to disk."""
+    try:
+        ensure_dirs()
+        PLUGIN_CATALOG_FILE.write_text(
+            json.dumps(catalog, indent=2, sort_keys=True), encoding="utf-8")
+    except Exception:
+        pass
+
+
+# ── JVM profiles ───────────────────────────────────────────────────────────────
+
+GC_FLAGS = {
+    "G1":         "-XX:+UseG1GC",
+    "Serial":     "-XX:+UseSerialGC",
+    "Parallel":   "-XX:+UseParallelGC",
+    "ZGC":        "-XX:+UseZGC",
+    "Shenandoah": "-XX:+UseShenandoahGC",
+}
+
+
+@dataclass
+class JvmProfile:
+    heap_min_mb: int = 0        # -Xms; 0 leaves it to the JVM
+    heap_max_mb: int = 0        # -Xmx; 0 keeps whatever Settings.jvm_args says
+    auto_heap: bool = False     # size -Xmx from the account's peak RSS history instead
+    gc: str = ""                # key of GC_FLAGS; "" keeps the JVM default
+    cds_archive: str = ""       # class-data sharing archive; created on first run if missing
+    thread_stack_kb: int = 0    # -Xss; 0 keeps the JVM default
+    extra: str = ""             # any other JVM flags
+
+    def to_dict(self):
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(d: dict) -> "JvmProfile":
+        return JvmProfile(
+            heap_min_mb=max(0, int(d.get("heap_min_mb", 0))),
+            heap_max_mb=max(0, int(d.get("heap_max_mb", 0))),
+            auto_heap=bool(d.get("auto_heap", False)),
+            gc=str(d.get("gc", "")),
+            cds_archive=str(d.get("cds_archive", "")),
+            thread_stack_kb=max(0, int(d.get("thread_stack_kb", 0))),
+            extra=str(d.get("extra", "")),
+        )
+
+    def build_args(self, heap_max_mb: int = 0) -> list:
+        """JVM flags for this profile; ``heap_max_mb`` (auto mode) overrides heap_max_mb."""
+        args = []
+        xmx = heap_max_mb or self.heap_max_mb
+        if self.heap_min_mb:     args.append(f"-Xms{min(self.heap_min_mb, xmx) if xmx else self.heap_min_mb}m")
+        if xmx:                  args.append(f"-Xmx{xmx}m")
+        if self.thread_stack_kb: args.append(f"-Xss{self.thread_stack_kb}k")
+        if self.gc in GC_FLAGS:  args.append(GC_FLAGS[self.gc])
+        if self.cds_archive:
+            if Path(self.cds_archive).exists():
+                args += ["-Xshare:auto", f"-XX:SharedArchiveFile={self.cds_archive}"]
+            else:
+                args.append(f"-XX:ArchiveClassesAtExit={self.cds_archive}")
+        if self.extra:           args += self.extra.split()
+        return args
+
+
+def load_jvm_profiles() -> dict:
+    """Profile name -> JvmProfile."""
+    try:
+        if JVM_PROFILES_FILE.exists():
+            data = json.loads(JVM_PROFILES_FILE.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {n: JvmProfile.from_dict(p) for n, p in data.items() if isinstance(p, dict)}
+    except Exception:
+        pass
+    return {}
+
+
+def save_jvm_profiles(profiles: dict):
+    ensure_dirs()
+    JVM_PROFILES_FILE.write_text(
+        json.dumps({n: p.to_dict() for n, p in sorted(profiles.items())}, indent=2), encoding="utf-8")
+
+
+@dataclass
+class GroupSettings:
+    jvm_profile: str = ""         # JvmProfile for members without one of their own
+    launch_concurrency: int = 1   # clients of the group booting at once during a group launch
+    poll_scale: float = 1.0       # x poll intervals of members (0.5 = twice as often); urgent polls stay at 1 s
+
+    def to_dict(self):
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(d: dict) -> "GroupSettings":
+        return GroupSettings(
+            jvm_profile=d.get("jvm_profile", ""),
+            launch_concurrency=max(1, int(d.get("launch_concurrency", 1))),
+            poll_scale=float(d.get("poll_scale", 1.0)) or 1.0,
+        )
+
+    def is_default(self) -> bool:
+        return self == GroupSettings()
+
+
+def load_groups() -> dict:
+    """Group name -> GroupSettings; groups with default settings need no entry."""
+    try:
+        if GROUPS_FILE.exists():
+            data = json.loads(GROUPS_FILE.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {n: GroupSettings.from_dict(g) for n, g in data.items() if isinstance(g, dict)}
+    except Exception:
+        pass
+    return {}
+
+
+def save_groups(groups: dict):
+    ensure_dirs()
+    GROUPS_FILE.write_text(
+        json.dumps({n: g.to_dict() for n, g in sorted(groups.items()) if not g.is_default()}, indent=2),
+        encoding="utf-8")
+
+
+def load_memory_history() -> dict:
+    """Account id -> [{"peak_mb", "heap_mb", "ended"}, ...], oldest first."""
+    try:
+        if MEMORY_HISTORY_FILE.exists():
+            data = json.loads(MEMORY_HISTORY_FILE.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {aid: h for aid, h in data.items() if isinstance(h, list)}
+    except Exception:
+        pass
+    return {}
+
+
+def save_memory_history(history: dict):
+    try:
+        ensure_dirs()
+        MEMORY_HISTORY_FILE.write_text(json.dumps(history), encoding="utf-8")
+    except Exception:
+        pass
+
+
+def load_process_registry() -> dict:
+    """Account id -> {"pid", "create_time", "cmd_hash", "argc", "heap_mb"} of clients launched by us."""
+    try:
+        if PROCESS_REGISTRY_FILE.exists():
+            data = json.loads(PROCESS_REGISTRY_FILE.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                return {aid: e for aid, e in data.items() if isinstance(e, dict) and "pid" in e}
+    except Exception:
+        pass
+    return {}
+
+
+def save_process_registry(registry: dict):
+    try:
+        ensure_dirs()
+        PROCESS_REGISTRY_FILE.write_text(json.dumps(registry, indent=2), encoding="utf-8")
+    except Exception:
+        pass
+
+
 @dataclass
 class ClientArgs:
     clean_jagex_launcher: bool = False
@@ -179,6 +537,8 @@ class Account:
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     http_port: int = 0
     skip_launch: bool = False  # if True, excluded from Launch All
+    jvm_profile: str = ""      # name of a JvmProfile; "" uses Settings.jvm_args alone
+    groups: list = field(default_factory=list)  # group names; the first group that sets something wins
 
     def to_dict(self):
         return {
@@ -189,6 +549,8 @@ class Account:
             "id": self.id,
             "http_port": self.http_port,
             "skip_launch": self.skip_launch,
+            "jvm_profile": self.jvm_profile,
+            "groups": list(self.groups),
         }
 
     @staticmethod
@@ -208,6 +570,8 @@ class Account:
             id=d.get("id", str(uuid.uuid4())),
             http_port=d.get("http_port", 0),
             skip_launch=d.get("skip_launch", False),
+            jvm_profile=d.get("jvm_profile", ""),
+            groups=[g for g in d.get("groups", []) if isinstance(g, str) and g],
         )
 
 
@@ -218,6 +582,13 @@ class Settings:
     jar_path: str         = ""
     jvm_args: str         = "-Xmx512m"
     protect_process: bool = False
+    diagnostics: bool     = False
+    compact_bot_manager: bool = False
+    poll_budget: int      = 60
+    scan_ports: str       = "7070-7199"   # local client ports, e.g. "7070-7199, 8000-8010"
+    remote_hosts: str     = ""            # agents, e.g. "box2=192.168.1.20:7300, box3=10.0.0.5"
+    agent_token: str      = ""            # shared secret sent to every agent
+    metrics_port: int     = 0             # local /metrics endpoint; 0 = off
 
     def to_dict(self):
         return asdict(self)
@@ -230,6 +601,13 @@ class Settings:
             jar_path         = d.get("jar_path", ""),
             jvm_args         = d.get("jvm_args", "-Xmx512m"),
             protect_process  = d.get("protect_process", False),
+            diagnostics      = d.get("diagnostics", False),
+            compact_bot_manager = d.get("compact_bot_manager", False),
+            poll_budget      = d.get("poll_budget", 60),
+            scan_ports       = d.get("scan_ports", "7070-7199"),
+            remote_hosts     = d.get("remote_hosts", ""),
+            agent_token      = d.get("agent_token", ""),
+            metrics_port     = d.get("metrics_port", 0),
         )
 
     @property
@@ -237,6 +615,110 @@ class Settings:
         return Path(self.runelite_folder) / CREDENTIALS_FILENAME
 
 
+@dataclass
+class SessionPlan:
+    enabled: bool = True
+    windows: str = "09:00-17:00"   # daily HH:MM-HH:MM windows, comma-separated; may wrap midnight
+    session_min: int = 120         # max length of one session
+    break_min: int = 20            # break between sessions inside a window
+    jitter_min: int = 10           # every start, length and break is shifted by up to ± this
+
+    def to_dict(self):
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(d: dict) -> "SessionPlan":
+        return SessionPlan(
+            enabled=d.get("enabled", True),
+            windows=d.get("windows", "09:00-17:00"),
+            session_min=d.get("session_min", 120),
+            break_min=d.get("break_min", 20),
+            jitter_min=d.get("jitter_min", 10),
+        )
+
+
+@dataclass
+class Schedule:
+    enabled: bool = False
+    max_booting: int = 2        # clients allowed to be starting up at the same time
+    launch_gap_s: int = 20      # minimum spacing between any two launches
+    boot_estimate_s: int = 60   # launch -> logged in, used by the load preview
+    plans: dict = field(default_factory=dict)   # account id -> SessionPlan
+
+    def to_dict(self):
+        d = asdict(self)
+        d["plans"] = {aid: p.to_dict() for aid, p in self.plans.items()}
+        return d
+
+    @staticmethod
+    def from_dict(d: dict) -> "Schedule":
+        plans = d.get("plans", {})
+        return Schedule(
+            enabled=d.get("enabled", False),
+            max_booting=d.get("max_booting", 2),
+            launch_gap_s=d.get("launch_gap_s", 20),
+            boot_estimate_s=d.get("boot_estimate_s", 60),
+            plans={aid: SessionPlan.from_dict(p) for aid, p in plans.items()
+                   if isinstance(p, dict)} if isinstance(plans, dict) else {},
+        )
+
+
+ALERT_KINDS = {
+    # kind: (label, threshold unit)
+    "hp_below":    ("HP below", "% of max"),
+    "profit_flat": ("Profit flat for", "minutes"),
+    "offline":     ("Offline for", "scans"),
+    "log_repeat":  ("Same log line", "times in a row"),
+}
+
+
+@dataclass
+class AlertRule:
+    name: str = "Low HP"
+    kind: str = "hp_below"      # one of ALERT_KINDS
+    threshold: float = 30
+    cooldown_min: float = 10    # a rule stays quiet this long per account after firing
+    enabled: bool = True
+
+    def to_dict(self):
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(d: dict) -> "AlertRule":
+        return AlertRule(
+            name=d.get("name", "Low HP"),
+            kind=d.get("kind", "hp_below") if d.get("kind") in ALERT_KINDS else "hp_below",
+            threshold=d.get("threshold", 30),
+            cooldown_min=d.get("cooldown_min", 10),
+            enabled=d.get("enabled", True),
+        )
+
+
+def default_alert_rules() -> list:
+    return [AlertRule("Low HP", "hp_below", 30, 5),
+            AlertRule("Not earning", "profit_flat", 15, 30),
+            AlertRule("Offline", "offline", 5, 30),
+            AlertRule("Stuck in a loop", "log_repeat", 20, 15)]
+
+
+@dataclass
+class AlertConfig:
+    rules: list = field(default_factory=default_alert_rules)   # [AlertRule]
+    webhook_url: str = ""       # alerts are also POSTed here as JSON when set
+
+    def to_dict(self):
+        return {"rules": [r.to_dict() for r in self.rules], "webhook_url": self.webhook_url}
+
+    @staticmethod
+    def from_dict(d: dict) -> "AlertConfig":
+        rules = d.get("rules")
+        return AlertConfig(
+            rules=[AlertRule.from_dict(r) for r in rules if isinstance(r, dict)]
+            if isinstance(rules, list) else default_alert_rules(),
+            webhook_url=d.get("webhook_url", ""),
+        )
+
+
 def load_settings() -> Settings:
     ensure_dirs()
     if SETTINGS_FILE.exists():
@@ -264,7 +746,38 @@ def load_accounts() -> list:
 
 
 def save_accounts(accounts: list):
+    # Written aside and swapped in, so a failed save leaves the previous list intact
+    ensure_dirs()
+    tmp = ACCOUNTS_FILE.with_name(ACCOUNTS_FILE.name + ".tmp")
+    tmp.write_text(json.dumps([a.to_dict() for a in accounts], indent=2), encoding="utf-8")
+    os.replace(tmp, ACCOUNTS_FILE)
+
+
+def load_schedule() -> Schedule:
+    ensure_dirs()
+    if SCHEDULE_FILE.exists():
+        try:
+            return Schedule.from_dict(json.loads(SCHEDULE_FILE.read_text(encoding="utf-8")))
+        except Exception:
+            pass
+    return Schedule()
+
+
+def save_schedule(s: Schedule):
+    ensure_dirs()
+    SCHEDULE_FILE.write_text(json.dumps(s.to_dict(), indent=2), encoding="utf-8")
+
+
+def load_alerts() -> AlertConfig:
+    ensure_dirs()
+    if ALERTS_FILE.exists():
+        try:
+            return AlertConfig.from_dict(json.loads(ALERTS_FILE.read_text(encoding="utf-8")))
+        except Exception:
+            pass
+    return AlertConfig()
+
+
+def save_alerts(a: AlertConfig):
     ensure_dirs()
-    ACCOUNTS_FILE.write_text(
-        json.dumps([a.to_dict() for a in accounts], indent=2), encoding="utf-8"
-    )
+    ALERTS_FILE.write_text(json.dumps(a.to_dict(), indent=2), encoding="utf-8")
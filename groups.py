@@ -0,0 +1,140 @@
+"""
+groups.py - Account groups: membership index and per-group settings
+
+Accounts carry a list of group names (config.Account.groups). GroupIndex
+keeps group -> members and account -> groups maps that are updated one
+account at a time (add / update / remove), so resolving "every account in
+farm-B" is a dict lookup instead of a scan over all accounts, and changing
+one account's groups costs O(its groups).
+
+Per-group settings (config.GroupSettings: JVM profile, launch concurrency,
+poll scale) apply to members that do not set the same thing themselves; an
+account in several groups takes each setting from the first of its groups
+that sets it.
+"""
+
+import threading
+
+import config as cfg
+
+
+def parse_groups(text) -> list:
+    """"farm-B, mules" -> ["farm-B", "mules"]; blanks and repeats (case-insensitive) dropped."""
+    out, seen = [], set()
+    for g in str(text).split(","):
+        g = g.strip()
+        if g and g.lower() not in seen:
+            seen.add(g.lower())
+            out.append(g)
+    return out
+
+
+class GroupIndex:
+    """Thread-safe; read from launch and poll threads, updated from the UI."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._members = {}      # group -> {account id: Account}, in the order accounts joined
+        self._of = {}           # account id -> tuple of its groups as last indexed
+        self._settings = {}     # group -> cfg.GroupSettings
+
+    def rebuild(self, accounts, settings=None):
+        with self._lock:
+            self._members, self._of = {}, {}
+            if settings is not None:
+                self._settings = dict(settings)
+            for a in accounts:
+                self._index(a)
+
+    # Membership
+
+    def _index(self, account):
+        old = self._of.get(account.id, ())
+        new = tuple(account.groups)
+        for g in old:
+            if g not in new:
+                m = self._members.get(g)
+                if m is not None:
+                    m.pop(account.id, None)
+                    if not m:
+                        del self._members[g]
+        for g in new:
+            self._members.setdefault(g, {})[account.id] = account
+        if new:
+            self._of[account.id] = new
+        else:
+            self._of.pop(account.id, None)
+
+    def update(self, account):
+        """(Re)index ``account`` after it was added or its groups changed."""
+        with self._lock:
+            self._index(account)
+
+    add = update
+
+    def set_groups(self, account, groups):
+        """Spellings of existing groups are reused, so "Farm-b" joins "farm-B"."""
+        known = {g.lower(): g for g in self.names()}
+        account.groups = [known.get(g.lower(), g) for g in parse_groups(",".join(groups))]
+        self.update(account)
+
+    def remove(self, account_id):
+        with self._lock:
+            for g in self._of.pop(account_id, ()):
+                m = self._members.get(g)
+                if m is not None:
+                    m.pop(account_id, None)
+                    if not m:
+                        del self._members[g]
+
+    def names(self) -> list:
+        """Every group with at least one member or saved settings, sorted."""
+        with self._lock:
+            return sorted(set(self._members) | set(self._settings), key=str.lower)
+
+    def members(self, group) -> list:
+        with self._lock:
+            return list(self._members.get(group, {}).values())
+
+    def member_ids(self, group) -> set:
+        with self._lock:
+            return set(self._members.get(group, ()))
+
+    def counts(self) -> dict:
+        with self._lock:
+            return {g: len(m) for g, m in self._members.items()}
+
+    # Settings
+
+    def settings(self, group) -> cfg.GroupSettings:
+        with self._lock:
+            return self._settings.get(group) or cfg.GroupSettings()
+
+    def all_settings(self) -> dict:
+        with self._lock:
+            return dict(self._settings)
+
+    def set_settings(self, settings: dict):
+        with self._lock:
+            self._settings = {g: s for g, s in settings.items() if not s.is_default()}
+
+    def _first(self, account, attr, default):
+        with self._lock:
+            for g in self._of.get(account.id, ()):
+                s = self._settings.get(g)
+                if s is not None and getattr(s, attr) != default:
+                    return getattr(s, attr)
+        return default
+
+    def jvm_profile(self, account) -> str:
+        """The account's own JVM profile, else its first group's."""
+        return account.jvm_profile or self._first(account, "jvm_profile", "")
+
+    def poll_scale(self, account) -> float:
+        return self._first(account, "poll_scale", 1.0)
+
+    def launch_concurrency(self, group) -> int:
+        return max(1, self.settings(group).launch_concurrency)
+
+
+index = GroupIndex()
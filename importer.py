@@ -0,0 +1,318 @@
+"""
+importer.py - Bulk credential import from a folder or an archive
+
+scan() collects every credentials file under a folder (recursively) or in a
+.zip / .tar(.gz) archive. A thread pool reads, hashes and names them. It also
+hashes the credential files already in PROFILES_DIR, so that
+re-importing a file an account already has is reported as a duplicate
+instead of creating a second account. Each file ends up as one Candidate:
+
+  NEW         an account to add
+  UPDATE      an existing account (same name) whose credentials differ
+  DUPLICATE   same bytes as an existing account or an earlier file
+  SKIPPED     unreadable, too large, no usable account name, or a name clash
+
+commit() applies a plan as one transaction. The accounts may have changed
+since the scan, so it first re-checks each new or updated candidate's name
+and bytes against them. It then writes the new credential files beside
+their final names, swaps them in and saves the account list once. If
+anything fails, every file is put back as it was and the account list is
+not touched.
+"""
+
+import hashlib
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import config as cfg
+import perf
+import switcher as sw
+
+NEW, UPDATE, DUPLICATE, SKIPPED = "new", "update", "duplicate", "skipped"
+
+MAX_BYTES = 256 * 1024      # credentials files are a few KB; anything this big is something else
+WORKERS = 8
+ARCHIVES = (".zip", ".tar", ".tar.gz", ".tgz")
+
+
+class BulkImportError(Exception):
+    pass
+
+
+@dataclass
+class Candidate:
+    source: str                 # file path, or "<archive>:<member>"
+    label: str = ""             # path inside the folder / archive, as reported
+    data: bytes = b""
+    digest: str = ""
+    name: str = ""
+    status: str = ""
+    reason: str = ""
+    account: object = None      # the existing Account for UPDATE / DUPLICATE
+    reuse_file: str = ""        # an unowned PROFILES_DIR file that already holds these bytes
+
+
+@dataclass
+class Plan:
+    source: str
+    candidates: list = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    def of(self, status) -> list:
+        return [c for c in self.candidates if c.status == status]
+
+    def summary(self) -> str:
+        n = {s: len(self.of(s)) for s in (NEW, UPDATE, DUPLICATE, SKIPPED)}
+        return (f"{len(self.candidates)} credential file(s) in {self.elapsed_s:.1f}s: {n[NEW]} new, "
+                f"{n[UPDATE]} existing account(s) with changed credentials, {n[DUPLICATE]} duplicate(s), "
+                f"{n[SKIPPED]} skipped.")
+
+
+@dataclass
+class Report:
+    added: list = field(default_factory=list)       # display names
+    updated: list = field(default_factory=list)
+    duplicates: list = field(default_factory=list)  # (label, why)
+    skipped: list = field(default_factory=list)     # (label, why)
+    elapsed_s: float = 0.0
+
+    def summary(self) -> str:
+        lines = [f"Imported {len(self.added)} new account(s) and updated {len(self.updated)} in {self.elapsed_s:.1f}s."]
+        for label, names in (("Added", self.added), ("Updated", self.updated)):
+            if names:
+                lines.append(f"\n{label} ({len(names)}): " + ", ".join(names[:20]) + (" …" if len(names) > 20 else ""))
+        for label, rows in (("Duplicates", self.duplicates), ("Skipped", self.skipped)):
+            if rows:
+                lines.append(f"\n{label} ({len(rows)}):")
+                lines += [f"  {src}: {why}" for src, why in rows[:20]]
+                if len(rows) > 20:
+                    lines.append("  …")
+        return "\n".join(lines)
+
+
+# ── Scanning ───────────────────────────────────────────────────────────────────
+
+def is_archive(path) -> bool:
+    return str(path).lower().endswith(ARCHIVES)
+
+
+def _is_credentials(filename: str) -> bool:
+    n = filename.lower()
+    return n.startswith("credentials") and ".properties" in n and not n.endswith((".tmp", ".importing"))
+
+
+def _name_from_label(label: str) -> str:
+    """credentials.properties.Alice / credentials-Alice.properties / Alice/credentials.properties -> Alice."""
+    parts = label.replace("\\", "/").split("/")
+    fn = parts[-1]
+    if fn.lower().startswith("credentials.properties."):
+        return fn[len("credentials.properties."):].strip()
+    stem = fn[:-len(".properties")] if fn.lower().endswith(".properties") else fn
+    for pre in ("credentials-", "credentials_", "credentials."):
+        if stem.lower().startswith(pre):
+            return stem[len(pre):].strip()
+    parent = parts[-2] if len(parts) > 1 else ""
+    if stem.lower() == "credentials" and parent and not parent.startswith("."):
+        return parent.strip()
+    return ""
+
+
+def _collect(source: Path) -> list:
+    """[Candidate] with data already loaded for archive members (read sequentially from one handle)."""
+    out = []
+    if source.is_dir():
+        for root, _, files in os.walk(source):
+            out += [Candidate(os.path.join(root, f), os.path.relpath(os.path.join(root, f), source))
+                    for f in sorted(files) if _is_credentials(f)]
+        return out
+    name = source.name.lower()
+    try:
+        if name.endswith(".zip"):
+            with zipfile.ZipFile(source) as z:
+                for info in z.infolist():
+                    if info.is_dir() or not _is_credentials(info.filename.rsplit("/", 1)[-1]):
+                        continue
+                    c = Candidate(f"{source.name}:{info.filename}", info.filename)
+                    if info.file_size > MAX_BYTES:
+                        c.status, c.reason = SKIPPED, "too large for a credentials file"
+                    else:
+                        c.data = z.read(info)
+                    out.append(c)
+        elif name.endswith((".tar", ".tar.gz", ".tgz")):
+            with tarfile.open(source) as t:
+                for m in t:
+                    if not m.isfile() or not _is_credentials(m.name.rsplit("/", 1)[-1]):
+                        continue
+                    c = Candidate(f"{source.name}:{m.name}", m.name)
+                    if m.size > MAX_BYTES:
+                        c.status, c.reason = SKIPPED, "too large for a credentials file"
+                    else:
+                        c.data = t.extractfile(m).read()
+                    out.append(c)
+        else:
+            raise BulkImportError(f"Not a folder or a .zip / .tar archive:\n{source}")
+    except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+        raise BulkImportError(f"Could not read {source.name}:\n{e}")
+    return out
+
+
+def _load(c: Candidate, from_disk: bool):
+    """Read (folder files), hash and name one candidate; runs on the pool."""
+    if c.status:
+        return
+    if from_disk:
+        try:
+            if os.path.getsize(c.source) > MAX_BYTES:
+                c.status, c.reason = SKIPPED, "too large for a credentials file"
+                return
+            c.data = Path(c.source).read_bytes()
+        except OSError as e:
+            c.status, c.reason = SKIPPED, f"unreadable ({e.strerror or e})"
+            return
+    c.digest = hashlib.sha256(c.data).hexdigest()
+    c.name = cfg.account_name_from_text(c.data.decode("utf-8", errors="ignore")) or _name_from_label(c.label)
+    if not c.name and from_disk:
+        # A lone credentials.properties in a .runelite folder: its profiles2 may still name it
+        c.name = cfg.read_account_name_from_credentials(Path(c.source))
+
+
+def _digest_file(path: Path) -> str:
+    data = cfg.read_file_cached(path)
+    return hashlib.sha256(data).hexdigest() if data is not None else ""
+
+
+def _account_digests(accounts) -> dict:
+    """digest -> Account for every account whose credentials file can be read."""
+    accounts = [a for a in accounts if a.credentials_file]
+    with ThreadPoolExecutor(max_workers=WORKERS) as ex:
+        digests = ex.map(lambda a: _digest_file(cfg.PROFILES_DIR / a.credentials_file), accounts)
+        return {d: a for a, d in zip(accounts, digests) if d}
+
+
+def scan(source, accounts, workers: int = WORKERS) -> Plan:
+    """Find, read, hash and classify every credentials file in ``source`` against ``accounts``."""
+    t0 = time.perf_counter()
+    source = Path(source)
+    with perf.stage("import.scan"):
+        cands = _collect(source)
+        existing = [p for p in cfg.dir_names_cached(cfg.PROFILES_DIR) if p.startswith(cfg.CREDENTIALS_FILENAME + ".")]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            digests = dict(zip(existing, ex.map(lambda f: _digest_file(cfg.PROFILES_DIR / f), existing)))
+            list(ex.map(lambda c: _load(c, source.is_dir()), cands))
+
+    owner = {a.credentials_file: a for a in accounts if a.credentials_file}
+    by_digest = {}      # digest -> (Account or None, file name)
+    for f, d in digests.items():
+        if d and (d not in by_digest or by_digest[d][0] is None):
+            by_digest[d] = (owner.get(f), f)
+    by_name = {a.display_name.lower(): a for a in accounts}
+    seen_digest, seen_name = {}, {}
+    for c in sorted(cands, key=lambda c: c.label.lower()):
+        if c.status:
+            continue
+        hit = by_digest.get(c.digest)
+        if hit and hit[0] is not None:
+            c.status, c.account, c.reason = DUPLICATE, hit[0], f"already saved as '{hit[0].display_name}'"
+        elif c.digest in seen_digest:
+            c.status, c.reason = DUPLICATE, f"same file as {seen_digest[c.digest]}"
+        elif not c.name:
+            c.status, c.reason = SKIPPED, "no account name found"
+        elif not sw.is_safe_file_part(c.name):
+            c.status, c.reason = SKIPPED, f"account name {c.name!r} cannot be used in a file name"
+        elif c.name.lower() in seen_name:
+            c.status, c.reason = SKIPPED, f"'{c.name}' is also in {seen_name[c.name.lower()]}"
+        elif c.name.lower() in by_name:
+            c.status, c.account = UPDATE, by_name[c.name.lower()]
+        else:
+            c.status = NEW
+            if hit:
+                c.reuse_file = hit[1]
+        seen_digest.setdefault(c.digest, c.label)
+        if c.status in (NEW, UPDATE):
+            seen_name[c.name.lower()] = c.label
+    return Plan(str(source), cands, time.perf_counter() - t0)
+
+
+# ── Commit ─────────────────────────────────────────────────────────────────────
+
+def commit(plan: Plan, accounts: list, overwrite: bool = False) -> Report:
+    """
+    Apply ``plan``: NEW candidates become accounts appended to ``accounts``;
+    UPDATE candidates replace an existing account's credentials if
+    ``overwrite`` and are reported as skipped otherwise. All or nothing:
+    raises BulkImportError with every file and ``accounts`` as they were.
+    """
+    t0 = time.perf_counter()
+    rep = Report()
+    owned = {a.credentials_file.lower() for a in accounts}
+    by_name = {a.display_name.lower(): a for a in accounts}
+    by_digest = _account_digests(accounts) if plan.of(NEW) or plan.of(UPDATE) else {}
+    writes, added = [], []      # writes: (final path, bytes)
+    for c in plan.candidates:
+        status, account, reason = c.status, c.account, c.reason
+        if status in (NEW, UPDATE):
+            # Classified at scan time: an account may have been added, renamed or removed since
+            account = by_digest.get(c.digest)
+            if account is not None:
+                status, reason = DUPLICATE, f"already saved as '{account.display_name}'"
+            else:
+                account = by_name.get(c.name.lower())
+                status = UPDATE if account is not None else NEW
+        if status == NEW:
+            fname = c.reuse_file if c.reuse_file and c.reuse_file.lower() not in owned else ""
+            reuse = bool(fname)
+            fname = fname or sw.new_credentials_filename(c.name)
+            if not reuse and fname.lower() in owned:
+                fname = sw.new_credentials_filename()
+            owned.add(fname.lower())
+            added.append(cfg.Account(display_name=c.name, credentials_file=fname))
+            if not reuse:
+                writes.append((cfg.PROFILES_DIR / fname, c.data))
+            rep.added.append(c.name)
+        elif status == UPDATE and overwrite:
+            writes.append((cfg.PROFILES_DIR / account.credentials_file, c.data))
+            rep.updated.append(account.display_name)
+        elif status == UPDATE:
+            rep.skipped.append((c.label, f"'{c.name}' already exists with different credentials"))
+        elif status == DUPLICATE:
+            rep.duplicates.append((c.label, reason))
+        else:
+            rep.skipped.append((c.label, reason))
+
+    root = cfg.PROFILES_DIR.resolve()
+    for path, _ in writes:
+        if path.resolve().parent != root:
+            raise BulkImportError(f"Refusing to write outside {cfg.PROFILES_DIR}:\n{path}")
+    cfg.ensure_dirs()
+    temps = [(path.with_name(path.name + ".importing"), path, data) for path, data in writes]
+    swapped = []                # (final path, previous bytes or None)
+    with perf.stage("import.commit"):
+        try:
+            with ThreadPoolExecutor(max_workers=WORKERS) as ex:
+                list(ex.map(lambda t: t[0].write_bytes(t[2]), temps))
+            for tmp, path, _ in temps:
+                prev = cfg.read_file_cached(path)
+                os.replace(tmp, path)
+                swapped.append((path, prev))
+            if added:
+                cfg.save_accounts(accounts + added)
+        except OSError as e:
+            for tmp, _, _ in temps:
+                tmp.unlink(missing_ok=True)
+            for path, prev in reversed(swapped):
+                try:
+                    if prev is None:
+                        path.unlink(missing_ok=True)
+                    else:
+                        path.write_bytes(prev)
+                except OSError:
+                    pass
+            raise BulkImportError(f"Import failed and was rolled back:\n{e}")
+    accounts.extend(added)
+    rep.elapsed_s = plan.elapsed_s + time.perf_counter() - t0
+    return rep
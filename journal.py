@@ -0,0 +1,243 @@
+"""
+journal.py - Append-only event journal: launches, stops, exits, logins, errors
+
+Every event is one JSON line {"ts", "kind", "account_id", "name", ...} in
+journal/journal-<first ts ms>.jsonl. record() only appends to an in-memory
+queue; a writer thread flushes the queue every FLUSH_S (and on flush() /
+close()), so launch and kill never wait on the disk. A batch that cannot be
+written goes back to the head of the queue for the next flush; only the
+oldest events beyond MAX_QUEUE are dropped. A segment is closed at
+SEGMENT_BYTES and the oldest segments beyond KEEP_SEGMENTS are deleted.
+
+Each segment's name is the timestamp of its first event, so a query for
+"the last week" opens only the segments that can hold it. Lines of other
+kinds are skipped by a substring test before they are parsed.
+
+    python journal.py                     # launch -> login times, last 7 days
+    python journal.py --days 1 --events   # every event of the last day
+"""
+
+import argparse
+import atexit
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import config as cfg
+import perf
+
+LAUNCH = "launch"                   # pid, heap_mb
+LAUNCH_FAILED = "launch_failed"     # error
+LOGIN = "login"                     # launch_to_login_s
+LOGIN_TIMEOUT = "login_timeout"     # waited_s
+STOP = "stop"                       # outcome (switcher.STOPPED / KILLED / STUCK / GONE), elapsed_s
+EXIT = "exit"                       # exit_code — the client went away without being stopped
+ADOPT = "adopt"                     # pid
+ERROR = "error"                     # text
+
+JOURNAL_DIR = cfg.APP_DATA_DIR / "journal"
+
+
+class Journal:
+    FLUSH_S = 1.0
+    SEGMENT_BYTES = 4 * 2**20
+    KEEP_SEGMENTS = 50
+    MAX_QUEUE = 10000       # events held in memory while the disk refuses them
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self._lock = threading.Lock()       # queue and pending logins
+        self._io_lock = threading.Lock()    # segment files; held from taking a batch to writing it
+        self._queue = []
+        self._launched = {}     # account id -> launch ts still waiting for its login
+        self._current = None    # (path, size) of the segment being appended to
+        self._closing = threading.Event()
+        self._thread = None
+
+    # Writing (any thread)
+
+    def record(self, kind, account=None, **fields) -> dict:
+        ev = {"ts": round(time.time(), 3), "kind": kind}
+        if account is not None:
+            ev["account_id"], ev["name"] = account.id, account.display_name
+        ev.update(fields)
+        with self._lock:
+            if kind == LAUNCH and "account_id" in ev:
+                self._launched[ev["account_id"]] = ev["ts"]
+            self._queue.append(ev)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        return ev
+
+    def login(self, account):
+        """The client reported LOGGED_IN; recorded once per launch with its launch-to-login time."""
+        with self._lock:
+            t0 = self._launched.pop(account.id, None)   # usually None: already logged in, or not launched by us
+        if t0 is not None:
+            self.record(LOGIN, account, launch_to_login_s=round(time.time() - t0, 1))
+
+    def login_timeout(self, account):
+        with self._lock:
+            t0 = self._launched.pop(account.id, None)
+        if t0 is not None:
+            self.record(LOGIN_TIMEOUT, account, waited_s=round(time.time() - t0, 1))
+
+    def flush(self):
+        with self._io_lock:
+            with self._lock:
+                batch, self._queue = self._queue, []
+            if not batch:
+                return
+            data = "".join(json.dumps(ev, separators=(",", ":")) + "\n" for ev in batch).encode("utf-8")
+            try:
+                path = self._segment(batch[0]["ts"], len(data))
+                with open(path, "ab") as f:
+                    f.write(data)
+                self._current = (path, self._current[1] + len(data))
+            except OSError:
+                self._current = None    # disk trouble: retry the segment lookup next time
+                perf.count("journal.write_error")
+                with self._lock:
+                    queue = batch + self._queue
+                    self._queue = queue[-self.MAX_QUEUE:]
+                if len(queue) > self.MAX_QUEUE:
+                    perf.count("journal.dropped", len(queue) - self.MAX_QUEUE)
+
+    def close(self):
+        self._closing.set()
+        self.flush()
+
+    def _run(self):
+        while not self._closing.wait(self.FLUSH_S):
+            self.flush()
+
+    def _segment(self, ts, size):
+        if self._current is None:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            segs = self.segments()
+            if segs:
+                path = segs[-1][1]
+                self._current = (path, path.stat().st_size)
+        if self._current is None or self._current[1] + size > self.SEGMENT_BYTES:
+            path = self.folder / f"journal-{int(ts * 1000)}.jsonl"
+            self._current = (path, 0)
+            for _, old in self.segments()[:-(self.KEEP_SEGMENTS - 1)]:     # the new one makes KEEP
+                old.unlink(missing_ok=True)
+        return self._current[0]
+
+    # Reading
+
+    def segments(self) -> list:
+        """[(first ts, path)] oldest first."""
+        out = []
+        for p in self.folder.glob("journal-*.jsonl"):
+            try:
+                out.append((int(p.stem.split("-", 1)[1]) / 1000, p))
+            except ValueError:
+                continue
+        out.sort()
+        return out
+
+    def events(self, since=0.0, until=None, kinds=None, account_id=None):
+        """Events with since <= ts < until, oldest first, optionally of ``kinds`` / one account."""
+        self.flush()
+        segs = self.segments()
+        needles = tuple(f'"kind":"{k}"' for k in kinds) if kinds else None
+        for i, (t0, path) in enumerate(segs):
+            t1 = segs[i + 1][0] if i + 1 < len(segs) else float("inf")
+            if t1 <= since or (until is not None and t0 >= until):
+                continue
+            try:
+                f = open(path, encoding="utf-8")
+            except OSError:
+                continue
+            with f:
+                for line in f:
+                    if needles and not any(n in line for n in needles):
+                        continue
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        continue        # torn last line after a crash
+                    ts = ev.get("ts", 0)
+                    if ts < since or (until is not None and ts >= until):
+                        continue
+                    if account_id is not None and ev.get("account_id") != account_id:
+                        continue
+                    yield ev
+
+    def recent(self, n) -> list:
+        """The last ``n`` events, newest first; reads segments backwards only as far as needed."""
+        self.flush()
+        out = []
+        for _, path in reversed(self.segments()):
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+            except OSError:
+                continue
+            for line in reversed(lines):
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue
+                if len(out) >= n:
+                    return out
+        return out
+
+    def launch_to_login(self, since) -> dict:
+        """account id -> {"name", "logins", "timeouts", "median_s", "max_s"} for launches since ``since``."""
+        out = {}
+        for ev in self.events(since, kinds=(LOGIN, LOGIN_TIMEOUT)):
+            r = out.setdefault(ev.get("account_id"), {"name": ev.get("name", ""), "times": [], "timeouts": 0})
+            r["name"] = ev.get("name", r["name"])
+            if ev["kind"] == LOGIN:
+                r["times"].append(ev.get("launch_to_login_s", 0))
+            else:
+                r["timeouts"] += 1
+        for r in out.values():
+            times = r.pop("times")
+            r["logins"] = len(times)
+            r["median_s"] = round(statistics.median(times), 1) if times else None
+            r["max_s"] = max(times) if times else None
+        return out
+
+
+def format_event(ev) -> str:
+    extra = "  ".join(f"{k}={v}" for k, v in ev.items() if k not in ("ts", "kind", "account_id", "name"))
+    return (f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ev.get('ts', 0)))}  "
+            f"{ev.get('kind', '?'):14s} {ev.get('name') or ev.get('account_id') or '':20s} {extra}")
+
+
+def format_login_times(stats: dict) -> str:
+    lines = [f"{'account':24s} {'logins':>7s} {'timeouts':>9s} {'median s':>9s} {'max s':>7s}"]
+    for r in sorted(stats.values(), key=lambda r: -(r["median_s"] or 0)):
+        lines.append(f"{r['name'][:24]:24s} {r['logins']:7d} {r['timeouts']:9d} "
+                     f"{r['median_s'] if r['median_s'] is not None else '—':>9} {r['max_s'] if r['max_s'] is not None else '—':>7}")
+    return "\n".join(lines)
+
+
+journal = Journal(JOURNAL_DIR)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query the Baby Tank Switcher event journal")
+    ap.add_argument("--days", type=float, default=7.0, help="how far back to look (default 7)")
+    ap.add_argument("--events", action="store_true", help="list events instead of launch -> login times")
+    ap.add_argument("--kind", action="append", help="only events of this kind (repeatable)")
+    args = ap.parse_args(argv)
+    since = time.time() - args.days * 86400
+    if args.events:
+        for ev in journal.events(since, kinds=args.kind):
+            print(format_event(ev))
+    else:
+        print(format_login_times(journal.launch_to_login(since)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
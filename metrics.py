@@ -0,0 +1,297 @@
+"""
+metrics.py - OpenMetrics / Prometheus endpoint for the fleet and the switcher
+
+GET http://127.0.0.1:<Settings.metrics_port>/metrics returns:
+
+  per account   online, world, hp, max hp, profitGp, uptime, GP/h (5m / 1h /
+                session), CPU % and RSS of the tracked client process tree
+  fleet         GP/h (5m / 1h / session), poll backlog, HTTP errors per port
+  switcher      scan, poll, launch (switch / spawn / protect) and shutdown
+                timings as summaries, always; every other perf stage (http,
+                ui.*, ...) and the perf counters while Settings > Diagnostics
+                records them
+
+Nothing is computed per scrape. Client gauges are set as each /status
+arrives (App.observe), the STAGES timings arrive through perf.watch(), and
+a collector thread refreshes process, rate and perf figures every
+COLLECT_S. The Registry formats a sample's text line only
+when its value changes and caches the whole body until anything changes, so
+a scrape is a lock and a bytes copy however many clients there are.
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psutil
+
+import monitor as mon
+import perf
+import rates as rt
+import switcher as sw
+
+PREFIX = "babytank_"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# /status field -> client gauge
+_STATUS_GAUGES = {"world": "client_world", "hp": "client_hp", "maxHp": "client_max_hp",
+                  "profitGp": "client_profit_gp", "uptimeSeconds": "client_uptime_seconds"}
+
+# perf stages timed for the endpoint whether or not Diagnostics is on
+STAGES = ("scan", "poll", "poll.heartbeat", "launch.switch", "launch.spawn", "launch.protect", "shutdown")
+
+
+# ── Registry ───────────────────────────────────────────────────────────────────
+
+def _esc(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(v) -> str:
+    if isinstance(v, bool):
+        return "1" if v else "0"
+    if isinstance(v, int):
+        return str(v)
+    v = float(v)
+    if math.isnan(v):
+        return "NaN"
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(v)
+
+
+class _Family:
+    __slots__ = ("name", "kind", "header", "samples")
+
+    def __init__(self, name, kind, help_text):
+        self.name = name
+        self.kind = kind
+        self.header = f"# TYPE {name} {kind}\n# HELP {name} {_esc(help_text)}\n"
+        self.samples = {}       # (suffix, labels) -> (value, text line)
+
+
+class Registry:
+    """Metric families whose sample lines are pre-formatted; render() joins them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}     # name -> _Family, rendered in definition order
+        self._version = 0
+        self._cache = (-1, b"")
+
+    def define(self, name, kind, help_text):
+        """``kind`` is "gauge", "counter" or "summary"; ``name`` is given without PREFIX."""
+        self._families[name] = _Family(PREFIX + name, kind, help_text)
+
+    def set(self, name, value, labels=(), suffix=""):
+        """``labels`` is a tuple of (label, value) pairs; counters get their _total suffix here."""
+        fam = self._families[name]
+        if fam.kind == "counter" and not suffix:
+            suffix = "_total"
+        key = (suffix, labels)
+        with self._lock:
+            old = fam.samples.get(key)
+            if old is not None and old[0] == value:
+                return
+            lbl = "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in labels) + "}" if labels else ""
+            fam.samples[key] = (value, f"{fam.name}{suffix}{lbl} {_num(value)}\n")
+            self._version += 1
+
+    def drop(self, name, keep):
+        """Remove the samples of ``name`` whose labels fail ``keep(labels)``."""
+        fam = self._families[name]
+        with self._lock:
+            gone = [k for k in fam.samples if not keep(k[1])]
+            for k in gone:
+                del fam.samples[k]
+            if gone:
+                self._version += 1
+
+    def render(self) -> bytes:
+        with self._lock:
+            if self._cache[0] == self._version:
+                return self._cache[1]
+            parts = []
+            for fam in self._families.values():
+                parts.append(fam.header)
+                parts.extend(line for _, line in fam.samples.values())
+            parts.append("# EOF\n")
+            self._cache = (self._version, "".join(parts).encode())
+            return self._cache[1]
+
+
+# ── Exporter ───────────────────────────────────────────────────────────────────
+
+class Exporter:
+    COLLECT_S = 5.0
+
+    def __init__(self):
+        self.registry = r = Registry()
+        r.define("client_online", "gauge", "1 while the client answers, 0 once a scan misses it")
+        r.define("client_world", "gauge", "Current world")
+        r.define("client_hp", "gauge", "Current hitpoints")
+        r.define("client_max_hp", "gauge", "Maximum hitpoints")
+        r.define("client_profit_gp", "gauge", "profitGp as reported by the client")
+        r.define("client_uptime_seconds", "gauge", "Client uptime as reported by the client")
+        r.define("client_profit_per_hour", "gauge", "Profit per hour over a rolling window")
+        r.define("client_cpu_percent", "gauge", "CPU use of the tracked client process tree (100 = one core)")
+        r.define("client_rss_bytes", "gauge", "Resident memory of the tracked client process tree")
+        r.define("fleet_profit_per_hour", "gauge", "Profit per hour of every client combined")
+        r.define("poll_backlog", "gauge", "Clients due for a poll that have not been polled yet")
+        r.define("http_errors", "counter", "Failed requests to a client or agent")
+        r.define("stage_seconds", "summary", "Switcher stage timings (scan, poll, http, launch.*, ...)")
+        r.define("events", "counter", "Switcher event counters")
+        self._lock = threading.Lock()
+        self._get_accounts = lambda: []
+        self._procs = {}        # pid -> psutil.Process, kept so cpu_percent() has a previous sample
+        self._stages = {}       # STAGES name -> perf.Histogram, filled by _timed()
+        self._srv = None
+        self._stop = threading.Event()
+
+    @property
+    def port(self) -> int:
+        return self._srv.server_address[1] if self._srv else 0
+
+    # Client updates (any thread)
+
+    def observe(self, account, status):
+        if self._srv is None or not status:
+            return
+        acc = (("account", account.display_name),)
+        self.registry.set("client_online", 1, acc)
+        for fld, name in _STATUS_GAUGES.items():
+            v = status.get(fld)
+            if isinstance(v, (int, float)):
+                self.registry.set(name, v, acc)
+
+    def offline(self, account):
+        if self._srv is not None:
+            self.registry.set("client_online", 0, (("account", account.display_name),))
+
+    def _timed(self, stage, seconds):
+        with self._lock:
+            h = self._stages.get(stage)
+            if h is None:
+                h = self._stages[stage] = perf.Histogram()
+            h.add(seconds)
+
+    # Collector
+
+    def collect(self):
+        """Refresh everything that is not pushed by observe(); runs every COLLECT_S."""
+        r = self.registry
+        accounts = list(self._get_accounts())
+        names = {a.display_name for a in accounts}
+        for fam in ("client_online", "client_profit_per_hour", "client_cpu_percent", "client_rss_bytes",
+                    *_STATUS_GAUGES.values()):
+            r.drop(fam, lambda labels: dict(labels).get("account") in names)   # deleted / renamed accounts
+
+        procs = sw.tracked_processes()
+        seen = set()
+        for a in accounts:
+            acc = (("account", a.display_name),)
+            for w, v in rt.tracker.rates(a.id).get("profit", {}).items():
+                if v is not None:
+                    r.set("client_profit_per_hour", round(v), acc + (("window", w),))
+            proc = procs.get(a.id)
+            if proc is None:
+                r.drop("client_cpu_percent", lambda labels, acc=acc: labels != acc)
+                r.drop("client_rss_bytes", lambda labels, acc=acc: labels != acc)
+                continue
+            cpu, rss = 0.0, 0
+            try:
+                for p in [proc] + proc.children(recursive=True):
+                    p = self._procs.setdefault(p.pid, p)
+                    seen.add(p.pid)
+                    cpu += p.cpu_percent(None)
+                    rss += p.memory_info().rss
+            except psutil.Error:
+                continue
+            r.set("client_cpu_percent", round(cpu, 1), acc)
+            r.set("client_rss_bytes", rss, acc)
+        for pid in set(self._procs) - seen:
+            del self._procs[pid]
+
+        for w, v in rt.tracker.fleet().get("profit", {}).items():
+            if v is not None:
+                r.set("fleet_profit_per_hour", round(v), (("window", w),))
+        r.set("poll_backlog", mon.poller.backlog())
+        for port, n in mon.http_errors().items():
+            r.set("http_errors", n, (("port", str(port)),))
+        snap = perf.snapshot()
+        with self._lock:
+            stages = {name: perf.summary(h) for name, h in self._stages.items()}
+        for name, s in snap["stages"].items():
+            stages.setdefault(name, s)
+        for stage, s in sorted(stages.items()):
+            lbl = (("stage", stage),)
+            r.set("stage_seconds", s["p50_ms"] / 1000, lbl + (("quantile", "0.5"),))
+            r.set("stage_seconds", s["p99_ms"] / 1000, lbl + (("quantile", "0.99"),))
+            r.set("stage_seconds", s["count"], lbl, "_count")
+            r.set("stage_seconds", s["total_ms"] / 1000, lbl, "_sum")
+        for name, n in snap["counters"].items():
+            r.set("events", n, (("name", name),))
+
+    def _run(self, stop):
+        while True:
+            try:
+                self.collect()
+            except Exception:
+                perf.count("metrics.collect_error")
+            if stop.wait(self.COLLECT_S):
+                return
+
+    # Server
+
+    def start(self, port, get_accounts, bind="127.0.0.1"):
+        """Serve /metrics on ``port`` (0 stops the endpoint). Raises OSError if the port is taken."""
+        self.stop()
+        if not port:
+            return
+        self._get_accounts = get_accounts
+        self._srv = _Server((bind, port), _make_handler(self.registry))
+        for name in STAGES:
+            perf.watch(name, self._timed)
+        # each collector gets its own event, so one still finishing a pass cannot outlive stop()
+        self._stop = threading.Event()
+        threading.Thread(target=self._srv.serve_forever, args=(0.2,), name="metrics-http", daemon=True).start()
+        threading.Thread(target=self._run, args=(self._stop,), name="metrics-collect", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        for name in STAGES:
+            perf.unwatch(name, self._timed)
+        if self._srv is not None:
+            self._srv.shutdown()
+            self._srv.server_close()
+            self._srv = None
+
+
+def _make_handler(registry: Registry):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                body, code, ctype = b"not found\n", 404, "text/plain"
+            else:
+                with perf.stage("metrics.scrape"):
+                    body, code, ctype = registry.render(), 200, CONTENT_TYPE
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+exporter = Exporter()
@@ -0,0 +1,752 @@
+"""
+monitor.py - Client discovery, HTTP polling and the shared plugin catalog.
+
+Talks to the BabyTank HTTP Server plugin running inside each Microbot client.
+Kept free of any GUI imports so it can be driven from scripts and benchmarks.
+
+Adaptive polling:
+  Each live client gets its own poll interval (PollScheduler): clients that
+  are idle, logged out or paused back off toward a slow ceiling; clients with
+  low HP, a just-sent command or a fresh launch speed up toward a fast floor.
+  A fleet-wide token bucket (RequestBudget) caps poll requests per second, so
+  total HTTP load stays bounded however many clients are running.
+
+Push streams:
+  Clients that serve GET /events stream their changes (PushHub) and are not
+  polled while the stream is up; everything else is polled as above.
+
+Remote hosts:
+  A RemotePort names a client on another machine. Its agent (agent.py) runs
+  this same discovery and polling there and streams status changes to the
+  GUI; requests for plugins, logs and commands go through the agent's proxy.
+
+Plugin catalog:
+  Every poll that returns a client's /plugins list feeds the catalog, whether
+  it came from the Bot Manager's port scan or a card's pinned-port poll. The
+  Plugin Manager reads it instantly instead of scanning every port itself.
+  Entries carry a last-seen timestamp and are persisted to disk so the list
+  survives restarts even when no client is running.
+"""
+
+import http.client
+import json as _json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import config as cfg
+import perf
+
+# ── Remote clients ─────────────────────────────────────────────────────────────
+#
+# Everywhere this module takes a client "port" it also accepts a RemotePort:
+# a client on another machine, reached through the agent (agent.py) running
+# there. Requests to it go to the agent's /clients/<port>/... proxy over the
+# agent's keep-alive connections.
+
+class RemotePort(NamedTuple):
+    host: str       # label shown in the Bot Manager
+    agent: str      # "address:port" of the host's agent
+    port: int       # the client's port on that host
+
+    def __str__(self):
+        return f"{self.host}:{self.port}"
+
+
+AGENT_TOKEN = ""        # sent as X-Agent-Token to every agent (Settings > Agent Token)
+
+
+def port_label(port) -> str:
+    """":7071" for a local client, "box2:7071" for a remote one."""
+    return str(port) if isinstance(port, RemotePort) else f":{port}"
+
+
+def parse_ports(text: str) -> list:
+    """"7070-7199, 8000" -> [7070, ..., 7199, 8000]. Raises ValueError on malformed input."""
+    out = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        lo, _, hi = part.partition("-")
+        lo, hi = int(lo), int(hi or lo)
+        if not 1 <= lo <= hi <= 65535:
+            raise ValueError(f"Bad port range '{part}'")
+        out += range(lo, hi + 1)
+    if not out:
+        raise ValueError("No ports given")
+    return list(dict.fromkeys(out))
+
+
+def set_scan_ports(ports):
+    global SCAN_PORTS
+    SCAN_PORTS = list(ports)
+
+
+# ── HTTP connection pool ───────────────────────────────────────────────────────
+#
+# Keep-alive connections are checked out for the length of one request and
+# returned afterwards, so concurrent pollers never share a connection.
+
+HOST = "127.0.0.1"
+GET_TIMEOUT = 0.3
+REMOTE_GET_TIMEOUT = 1.0    # LAN round trip plus the agent's own local request
+POST_TIMEOUT = 3.0
+_MAX_IDLE = 4           # idle connections kept per port (per agent for remote clients)
+
+_idle: dict = {}        # port or agent address -> [HTTPConnection, ...]
+_conn_lock = threading.Lock()
+_errors: dict = {}      # port -> failed requests; kept even with diagnostics off (metrics.py exports it)
+_answered: set = set()  # ports that have answered at least once; probes of empty ports are not errors
+
+
+def _route(port, path):
+    """(pool key, host, tcp port, path) for a local port or a RemotePort."""
+    if isinstance(port, RemotePort):
+        host, _, ap = port.agent.rpartition(":")
+        return port.agent, host, int(ap), f"/clients/{port.port}{path}"
+    return port, HOST, port, path
+
+
+def _checkout(key, host, port, timeout):
+    with _conn_lock:
+        stack = _idle.get(key)
+        c = stack.pop() if stack else None
+    if c is None:
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+    c.timeout = timeout
+    if c.sock is not None:
+        c.sock.settimeout(timeout)
+    return c, True
+
+
+def _checkin(key, c):
+    with _conn_lock:
+        stack = _idle.setdefault(key, [])
+        if len(stack) < _MAX_IDLE:
+            stack.append(c)
+            return
+    c.close()
+
+
+# Raised by request() / getresponse() when the peer closed an idle keep-alive socket
+_STALE = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+def _request(port, method, path, body=None, timeout=GET_TIMEOUT, parse=True):
+    """
+    One request over a pooled connection. Returns (status, payload) or None.
+    A reused connection that turns out closed before any response byte
+    arrived (_STALE) is retried once on a fresh one: the client dropped the
+    idle socket and never saw the request. Timeouts, failures while reading
+    the response and bad JSON are not retried, so a POST is never sent twice.
+    """
+    headers = {"Accept": "application/json"}
+    data = None
+    if body is not None:
+        data = _json.dumps(body).encode()
+        headers["Content-Type"] = "application/json"
+    name = "http.get" if method == "GET" else "http.post"
+    key, host, tcp_port, path = _route(port, path)
+    if isinstance(port, RemotePort):
+        headers["X-Agent-Token"] = AGENT_TOKEN
+        if timeout == GET_TIMEOUT:
+            timeout = REMOTE_GET_TIMEOUT
+    for _ in range(2):
+        c, reused = _checkout(key, host, tcp_port, timeout)
+        stale = False
+        try:
+            with perf.stage(name):
+                try:
+                    c.request(method, path, body=data, headers=headers)
+                    r = c.getresponse()
+                except _STALE:
+                    stale = reused
+                    raise
+                raw = r.read()
+            if parse:
+                with perf.stage("http.json"):
+                    payload = _json.loads(raw.decode())
+            else:
+                payload = raw
+            _checkin(key, c)
+            if port not in _answered:
+                with _conn_lock:
+                    _answered.add(port)
+            return r.status, payload
+        except Exception:
+            with _conn_lock:
+                known = port in _answered
+                if known:
+                    _errors[port] = _errors.get(port, 0) + 1
+            if known:
+                perf.count("http.error")
+            c.close()
+            if not stale:
+                break
+    return None
+
+
+def http_errors() -> dict:
+    """port -> failed requests since startup, for ports that have had a client on them."""
+    with _conn_lock:
+        return dict(_errors)
+
+
+def http_get(port, path):
+    res = _request(port, "GET", path)
+    return res[1] if res and res[0] < 400 else None
+
+
+def http_raw(port, method, path, body=None):
+    """(status, body bytes) straight from the client, or None — what an agent relays."""
+    return _request(port, method, path, body, timeout=GET_TIMEOUT if method == "GET" else POST_TIMEOUT,
+                    parse=False)
+
+
+def http_post(port, path, body=None):
+    # A command (plugin toggle, pause, profit reset...) is worth watching closely for a while
+    poller.boost(port)
+    res = _request(port, "POST", path, body or {}, timeout=POST_TIMEOUT, parse=False)
+    return bool(res) and res[0] < 400
+
+
+def close_all():
+    """Close every pooled connection and push stream."""
+    push.close_all()
+    with _conn_lock:
+        for stack in _idle.values():
+            for c in stack:
+                try:
+                    c.close()
+                except Exception:
+                    pass
+        _idle.clear()
+
+
+# ── Discovery ──────────────────────────────────────────────────────────────────
+
+SCAN_PORTS = list(range(7070, 7200))    # Settings > Scan Ports, via set_scan_ports()
+
+
+def snapshot(port, detail=True):
+    """
+    {"status": ..., "plugins": [...], "logs": [...]} for the client on ``port``,
+    or None if it is not answering. With detail=False only /status is fetched
+    and plugins / logs are None — the cheap heartbeat for clients nobody is
+    looking at.
+    """
+    s = http_get(port, "/status")
+    if s is None:
+        return None
+    if not detail:
+        return {"status": s, "plugins": None, "logs": None}
+    return {"status": s,
+            "plugins": http_get(port, "/plugins") or [],
+            "logs":    http_get(port, "/logs") or []}
+
+
+def central_scan(ports=None, detail=None):
+    """
+    Probe ``ports`` (default: every port in SCAN_PORTS) concurrently.
+    Returns {port: snapshot(port)} for live clients.
+
+    ``detail`` is an optional predicate on a client's /status payload; clients
+    it rejects only get the /status heartbeat (plugins and logs are None).
+    """
+    results, lock = {}, threading.Lock()
+    ports = SCAN_PORTS if ports is None else list(ports)
+
+    def _probe(port):
+        s = http_get(port, "/status")
+        if s is None:
+            return
+        full = detail is None or detail(s)
+        data = {"status": s,
+                "plugins": (http_get(port, "/plugins") or []) if full else None,
+                "logs":    (http_get(port, "/logs") or []) if full else None}
+        if not full:
+            perf.count("scan.heartbeat")
+        with lock:
+            results[port] = data
+
+    if not ports:
+        return results
+    with perf.stage("scan"), ThreadPoolExecutor(max_workers=len(ports)) as ex:
+        futs = [ex.submit(_probe, p) for p in ports]
+        for f in futs:
+            try:
+                f.result(timeout=1.2)
+            except Exception:
+                pass
+    perf.count("scan.clients", len(results))
+    for port, data in results.items():
+        catalog.observe(port, data["plugins"])
+    return results
+
+
+def find_login_state(name, port=0):
+    """loginState of the client whose player name matches ``name``, or None if not found."""
+    import urllib.request
+    nl = name.strip().lower()
+    for p in ([port] if port else SCAN_PORTS):
+        try:
+            with urllib.request.urlopen(f"http://{HOST}:{p}/status", timeout=0.1) as r:
+                d = _json.loads(r.read())
+            if d.get("playerName", "").strip().lower() == nl:
+                return d.get("loginState", "")
+        except Exception:
+            pass
+    return None
+
+
+def wait_login(name, port=0, deadline=0.0, interval=2.0) -> bool:
+    """Block until the client for ``name`` reports LOGGED_IN. False if the deadline passes first."""
+    while time.time() < deadline:
+        if find_login_state(name, port) == "LOGGED_IN":
+            return True
+        time.sleep(interval)
+    return False
+
+
+# ── Adaptive polling ───────────────────────────────────────────────────────────
+
+class RequestBudget:
+    """Token bucket shared by every poller: at most ``rate`` poll requests per second."""
+
+    def __init__(self, rate: float):
+        self._lock = threading.Lock()
+        self.rate = float(rate)
+        self._tokens = self.rate
+        self._t = time.monotonic()
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self.rate = max(1.0, float(rate))
+            self._tokens = min(self._tokens, self.rate)
+
+    def take(self, n: int = 1) -> bool:
+        """Spend ``n`` requests if the budget allows it right now; never blocks."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._t) * self.rate)
+            self._t = now
+            if self._tokens < n:
+                perf.count("poll.budget_denied")
+                return False
+            self._tokens -= n
+            return True
+
+
+class _PollState:
+    __slots__ = ("interval", "due", "fingerprint", "uptime", "boost_until")
+
+    def __init__(self, now):
+        self.interval = PollScheduler.BASE
+        self.due = now
+        self.fingerprint = None
+        self.uptime = -1
+        self.boost_until = now + PollScheduler.BOOST_S   # first sighting == fresh launch
+
+
+class PollScheduler:
+    """
+    port -> next poll time, adapted to each client's state and change rate.
+
+    observe() is called with every /status a poller receives and returns the
+    interval until that client should be polled again:
+
+      logged out, paused or not answering      back off x GROWTH toward CEILING
+      low HP, boosted (launch / command)       FLOOR
+      status changed since last poll           BASE
+      status unchanged                         back off x GROWTH toward CEILING
+
+    Clients the user cannot see are never polled faster than OFFSCREEN unless
+    they are urgent (low HP or boosted). ``scale`` (an account group's poll
+    scale) stretches or shrinks every interval except FLOOR.
+    """
+    FLOOR = 1.0
+    BASE = 3.0
+    OFFSCREEN = 9.0
+    CEILING = 30.0
+    GROWTH = 1.5
+    BOOST_S = 30.0
+    LOW_HP = 0.3
+
+    # Fields that count as "something happened"; uptime and HP jitter do not
+    _WATCH = ("loginState", "world", "paused", "scriptStatus", "profitGp")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._s: dict = {}
+
+    def boost(self, port, seconds: float = BOOST_S):
+        """Poll ``port`` at FLOOR for the next ``seconds`` and make it due now."""
+        now = time.monotonic()
+        with self._lock:
+            st = self._s.get(port)
+            if st is None:
+                st = self._s[port] = _PollState(now)
+            st.boost_until = max(st.boost_until, now + seconds)
+            st.interval, st.due = self.FLOOR, min(st.due, now)
+
+    def observe(self, port, status, visible: bool = True, scale: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            st = self._s.get(port)
+            if st is None:
+                st = self._s[port] = _PollState(now)
+            if status is not None:
+                up = status.get("uptimeSeconds", 0)
+                if up < st.uptime:           # client restarted on the same port
+                    st.boost_until = now + self.BOOST_S
+                st.uptime = up
+            fp = None if status is None else tuple(status.get(k) for k in self._WATCH)
+            hp, mhp = (status.get("hp", 0), status.get("maxHp", 0)) if status else (0, 0)
+            if status is None or status.get("loginState") != "LOGGED_IN" or status.get("paused"):
+                iv = min(self.CEILING, max(st.interval, self.BASE) * self.GROWTH)
+            elif (mhp and hp < mhp * self.LOW_HP) or now < st.boost_until:
+                iv = self.FLOOR
+            elif fp != st.fingerprint:
+                iv = self.BASE
+            else:
+                iv = min(self.CEILING, st.interval * self.GROWTH)
+            if not visible and iv != self.FLOOR:
+                iv = max(iv, self.OFFSCREEN)
+            st.fingerprint, st.interval = fp, iv    # unscaled, so back-off does not compound the scale
+            if scale != 1.0 and iv != self.FLOOR:
+                iv = max(self.FLOOR, iv * scale)
+            st.due = now + iv
+        perf.record("poll.interval", iv)
+        return iv
+
+    def interval(self, port) -> float:
+        with self._lock:
+            st = self._s.get(port)
+            return st.interval if st else self.BASE
+
+    def due(self, ports) -> list:
+        """The ports from ``ports`` that are due, most overdue first (unknown ports are due)."""
+        now = time.monotonic()
+        with self._lock:
+            late = [(self._s[p].due if p in self._s else 0.0, p) for p in ports]
+        return [p for d, p in sorted(late) if d <= now]
+
+    def forget(self, port):
+        with self._lock:
+            self._s.pop(port, None)
+
+    def backlog(self) -> int:
+        """Tracked clients that are due (or overdue) for a poll right now."""
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for st in self._s.values() if st.due <= now)
+
+
+POLL_BUDGET = 60    # poll requests per second across the fleet (Settings > Poll Budget)
+
+budget = RequestBudget(POLL_BUDGET)
+poller = PollScheduler()
+
+
+# ── Push streams ───────────────────────────────────────────────────────────────
+#
+# A client whose HTTP server plugin serves GET /events (Server-Sent Events)
+# pushes its changes instead of being polled:
+#
+#   event: status    data: {changed /status fields}   (the first one is complete)
+#   event: plugins   data: [the full /plugins list]
+#   event: log       data: ["new log line", ...]
+#
+# PushHub keeps one streaming connection per such client and merges the
+# events into a snapshot. Clients without /events, or whose stream drops, are
+# polled as before.
+
+class PushHub:
+    CONNECT_TIMEOUT = 1.0
+    READ_TIMEOUT = 45.0         # servers send ": ping" comments well inside this
+    RETRY_REFUSED_S = 300.0     # a client without /events is not asked again for this long
+    RETRY_FAILED_S = 5.0        # first wait after a stream that failed or closed before any event; doubles per failure
+    LOG_KEEP = 50
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams = {}      # port -> {"sock", "status", "at", "plugins", "logs"}
+        self._refused = {}      # port -> monotonic time to ask again
+        self._failures = {}     # port -> streams in a row that ended without delivering an event
+        self._listeners = []
+
+    def listen(self, fn):
+        """``fn(port, kind)`` is called from the stream thread for "status", "plugins", "log" and "closed"."""
+        self._listeners.append(fn)
+
+    def unlisten(self, fn):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def subscribe(self, port):
+        """Open a stream to ``port`` unless one is open or the client recently refused."""
+        if isinstance(port, RemotePort):
+            return      # agents relay single requests, not streams; they push status themselves
+        with self._lock:
+            if port in self._streams or self._refused.get(port, 0) > time.monotonic():
+                return
+            self._streams[port] = {"sock": None, "status": None, "at": 0.0, "plugins": None, "logs": []}
+        threading.Thread(target=self._run, args=(port,), name=f"push-{port}", daemon=True).start()
+
+    def live(self, port) -> bool:
+        with self._lock:
+            st = self._streams.get(port)
+            return bool(st and st["status"] is not None)
+
+    def snapshot(self, port):
+        """{"status", "plugins", "logs"} as last pushed, or None if ``port`` is not streaming."""
+        with self._lock:
+            st = self._streams.get(port)
+            if not st or st["status"] is None:
+                return None
+            status = dict(st["status"])
+            plugins, logs, at = st["plugins"], list(st["logs"]), st["at"]
+        status["uptimeSeconds"] = status.get("uptimeSeconds", 0) + int(time.time() - at)
+        return {"status": status, "plugins": plugins, "logs": logs}
+
+    def close_all(self):
+        with self._lock:
+            socks = [st["sock"] for st in self._streams.values() if st["sock"]]
+        for sock in socks:
+            try:
+                sock.shutdown(2)        # unblocks the reader, which cleans up
+            except Exception:
+                pass
+
+    def _emit(self, port, kind):
+        for fn in list(self._listeners):
+            try:
+                fn(port, kind)
+            except Exception:
+                perf.count("push.listener_error")
+
+    def _apply(self, port, kind, data):
+        with self._lock:
+            st = self._streams.get(port)
+            if st is None:
+                return
+            if kind == "status":
+                st["status"] = {**(st["status"] or {}), **data}
+                # "at" dates the uptime base: deltas without uptimeSeconds keep projecting from the old one
+                if "uptimeSeconds" in data or not st["at"]:
+                    st["at"] = time.time()
+            elif kind == "plugins":
+                st["plugins"] = data
+            elif kind == "log":
+                st["logs"] = (st["logs"] + list(data))[-self.LOG_KEEP:]
+            else:
+                return
+        if kind == "plugins":
+            catalog.observe(port, data)
+        perf.count("push.event")
+        self._emit(port, kind)
+
+    def _run(self, port):
+        c = http.client.HTTPConnection(HOST, port, timeout=self.CONNECT_TIMEOUT)
+        delivered = refused = False
+        try:
+            c.request("GET", "/events", headers={"Accept": "text/event-stream"})
+            sock = c.sock       # the response keeps using it after the connection lets go
+            r = c.getresponse()
+            if r.status != 200 or not (r.getheader("Content-Type") or "").startswith("text/event-stream"):
+                refused = True
+                return
+            sock.settimeout(self.READ_TIMEOUT)
+            with self._lock:
+                self._streams[port]["sock"] = sock
+            event, data = "message", []
+            while True:
+                line = r.readline()
+                if not line:
+                    break
+                line = line.decode("utf-8", "replace").rstrip("\r\n")
+                if not line:
+                    if data:
+                        try:
+                            self._apply(port, event, _json.loads("\n".join(data)))
+                            delivered = True
+                        except ValueError:
+                            perf.count("push.bad_event")
+                    event, data = "message", []
+                elif not line.startswith(":"):
+                    field, _, val = line.partition(":")
+                    val = val[1:] if val.startswith(" ") else val
+                    if field == "event":
+                        event = val
+                    elif field == "data":
+                        data.append(val)
+        except Exception:
+            perf.count("push.dropped")
+        finally:
+            c.close()
+            with self._lock:
+                self._streams.pop(port, None)
+                if refused:
+                    self._refused[port] = time.monotonic() + self.RETRY_REFUSED_S
+                elif delivered:
+                    self._failures.pop(port, None)
+                else:
+                    # timeouts, resets and streams that close at once: back off, polling covers the client
+                    n = self._failures[port] = self._failures.get(port, 0) + 1
+                    wait = min(self.RETRY_REFUSED_S, self.RETRY_FAILED_S * 2 ** (n - 1))
+                    self._refused[port] = time.monotonic() + wait
+            self._emit(port, "closed")
+
+
+push = PushHub()
+
+
+# ── Bulk plugin control ────────────────────────────────────────────────────────
+
+PLUGIN_ACTIONS = ("start", "stop", "restart")
+
+
+def plugin_states(port, classes) -> dict:
+    """className -> active flag as reported by the client (missing classes are omitted)."""
+    plugins = http_get(port, "/plugins")
+    if plugins is None:
+        return None
+    catalog.observe(port, plugins)
+    return {p.get("className", ""): bool(p.get("active", False))
+            for p in plugins if p.get("className", "") in classes}
+
+
+def wait_plugin_states(port, classes, active, deadline, interval=0.25) -> bool:
+    """Poll /plugins until every class in ``classes`` reports ``active`` or the deadline passes."""
+    while True:
+        states = plugin_states(port, classes)
+        if states is not None and all(states.get(c) is active for c in classes):
+            return True
+        if time.time() >= deadline:
+            return False
+        time.sleep(interval)
+
+
+def _plugin_op(port, classes, action, confirm_timeout):
+    t0 = time.time()
+    res = {"ok": False, "error": "", "seconds": 0.0, "skipped": False}
+    steps = {"start": (True,), "stop": (False,), "restart": (False, True)}[action]
+    try:
+        if action == "restart":
+            # Restart only what is running; a plugin stopped on this client stays stopped
+            states = plugin_states(port, classes)
+            if states is None:
+                res["error"] = "client did not answer"
+                return res
+            classes = [c for c in classes if states.get(c)]
+            if not classes:
+                res["ok"] = res["skipped"] = True
+                return res
+        for active in steps:
+            path = "/plugins/start" if active else "/plugins/stop"
+            failed = [c for c in classes if not http_post(port, path, {"className": c})]
+            if failed:
+                res["error"] = f"{path} failed for {', '.join(c.split('.')[-1] for c in failed)}"
+                return res
+            if not wait_plugin_states(port, classes, active, time.time() + confirm_timeout):
+                res["error"] = f"not {'started' if active else 'stopped'} within {confirm_timeout:g}s"
+                return res
+        res["ok"] = True
+        return res
+    finally:
+        res["seconds"] = round(time.time() - t0, 3)
+
+
+def bulk_plugin_op(ports, classes, action, confirm_timeout=10.0, max_workers=32) -> dict:
+    """
+    Apply start / stop / restart for ``classes`` on every client in ``ports`` concurrently.
+
+    Each client is confirmed from its own /plugins state rather than a fixed
+    sleep: a restart waits until the client reports the plugins stopped before
+    starting them again, then waits until they report active. A restart only
+    touches the plugins that are running on that client; "skipped" is set
+    when none were.
+
+    Returns {port: {"ok": bool, "error": str, "seconds": float, "skipped": bool}}.
+    """
+    if action not in PLUGIN_ACTIONS:
+        raise ValueError(f"Unknown plugin action: {action}")
+    ports, classes = list(dict.fromkeys(ports)), list(classes)
+    if not ports or not classes:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ports))) as ex:
+        futs = {p: ex.submit(_plugin_op, p, classes, action, confirm_timeout) for p in ports}
+        return {p: f.result() for p, f in futs.items()}
+
+
+# ── Plugin catalog ─────────────────────────────────────────────────────────────
+
+class PluginCatalog:
+    """
+    className -> {"name", "last_seen", "port"} for every plugin any poller has seen.
+    Thread-safe; writes to disk are throttled to one per SAVE_INTERVAL seconds.
+    ``load`` returns the saved entries; it is called on first use, not at import.
+    """
+    SAVE_INTERVAL = 30.0
+
+    def __init__(self, entries: dict = None, load=None):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._updated = 0.0
+        self._dirty = False
+        self._saved_at = 0.0
+        self._load = load
+        self._merge(entries or {})
+
+    def _merge(self, entries):
+        for cls, e in entries.items():
+            self._entries.setdefault(cls, e)
+        self._updated = max([self._updated] + [e.get("last_seen", 0) for e in entries.values()])
+
+    def _loaded(self):
+        """Caller holds _lock."""
+        if self._load is not None:
+            load, self._load = self._load, None
+            self._merge(load())
+
+    def observe(self, port, plugins):
+        """Record the plugin list a poller just received from the client on ``port``."""
+        if not plugins:
+            return
+        now = time.time()
+        with self._lock:
+            self._loaded()
+            for plug in plugins:
+                cls = plug.get("className", "")
+                if not cls:
+                    continue
+                self._entries[cls] = {"name": plug.get("name", cls.split(".")[-1]),
+                                      "last_seen": now, "port": port}
+            self._updated = now
+            self._dirty = True
+            due = now - self._saved_at >= self.SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def names(self) -> dict:
+        """className -> display name."""
+        with self._lock:
+            self._loaded()
+            return {cls: e["name"] for cls, e in self._entries.items()}
+
+    def age(self) -> float:
+        """Seconds since any poller last fed the catalog."""
+        with self._lock:
+            self._loaded()
+            return time.time() - self._updated if self._updated else float("inf")
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = {cls: dict(e) for cls, e in self._entries.items()}
+            self._dirty = False
+            self._saved_at = time.time()
+        cfg.save_plugin_catalog(snapshot)
+
+
+catalog = PluginCatalog(load=cfg.load_plugin_catalog)
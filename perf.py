@@ -0,0 +1,269 @@
+"""
+perf.py - Hot-path instrumentation and an on-demand sampling profiler.
+
+Stages (scan, poll, HTTP, launch, UI refresh, ...) are timed with
+
+    with perf.stage("scan"):
+        ...
+
+and events are counted with perf.count("http.error"). While recording is
+disabled — the default — stage() hands back one shared no-op context and
+count() returns immediately, so instrumented code pays a function call and
+nothing else. watch() attaches a callback to a stage that is timed whether
+or not recording is on (the metrics exporter keeps its own summaries so).
+
+Latencies go into fixed log-scale histograms (no per-sample storage), from
+which p50 / p99 are read. The profiler samples every thread's stack with
+sys._current_frames() from a background thread and aggregates collapsed
+stacks, written in the format flamegraph tools accept.
+"""
+
+import bisect
+import functools
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+ENABLED = False
+
+_lock = threading.Lock()
+_hists: dict = {}      # stage -> Histogram
+_counters: dict = {}   # name  -> int
+_watch: dict = {}      # stage -> [fn(name, seconds)], called even while recording is off
+
+# Bucket upper bounds in seconds: 50 µs growing by √2 up to ~52 s
+_BOUNDS = [0.00005 * 2 ** (i / 2) for i in range(41)]
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.buckets[bisect.bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (seconds) of the bucket holding the q-th percentile."""
+        if not self.count:
+            return 0.0
+        rank, seen = q / 100.0 * self.count, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(_BOUNDS[i], self.max) if i < len(_BOUNDS) else self.max
+        return self.max
+
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def reset():
+    with _lock:
+        _hists.clear()
+        _counters.clear()
+
+
+def record(name: str, seconds: float):
+    if not ENABLED:
+        return
+    with _lock:
+        h = _hists.get(name)
+        if h is None:
+            h = _hists[name] = Histogram()
+        h.add(seconds)
+
+
+def watch(name: str, fn):
+    """Call ``fn(name, seconds)`` after every pass through stage ``name``, recording on or off."""
+    with _lock:
+        _watch[name] = _watch.get(name, []) + [fn]
+
+
+def unwatch(name: str, fn):
+    with _lock:
+        fns = [f for f in _watch.get(name, []) if f != fn]     # bound methods compare equal, not identical
+        if fns:
+            _watch[name] = fns
+        else:
+            _watch.pop(name, None)
+
+
+def count(name: str, n: int = 1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        dt = time.perf_counter() - self.t0
+        record(self.name, dt)
+        for fn in _watch.get(self.name, ()):
+            fn(self.name, dt)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """Context manager timing one pass through ``name``; a shared no-op while disabled and unwatched."""
+    return _Stage(name) if ENABLED or name in _watch else _NO_STAGE
+
+
+def timed(name: str):
+    """Decorator form of stage() for whole functions."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED and name not in _watch:
+                return fn(*args, **kwargs)
+            with _Stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def summary(h: Histogram) -> dict:
+    """{count, p50_ms, p99_ms, max_ms, total_ms} of one histogram."""
+    return {"count": h.count,
+            "p50_ms": round(h.percentile(50) * 1000, 3),
+            "p99_ms": round(h.percentile(99) * 1000, 3),
+            "max_ms": round(h.max * 1000, 3),
+            "total_ms": round(h.total * 1000, 3)}
+
+
+def snapshot() -> dict:
+    """{"stages": {name: summary()}, "counters": {...}}"""
+    with _lock:
+        stages = {name: summary(h) for name, h in sorted(_hists.items())}
+        counters = dict(sorted(_counters.items()))
+    return {"enabled": ENABLED, "stages": stages, "counters": counters}
+
+
+def format_table(snap: dict = None) -> str:
+    """Plain-text p50 / p99 table for the diagnostics view."""
+    snap = snap or snapshot()
+    lines = [f"{'stage':28s} {'count':>8s} {'p50 ms':>10s} {'p99 ms':>10s} {'max ms':>10s}"]
+    for name, s in snap["stages"].items():
+        lines.append(f"{name:28s} {s['count']:8d} {s['p50_ms']:10.2f} {s['p99_ms']:10.2f} {s['max_ms']:10.2f}")
+    if snap["counters"]:
+        lines += ["", f"{'counter':28s} {'value':>8s}"]
+        lines += [f"{name:28s} {v:8d}" for name, v in snap["counters"].items()]
+    return "\n".join(lines)
+
+
+def export(path) -> Path:
+    """Write the current snapshot to ``path`` as JSON."""
+    path = Path(path)
+    path.write_text(json.dumps(snapshot(), indent=2), encoding="utf-8")
+    return path
+
+
+# ── Sampling profiler ──────────────────────────────────────────────────────────
+
+class Profiler:
+    """Samples all thread stacks every ``interval`` seconds until stopped."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: dict = {}   # collapsed stack -> hits
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="perf-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> dict:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.samples
+
+    def _run(self):
+        me = threading.get_ident()
+        names, labels = {}, {}   # thread id -> name, code object -> "module:function"
+        while not self._stop.wait(self.interval):
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    co = frame.f_code
+                    label = labels.get(co)
+                    if label is None:
+                        label = labels[co] = f"{Path(co.co_filename).stem}:{co.co_name}"
+                    stack.append(label)
+                    frame = frame.f_back
+                key = ";".join([names.get(tid, str(tid))] + stack[::-1])
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def write(self, path) -> Path:
+        """Write collapsed stacks ("thread;mod:func;... hits"), hottest first."""
+        path = Path(path)
+        rows = sorted(self.samples.items(), key=lambda kv: kv[1], reverse=True)
+        path.write_text("".join(f"{k} {n}\n" for k, n in rows), encoding="utf-8")
+        return path
+
+
+_profiler = None
+
+
+def profiling() -> bool:
+    return _profiler is not None
+
+
+def start_profile(interval: float = 0.005):
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(interval)
+        _profiler.start()
+
+
+def stop_profile(path=None):
+    """Stop the running capture; write it to ``path`` if given. Returns the Profiler."""
+    global _profiler
+    prof, _profiler = _profiler, None
+    if prof is None:
+        return None
+    prof.stop()
+    if path:
+        prof.write(path)
+    return prof
@@ -0,0 +1,209 @@
+"""
+rates.py - Rolling-window profit / XP rates per account and for the whole fleet
+
+Each /status a client reports is turned into the gain since its previous
+one. Gains go into rings of time buckets (5 min in 10 s buckets, 1 h in 1 min
+buckets) that keep a running sum, so both recording a gain and reading a rate
+cost O(1) however many updates a window spans. Every gain is added to the
+account's rings and to the fleet's.
+
+The counters are cumulative, so two events need care:
+  * /profit/reset puts profitGp back to 0. A drop after expect_reset(), or a
+    drop that lands closer to 0 than to the old value, is a reset: the new
+    value is all gain since then. A smaller drop is a real loss (supplies
+    bought) and counts as negative gain.
+  * A client restart shows up as uptimeSeconds going backwards together
+    with a counter that drops, or as uptime falling by more than
+    RESTART_DROP_S. A smaller uptime dip with counters intact is noise (a
+    stale projection, clock skew) and is ignored. A new session starts from
+    the counters it reports: what they hold was earned at some point since
+    the restart, so it counts toward the session, never toward the windows.
+"""
+
+import threading
+import time
+
+# rate name -> (/status counter, counts from client start). Clients that do
+# not report a counter simply get no rate for it.
+COUNTERS = {"profit": ("profitGp", True), "xp": ("totalXp", False)}
+
+# window name -> (span seconds, buckets)
+WINDOWS = {"5m": (300, 30), "1h": (3600, 60)}
+
+MIN_SPAN_S = 60     # no rate until a window has covered at least this long
+RESTART_DROP_S = 300    # uptime falling this far is a restart even if the counters look continuous
+
+
+# ── Windows ────────────────────────────────────────────────────────────────────
+
+class _Ring:
+    """Sum of gains over the last ``span`` seconds in ``n`` buckets."""
+    __slots__ = ("width", "buckets", "head", "sum", "start")
+
+    def __init__(self, span, n, now):
+        self.width = span / n
+        self.buckets = [0.0] * n
+        self.head = int(now // self.width)
+        self.sum = 0.0
+        self.start = now
+
+    def _advance(self, now):
+        idx = int(now // self.width)
+        if idx <= self.head:
+            return
+        n = len(self.buckets)
+        if idx - self.head >= n:
+            self.buckets = [0.0] * n
+            self.sum = 0.0
+        else:
+            for i in range(self.head + 1, idx + 1):
+                j = i % n
+                self.sum -= self.buckets[j]
+                self.buckets[j] = 0.0
+        self.head = idx
+
+    def add(self, gain, now):
+        self._advance(now)
+        self.buckets[self.head % len(self.buckets)] += gain
+        self.sum += gain
+
+    def per_hour(self, now):
+        self._advance(now)
+        span = min(self.width * len(self.buckets), now - self.start)
+        return self.sum * 3600 / span if span >= MIN_SPAN_S else None
+
+
+def _rings(now):
+    return {name: {w: _Ring(span, n, now) for w, (span, n) in WINDOWS.items()} for name in COUNTERS}
+
+
+class _Account:
+    __slots__ = ("last", "uptime", "seen", "session_start", "session", "expect", "rings")
+
+    def __init__(self, now):
+        self.last = {}          # rate name -> counter value in the previous status
+        self.uptime = None
+        self.seen = now
+        self.session_start = now
+        self.session = {}       # rate name -> gain this session
+        self.expect = set()     # rate names with a reset requested from here
+        self.rings = _rings(now)
+
+
+# ── Tracker ────────────────────────────────────────────────────────────────────
+
+class RateTracker:
+    """Thread-safe; observe() may be called from any poller or stream thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._accounts = {}     # account id -> _Account
+        self._start = time.time()
+        self._fleet = _rings(self._start)
+        self._fleet_gain = dict.fromkeys(COUNTERS, 0.0)
+        self._names = set()     # rate names any client has reported
+
+    def observe(self, account_id, status, now=None):
+        """Record a fresh /status for ``account_id``."""
+        if not status:
+            return
+        now = time.time() if now is None else now
+        up = status.get("uptimeSeconds")
+        with self._lock:
+            st = self._accounts.get(account_id)
+            if st is None:
+                st = self._accounts[account_id] = _Account(now)
+                self._new_session(st, status, up, now)
+            elif self._restarted(st, status, up):
+                self._new_session(st, status, up, now)
+            else:
+                for name, (fld, _) in COUNTERS.items():
+                    v = status.get(fld)
+                    if v is None:
+                        continue
+                    old = st.last.get(name)
+                    st.last[name] = v
+                    if old is None:
+                        self._names.add(name)
+                        continue
+                    gain = v - old
+                    if gain < 0 and (name in st.expect or abs(v) < -gain):
+                        gain = v
+                    st.expect.discard(name)
+                    self._add(st, name, gain, now)
+            if up is not None:
+                st.uptime = up
+            st.seen = now
+
+    @staticmethod
+    def _restarted(st, status, up):
+        if up is None or st.uptime is None or up >= st.uptime:
+            return False
+        if st.uptime - up > RESTART_DROP_S:
+            return True
+        for name, (fld, from_start) in COUNTERS.items():
+            v, old = status.get(fld), st.last.get(name)
+            if from_start and v is not None and old is not None and v < old:
+                return True
+        return False
+
+    def _new_session(self, st, status, up, now):
+        st.session_start = now - (up or 0)
+        st.session, st.last, st.expect = {}, {}, set()
+        for name, (fld, from_start) in COUNTERS.items():
+            v = status.get(fld)
+            if v is None:
+                continue
+            st.last[name] = v
+            st.session[name] = v if from_start else 0   # earned since the client started: the session's, not the windows'
+            self._names.add(name)
+
+    def _add(self, st, name, gain, now):
+        st.session[name] = st.session.get(name, 0) + gain
+        for w in WINDOWS:
+            st.rings[name][w].add(gain, now)
+            self._fleet[name][w].add(gain, now)
+        self._fleet_gain[name] += gain
+
+    def expect_reset(self, account_id, name="profit"):
+        """The switcher asked the client to zero ``name``; its next drop is a reset, not a loss."""
+        with self._lock:
+            st = self._accounts.get(account_id)
+            if st is not None:
+                st.expect.add(name)
+
+    def forget(self, account_id):
+        with self._lock:
+            self._accounts.pop(account_id, None)
+
+    def rates(self, account_id, now=None) -> dict:
+        """{rate name: {"5m", "1h", "session": per hour or None}} for the counters ``account_id`` reports."""
+        now = time.time() if now is None else now
+        with self._lock:
+            st = self._accounts.get(account_id)
+            if st is None:
+                return {}
+            out = {}
+            for name in st.last:
+                r = {w: ring.per_hour(now) for w, ring in st.rings[name].items()}
+                span = st.seen - st.session_start     # a stopped client's session ends when it was last seen
+                r["session"] = st.session.get(name, 0) * 3600 / span if span >= MIN_SPAN_S else None
+                out[name] = r
+            return out
+
+    def fleet(self, now=None) -> dict:
+        """Fleet-wide rates; "session" is everything gained since the switcher started."""
+        now = time.time() if now is None else now
+        with self._lock:
+            out = {}
+            for name, rings in self._fleet.items():
+                if name not in self._names:
+                    continue
+                r = {w: ring.per_hour(now) for w, ring in rings.items()}
+                span = now - self._start
+                r["session"] = self._fleet_gain[name] * 3600 / span if span >= MIN_SPAN_S else None
+                out[name] = r
+            return out
+
+
+tracker = RateTracker()
@@ -0,0 +1,312 @@
+"""
+scheduler.py - Session-window launch / stop plans and host-load preview
+
+Each account can carry a SessionPlan (config.py): daily windows such as
+"09:00-13:00, 18:00-23:30" inside which it plays sessions of up to
+session_min minutes separated by break_min minute breaks. Window starts,
+session lengths and breaks are all shifted by up to ±jitter_min minutes.
+Jitter is seeded per account, day and window, so the preview and the live
+run agree on the same times.
+
+Launch queue:
+  Launches are spaced at least Schedule.launch_gap_s apart and never more
+  than Schedule.max_booting clients are starting up at once, so the host
+  does not take a CPU spike from every JVM booting together. plan_launches()
+  applies these rules to a list of sessions; preview() runs it ahead of time
+  and projects the host load, and Scheduler enforces the same rules live on
+  top of switcher.launch / switcher.shutdown.
+"""
+
+import datetime as _dt
+import heapq
+import random
+import re
+import threading
+import time
+
+import config as cfg
+import journal as jr
+import monitor as mon
+import switcher as sw
+
+DAY_S = 86400
+MIN_SESSION_S = 300          # shorter leftovers at the end of a window are skipped
+MIN_BREAK_S = 60
+
+# Rough per-client host cost for the preview
+JVM_OVERHEAD_MB = 300        # native memory on top of the heap
+DEFAULT_HEAP_MB = 512
+BOOT_CORES = 1.0             # CPU cores a client burns while starting up
+RUN_CORES = 0.15             # ... and once it is logged in
+
+_WINDOW_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$")
+
+
+# ── Plans ──────────────────────────────────────────────────────────────────────
+
+def parse_windows(text: str) -> list:
+    """
+    "09:00-13:00, 22:00-02:00" -> [(540, 780), (1320, 1560)] in minutes after
+    midnight; a window ending at or before its start runs past midnight.
+    Raises ValueError on malformed input.
+    """
+    out = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        m = _WINDOW_RE.match(part)
+        if not m:
+            raise ValueError(f"Bad window '{part}' — expected HH:MM-HH:MM")
+        h0, m0, h1, m1 = map(int, m.groups())
+        if h0 > 23 or h1 > 24 or m0 > 59 or m1 > 59:
+            raise ValueError(f"Bad time in window '{part}'")
+        start, end = h0 * 60 + m0, h1 * 60 + m1
+        if end <= start:
+            end += 24 * 60
+        out.append((start, end))
+    return out
+
+
+def _midnight(day: _dt.date) -> float:
+    return _dt.datetime.combine(day, _dt.time()).timestamp()
+
+
+def sessions(plan, account_id: str, start: float, end: float) -> list:
+    """[(t0, t1), ...] session times (epoch seconds) of ``plan`` overlapping [start, end)."""
+    if not plan.enabled:
+        return []
+    try:
+        windows = parse_windows(plan.windows)
+    except ValueError:
+        return []
+    jit = max(0, plan.jitter_min) * 60
+    length = max(1, plan.session_min) * 60
+    brk = max(0, plan.break_min) * 60
+    out = []
+    day = _dt.date.fromtimestamp(start) - _dt.timedelta(days=1)   # yesterday's window may run past midnight
+    last = _dt.date.fromtimestamp(end)
+    while day <= last:
+        base = _midnight(day)
+        for i, (w0, w1) in enumerate(windows):
+            rng = random.Random(f"{account_id}:{day.isoformat()}:{i}")
+            t = base + w0 * 60 + rng.uniform(-jit, jit)
+            stop = base + w1 * 60 + rng.uniform(-jit, jit)
+            while stop - t >= MIN_SESSION_S:
+                t1 = min(t + max(MIN_SESSION_S, length + rng.uniform(-jit, jit)), stop)
+                if t1 > start and t < end:
+                    out.append((t, t1))
+                t = t1 + max(MIN_BREAK_S, brk + rng.uniform(-jit, jit))
+        day += _dt.timedelta(days=1)
+    out.sort()
+    return out
+
+
+def plan_launches(items, max_booting: int, gap_s: float, boot_s: float, last_launch: float = 0.0) -> list:
+    """
+    Apply the launch queue rules to ``items`` — (t0, t1, account_id) sessions.
+    Returns [{"account_id", "start", "stop", "launch", "booted"}] for every
+    session that still gets a launch before it ends; the rest are dropped.
+    """
+    out, boots = [], []     # boots: heap of boot-finish times still in flight
+    k = max(1, max_booting)
+    for t0, t1, aid in sorted(items):
+        at = max(t0, last_launch + gap_s)
+        while True:
+            while boots and boots[0] <= at:
+                heapq.heappop(boots)
+            if len(boots) < k:
+                break
+            at = max(at, boots[0])
+        if at >= t1:
+            continue
+        last_launch = at
+        heapq.heappush(boots, at + boot_s)
+        out.append({"account_id": aid, "start": t0, "stop": t1, "launch": at, "booted": min(at + boot_s, t1)})
+    return out
+
+
+def client_memory_mb(account, settings, profiles: dict = None) -> int:
+    """Projected resident memory of one client: the max heap it launches with plus JVM overhead."""
+    heap = sw.jvm_args_for(account, settings, profiles)[1]
+    return (heap or DEFAULT_HEAP_MB) + JVM_OVERHEAD_MB
+
+
+def preview(accounts, schedule, settings, start: float = None, hours: float = 24, step_s: int = 300) -> dict:
+    """
+    Run the launch queue ahead over the next ``hours`` and project host load.
+
+    Returns {"timeline": [(t, running, booting, mem_mb, cores)], "launches": [...],
+    "dropped": int, "peak_running", "peak_booting", "peak_mem_mb", "peak_cores"}.
+    """
+    start = time.time() if start is None else start
+    end = start + hours * 3600
+    byid = {a.id: a for a in accounts if not a.skip_launch}
+    items = [(t0, t1, aid) for aid, plan in schedule.plans.items() if aid in byid
+             for t0, t1 in sessions(plan, aid, start, end)]
+    launches = plan_launches(items, schedule.max_booting, schedule.launch_gap_s, schedule.boot_estimate_s)
+    profiles = cfg.load_jvm_profiles()
+    mem = {aid: client_memory_mb(a, settings, profiles) for aid, a in byid.items()}
+    timeline = []
+    for t in range(int(start), int(end) + 1, step_s):
+        live = [x for x in launches if x["launch"] <= t < x["stop"]]
+        booting = sum(1 for x in live if t < x["booted"])
+        used = sum(mem[x["account_id"]] for x in live)
+        cores = booting * BOOT_CORES + (len(live) - booting) * RUN_CORES
+        timeline.append((t, len(live), booting, used, round(cores, 2)))
+    return {"timeline": timeline, "launches": launches, "dropped": len(items) - len(launches),
+            "peak_running": max((r[1] for r in timeline), default=0),
+            "peak_booting": max((r[2] for r in timeline), default=0),
+            "peak_mem_mb": max((r[3] for r in timeline), default=0),
+            "peak_cores": max((r[4] for r in timeline), default=0.0)}
+
+
+# ── Live scheduler ─────────────────────────────────────────────────────────────
+
+class Scheduler:
+    """
+    Background thread that launches and stops accounts according to the saved
+    Schedule. Only clients the scheduler launched itself are ever stopped by it.
+
+    ``on_event(kind, account, text)`` is called from the scheduler thread for
+    "launch", "login", "stop", "exit" and "error".
+    """
+    TICK_S = 5.0
+    BOOT_TIMEOUT_S = 180     # a client still not logged in after this frees its boot slot
+    FAIL_BACKOFF_S = 300     # wait this long before retrying a launch that raised
+
+    def __init__(self, get_accounts, get_settings, on_event=None):
+        self._get_accounts = get_accounts
+        self._get_settings = get_settings
+        self._on_event = on_event or (lambda kind, account, text: None)
+        self.schedule = cfg.load_schedule()
+        self._owned = {}       # account id -> session stop time
+        self._booting = {}     # account id -> launch time
+        self._done = {}        # account id -> stop of a session that already ended early
+        self._failed = {}      # account id -> retry-after time
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_schedule(self, schedule):
+        self.schedule = schedule
+        cfg.save_schedule(schedule)
+        if schedule.enabled:
+            self.start()
+        else:
+            self.stop()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stop.is_set())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick(time.time())
+            except Exception as e:
+                jr.journal.record(jr.ERROR, text=f"Scheduler tick failed: {e}")
+                self._on_event("error", None, f"Scheduler tick failed: {e}")
+            self._stop.wait(self.TICK_S)
+
+    def desired(self, now: float) -> dict:
+        """account id -> stop time of the session that should be running right now."""
+        out = {}
+        accounts = {a.id: a for a in self._get_accounts() if not a.skip_launch}
+        for aid, plan in self.schedule.plans.items():
+            if aid not in accounts:
+                continue
+            for t0, t1 in sessions(plan, aid, now - DAY_S, now + 1):
+                if t0 <= now < t1:
+                    out[aid] = t1
+        return out
+
+    @staticmethod
+    def _login_states(accs) -> dict:
+        """account id -> loginState for ``accs``, from one concurrent heartbeat scan."""
+        if not accs:
+            return {}
+        ports = None if any(not a.http_port for a in accs) else {a.http_port for a in accs}
+        found = mon.central_scan(ports, detail=lambda s: False)
+        by_name = {}
+        for port, data in found.items():
+            s = data["status"] or {}
+            by_name.setdefault(s.get("playerName", "").strip().lower(), []).append((port, s))
+        out = {}
+        for a in accs:
+            for port, s in by_name.get(a.display_name.strip().lower(), ()):
+                if not a.http_port or port == a.http_port:
+                    out[a.id] = s.get("loginState", "")
+                    break
+        return out
+
+    def tick(self, now: float):
+        sch, settings = self.schedule, self._get_settings()
+        accounts = {a.id: a for a in self._get_accounts()}
+        want = self.desired(now)
+
+        # Stop owned clients whose session is over; forget ones that exited on their own
+        expired = []
+        for aid, stop in list(self._owned.items()):
+            acc = accounts.get(aid)
+            if acc is None:
+                self._owned.pop(aid)
+                continue
+            if not sw.is_running(acc):
+                self._owned.pop(aid)
+                self._booting.pop(aid, None)
+                if aid in want:
+                    self._done[aid] = want[aid]   # don't relaunch until the next session
+                self._on_event("exit", acc, f"{acc.display_name} exited before its session ended")
+            elif aid not in want or want[aid] != stop:
+                expired.append(acc)
+        if expired:
+            outcomes = sw.shutdown(expired)["outcomes"]
+            for acc in expired:
+                self._owned.pop(acc.id)
+                self._booting.pop(acc.id, None)
+                if outcomes.get(acc.id) == sw.STUCK:
+                    self._on_event("error", acc, f"{acc.display_name} did not exit after being killed")
+                else:
+                    self._on_event("stop", acc, f"Stopped {acc.display_name} (session over)")
+
+        # Free boot slots of clients that logged in or timed out
+        for aid, t in list(self._booting.items()):
+            acc = accounts.get(aid)
+            if acc is None or now - t > self.BOOT_TIMEOUT_S:
+                self._booting.pop(aid)
+                if acc is not None:
+                    jr.journal.login_timeout(acc)
+        states = self._login_states([accounts[aid] for aid in self._booting])
+        for aid, t in list(self._booting.items()):
+            acc = accounts[aid]
+            if states.get(aid) == "LOGGED_IN":
+                self._booting.pop(aid)
+                jr.journal.login(acc)
+                self._on_event("login", acc, f"{acc.display_name} logged in after {now - t:.0f}s")
+
+        # Launch what is due, oldest session first, within the boot-slot and spacing limits
+        self._done = {aid: t for aid, t in self._done.items() if t > now}
+        due = sorted((stop, aid) for aid, stop in want.items()
+                     if aid not in self._owned and aid not in self._done
+                     and self._failed.get(aid, 0) <= now and not sw.is_running(accounts[aid]))
+        for stop, aid in due:
+            if len(self._booting) >= max(1, sch.max_booting) or now - sw.last_launch() < sch.launch_gap_s:
+                break
+            acc = accounts[aid]
+            try:
+                sw.launch(acc, settings, protect_process=settings.protect_process)
+            except (sw.SwitcherError, OSError) as e:
+                self._failed[aid] = now + self.FAIL_BACKOFF_S
+                self._on_event("error", acc, f"Launch of {acc.display_name} failed: {e}")
+                continue
+            self._owned[aid] = stop
+            self._booting[aid] = now
+            self._on_event("launch", acc, f"Launched {acc.display_name} until "
+                                          f"{time.strftime('%H:%M', time.localtime(stop))}")
+            now = time.time()
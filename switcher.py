@@ -1,6 +1,9 @@
 """
 switcher.py - Core logic: save/switch credentials, launch, kill.
 
+Kill and Kill All go through shutdown(): graceful terminate for every
+process tree at once, one shared deadline, and kill only for survivors.
+
 Process protection (optional, requires admin):
   When enabled, launched Java processes are hardened against detection:
   1. Launched with CREATE_BREAKAWAY_FROM_JOB so they're detached from any
@@ -15,14 +18,23 @@ Process protection (optional, requires admin):
 
 import ctypes
 import ctypes.wintypes as wt
-import shutil
+import hashlib
 import subprocess
+import sys
+import threading
+import time
 import uuid
 from pathlib import Path
 
 import psutil
 
-from config import Account, Settings, PROFILES_DIR, CREDENTIALS_FILENAME, ensure_dirs
+import groups as grp
+import journal as jr
+import perf
+from config import (Account, Settings, PROFILES_DIR, CREDENTIALS_FILENAME, ensure_dirs,
+                    read_file_cached, write_file_cached, file_exists_cached,
+                    load_jvm_profiles, load_memory_history, save_memory_history,
+                    load_process_registry, save_process_registry)
 
 
 class SwitcherError(Exception):
@@ -31,6 +43,12 @@ class SwitcherError(Exception):
 
 # account_id -> psutil.Process
 _running: dict = {}
+_stopping: dict = {}        # account id -> shutdown() calls in progress for it; its exit is not a crash
+_stopping_lock = threading.Lock()
+
+# account_id -> {"pid", "create_time", "cmd_hash", "argc", "heap_mb"}; mirrors _running on disk
+_registry: dict = load_process_registry()
+_registry_lock = threading.Lock()
 
 # ── Windows API constants ──────────────────────────────────────────────────────
 
@@ -62,6 +80,9 @@ DENY_MASK = PROCESS_VM_READ | PROCESS_QUERY_INFORMATION
 JobObjectBasicUIRestrictions    = 4
 JOB_OBJECT_UILIMIT_HANDLES      = 0x00000001
 
+# Window messages
+WM_CLOSE                        = 0x0010
+
 # Token / SID
 TOKEN_QUERY                     = 0x0008
 TokenUser                       = 1
@@ -268,6 +289,17 @@ def _apply_process_protection(pid: int) -> bool:
 
 # ── Public API ─────────────────────────────────────────────────────────────────
 
+# credentials.properties is shared by every launch, so switching and spawning
+# are serialized across the UI and the scheduler.
+_launch_lock = threading.Lock()
+_last_launch = 0.0
+
+
+def last_launch() -> float:
+    """time.time() of the most recent launch from any caller (0 if none yet)."""
+    return _last_launch
+
+
 def get_active_credentials_path(settings: Settings) -> Path:
     return Path(settings.runelite_folder) / CREDENTIALS_FILENAME
 
@@ -278,30 +310,35 @@ def credentials_exist(settings: Settings) -> bool:
 
 def import_current_credentials(account: Account, settings: Settings) -> None:
     src = get_active_credentials_path(settings)
-    if not src.exists():
+    data = read_file_cached(src)
+    if data is None:
         raise SwitcherError(
             f"credentials.properties not found at:\n{src}\n\n"
             "Launch RuneLite or Microbot via the Jagex Launcher first so it writes the credentials file."
         )
     ensure_dirs()
-    dest = PROFILES_DIR / account.credentials_file
-    shutil.copy2(src, dest)
+    write_file_cached(PROFILES_DIR / account.credentials_file, data)
 
 
 def switch_to(account: Account, settings: Settings) -> None:
-    src = PROFILES_DIR / account.credentials_file
-    if not src.exists():
+    """
+    Copy the account's saved credentials into the active .runelite folder.
+    Both sides go through the config file cache, so switching to the account
+    that is already active is a pair of stats and no reads or writes.
+    """
+    data = read_file_cached(PROFILES_DIR / account.credentials_file)
+    if data is None:
         raise SwitcherError(
             f"No saved credentials for '{account.display_name}'.\n"
             "Select the account and click 'Import Account' after logging in via Jagex Launcher."
         )
     dest = get_active_credentials_path(settings)
     dest.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(src, dest)
+    write_file_cached(dest, data)
 
 
 def has_credentials(account: Account) -> bool:
-    return (PROFILES_DIR / account.credentials_file).exists()
+    return file_exists_cached(PROFILES_DIR / account.credentials_file)
 
 
 def launch(account: Account, settings: Settings,
@@ -309,7 +346,18 @@ def launch(account: Account, settings: Settings,
     """
     Switch credentials then launch the jar. Returns the PID.
     """
-    switch_to(account, settings)
+    with _launch_lock:
+        try:
+            return _launch(account, settings, protect_process)
+        except Exception as e:
+            jr.journal.record(jr.LAUNCH_FAILED, account, error=str(e) or type(e).__name__)
+            raise
+
+
+def _launch(account: Account, settings: Settings, protect_process: bool) -> int:
+    global _last_launch
+    with perf.stage("launch.switch"):
+        switch_to(account, settings)
 
     if not settings.jar_path:
         raise SwitcherError(
@@ -320,30 +368,39 @@ def launch(account: Account, settings: Settings,
         raise SwitcherError(f"Jar file not found:\n{jar}")
 
     cmd = ["java"]
-    jvm_args = settings.jvm_args.split() if settings.jvm_args.strip() else []
+    jvm_args, heap_mb = jvm_args_for(account, settings)
     if account.client_args.developer_mode and "-ea" not in jvm_args:
         jvm_args.append("-ea")
     cmd += jvm_args
     cmd += ["-jar", str(jar)]
     cmd += account.client_args.build_args()
 
-    creation_flags = subprocess.CREATE_NO_WINDOW | CREATE_BREAKAWAY_FROM_JOB
+    # Creation flags are Windows-only; elsewhere (e.g. the simulator's stub
+    # "java" on a Linux bench box) the process is started plainly.
+    creation_flags = (subprocess.CREATE_NO_WINDOW | CREATE_BREAKAWAY_FROM_JOB
+                      if sys.platform == "win32" else 0)
 
-    proc = subprocess.Popen(
-        cmd,
-        cwd=str(jar.parent),
-        creationflags=creation_flags,
-    )
+    with perf.stage("launch.spawn"):
+        proc = subprocess.Popen(
+            cmd,
+            cwd=str(jar.parent),
+            creationflags=creation_flags,
+        )
 
     pid = proc.pid
+    _last_launch = time.time()
 
     # Apply additional hardening AFTER registering the process so that even if
     # protection partially fails, we still track the PID correctly.
     ps_proc = psutil.Process(pid)
     _running[account.id] = ps_proc
+    _register(account.id, ps_proc, cmd, heap_mb)
+    memory.begin(account.id, heap_mb)
+    jr.journal.record(jr.LAUNCH, account, pid=pid, heap_mb=heap_mb)
 
     if protect_process and is_admin():
-        _apply_process_protection(pid)
+        with perf.stage("launch.protect"):
+            _apply_process_protection(pid)
         # Re-open psutil handle after DACL change — the handle psutil cached
         # internally was opened before the DACL was applied so it remains valid,
         # but create a fresh one to be safe.
@@ -355,17 +412,354 @@ def launch(account: Account, settings: Settings,
     return pid
 
 
-def kill(account: Account) -> None:
-    proc = _running.get(account.id)
-    if proc is None:
-        raise SwitcherError(f"No tracked process for '{account.display_name}'.")
+# ── JVM arguments ──────────────────────────────────────────────────────────────
+
+def _flag_key(arg: str) -> str:
+    """Which setting a JVM flag controls, so a profile flag can replace a global one."""
+    if arg[:4] in ("-Xmx", "-Xms", "-Xss"):
+        return arg[:4]
+    if arg.startswith("-XX:+Use") and arg.endswith("GC"):
+        return "gc"
+    if arg.startswith(("-XX:SharedArchiveFile=", "-XX:ArchiveClassesAtExit=", "-Xshare:")):
+        return "cds"
+    return arg
+
+
+def jvm_args_for(account: Account, settings: Settings, profiles: dict = None) -> tuple:
+    """
+    (JVM flags, max heap MB or 0) for launching ``account``: Settings.jvm_args
+    with the account's JvmProfile (or its group's) layered on top. Global flags controlling the
+    same setting as a profile flag (heap sizes, GC, CDS) are dropped, since
+    e.g. two GC selections make the JVM refuse to start.
+    """
+    base = settings.jvm_args.split() if settings.jvm_args.strip() else []
+    profiles = load_jvm_profiles() if profiles is None else profiles
+    name = grp.index.jvm_profile(account)
+    prof = profiles.get(name) if name else None
+    if prof is None:
+        return base, _heap_from_args(base)
+    extra = prof.build_args(memory.auto_heap_mb(account.id) if prof.auto_heap else 0)
+    keys = {_flag_key(a) for a in extra}
+    if "-Xmx" in keys:
+        keys.add("-Xms")   # a global -Xms above the profile's -Xmx would stop the JVM from starting
+    args = [a for a in base if _flag_key(a) not in keys] + extra
+    return args, _heap_from_args(args)
+
+
+_HEAP_UNITS = {"t": 2 ** 40, "g": 2 ** 30, "m": 2 ** 20, "k": 2 ** 10}
+
+
+def _heap_from_args(args) -> int:
+    """-Xmx of ``args`` in MB (0 if unset); a value without a unit is in bytes."""
+    for a in reversed(args):
+        if a.startswith("-Xmx"):
+            v = a[4:]
+            unit = _HEAP_UNITS.get(v[-1:].lower())
+            n = v[:-1] if unit else v
+            if n.isdigit():
+                return int(n) * (unit or 1) // 2 ** 20
+    return 0
+
+
+# ── Peak RSS history (auto heap sizing) ────────────────────────────────────────
+
+class MemoryHistory:
+    """
+    Samples the resident memory of every tracked client and keeps each
+    account's per-session peak. auto_heap_mb() turns the recent peaks into a
+    max heap: peak RSS minus the JVM's non-heap share, plus headroom. A session
+    whose RSS reached its heap cap plus that share was probably heap-bound, so
+    the next heap is grown instead of shrunk.
+    """
+    INTERVAL_S = 10.0
+    KEEP = 10              # sessions remembered per account
+    RECENT = 5             # sessions the auto heap looks at
+    NON_HEAP_MB = 300      # metaspace, code cache, thread stacks, native buffers
+    HEADROOM = 1.25
+    GROW = 1.25
+    MIN_MB, MAX_MB, STEP_MB = 384, 4096, 64
+
+    def __init__(self, history: dict = None):
+        self._lock = threading.Lock()
+        self._history = dict(history or {})
+        self._live = {}       # account id -> {"peak_mb", "heap_mb"}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def begin(self, account_id: str, heap_mb: int):
+        with self._lock:
+            self._live[account_id] = {"peak_mb": 0, "heap_mb": heap_mb}
+
+    def sample(self):
+        """Update live peaks; close out sessions whose process is gone."""
+        ended = False
+        for aid in list(self._live):
+            proc = _running.get(aid)
+            mb = None
+            try:
+                if proc is not None and proc.is_running():
+                    mb = (proc.memory_info().rss
+                          + sum(c.memory_info().rss for c in proc.children(recursive=True))) // 2**20
+            except psutil.Error:
+                pass
+            if mb is None:
+                _lost(aid)      # the sampler doubles as the watchdog for clients nobody is looking at
+            with self._lock:
+                cur = self._live.get(aid)
+                if cur is None:
+                    continue
+                if mb is not None:
+                    cur["peak_mb"] = max(cur["peak_mb"], mb)
+                    continue
+                self._live.pop(aid)
+                if cur["peak_mb"]:
+                    hist = self._history.setdefault(aid, [])
+                    hist.append({**cur, "ended": int(time.time())})
+                    del hist[:-self.KEEP]
+                    ended = True
+        if ended:
+            self.save()
+
+    def auto_heap_mb(self, account_id: str) -> int:
+        """Max heap for the next launch of ``account_id``; 0 until a session has been seen."""
+        with self._lock:
+            recent = list(self._history.get(account_id, []))[-self.RECENT:]
+        if not recent:
+            return 0
+        peak = max(h["peak_mb"] for h in recent)
+        mb = (peak - self.NON_HEAP_MB) * self.HEADROOM
+        last = recent[-1]
+        if last.get("heap_mb") and last["peak_mb"] >= last["heap_mb"] + self.NON_HEAP_MB * 0.8:
+            mb = max(mb, last["heap_mb"] * self.GROW)
+        mb = -(-int(mb) // self.STEP_MB) * self.STEP_MB
+        return max(self.MIN_MB, min(self.MAX_MB, mb))
+
+    def peaks(self, account_id: str) -> list:
+        with self._lock:
+            return [h["peak_mb"] for h in self._history.get(account_id, [])]
+
+    def save(self):
+        with self._lock:
+            snapshot = {aid: list(h) for aid, h in self._history.items()}
+        save_memory_history(snapshot)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.INTERVAL_S):
+            self.sample()
+
+
+memory = MemoryHistory(load_memory_history())
+
+
+# ── Process registry ───────────────────────────────────────────────────────────
+#
+# Every launched client is recorded in running.json so a restarted switcher
+# can re-attach to it. A PID alone is not enough — Windows reuses PIDs
+# quickly — so an entry only matches a live process with the same
+# create_time and the same launch arguments (everything after the
+# executable, which also holds when java is a wrapper that execs the JVM).
+
+def _cmd_hash(args) -> str:
+    return hashlib.sha1("\0".join(args).encode("utf-8", "replace")).hexdigest()
+
+
+def _register(account_id: str, proc: psutil.Process, cmd: list, heap_mb: int = 0):
     try:
-        for child in proc.children(recursive=True):
-            child.kill()
-        proc.kill()
-    except psutil.NoSuchProcess:
-        pass
-    _running.pop(account.id, None)
+        created = proc.create_time()
+    except psutil.Error:
+        return
+    with _registry_lock:
+        _registry[account_id] = {"pid": proc.pid, "create_time": created,
+                                 "cmd_hash": _cmd_hash(cmd[1:]), "argc": len(cmd) - 1,
+                                 "heap_mb": heap_mb}
+        save_process_registry(dict(_registry))
+
+
+def _forget(account_id: str):
+    _running.pop(account_id, None)
+    with _registry_lock:
+        if _registry.pop(account_id, None) is not None:
+            save_process_registry(dict(_registry))
+
+
+def _lost(account_id: str):
+    """A tracked client went away without shutdown(): it crashed or was closed from its own window."""
+    proc = _running.get(account_id)
+    if proc is None or account_id in _stopping:
+        return
+    try:
+        code = proc.wait(0)     # reaps our own child and yields its exit code
+    except psutil.TimeoutExpired:
+        return                  # still running after all (e.g. access denied to its memory)
+    except psutil.Error:
+        code = None
+    if _running.pop(account_id, None) is None:
+        return                  # another thread got here first
+    _forget(account_id)
+    jr.journal.record(jr.EXIT, account_id=account_id, pid=proc.pid, exit_code=code)
+
+
+def adopt(accounts) -> list:
+    """
+    Re-attach clients launched by an earlier run of the switcher. Reads the
+    PID table once and only opens the registered PIDs that are in it; an
+    entry is adopted when its process still has the recorded create_time and
+    launch arguments. Stale entries are dropped. Returns the adopted accounts.
+    """
+    with _registry_lock:
+        entries = {aid: dict(e) for aid, e in _registry.items()}
+    known = {a.id: a for a in accounts}
+    by_pid = {e["pid"]: aid for aid, e in entries.items() if aid in known and aid not in _running}
+    adopted = []
+    with perf.stage("adopt"):
+        alive = set(psutil.pids())
+        for pid, aid in by_pid.items():
+            if pid not in alive:
+                continue
+            e = entries[aid]
+            try:
+                proc = psutil.Process(pid)
+                with proc.oneshot():
+                    created = proc.create_time()
+                    try:
+                        args = proc.cmdline()
+                    except psutil.AccessDenied:
+                        args = None     # a hardened client may hide it; create_time already pins the process
+            except psutil.Error:
+                continue
+            if abs(created - e["create_time"]) > 0.5:
+                continue
+            if args is not None and (len(args) <= e["argc"] or _cmd_hash(args[-e["argc"]:]) != e["cmd_hash"]):
+                continue
+            _running[aid] = proc
+            memory.begin(aid, e.get("heap_mb", 0))
+            adopted.append(known[aid])
+            jr.journal.record(jr.ADOPT, known[aid], pid=pid)
+    with _registry_lock:
+        for aid in entries:
+            if aid not in _running:
+                _registry.pop(aid, None)
+        save_process_registry(dict(_registry))
+    return adopted
+
+
+# ── Shutdown ───────────────────────────────────────────────────────────────────
+
+GRACE_S = 8.0          # how long terminated clients get to exit on their own
+KILL_WAIT_S = 3.0      # how long to wait for force-killed processes to disappear
+
+STOPPED, KILLED, STUCK, GONE = "stopped", "killed", "stuck", "not running"
+
+
+def shutdown(accounts, grace_s: float = GRACE_S, kill_wait_s: float = KILL_WAIT_S) -> dict:
+    """
+    Stop the clients of ``accounts`` together.
+
+    Every tracked process tree is collected in one pass and every process is
+    asked to exit at once: on Windows WM_CLOSE is posted to its top-level
+    windows (terminate() there is TerminateProcess, a hard kill), elsewhere
+    it gets SIGTERM; either way the JVM runs its shutdown hooks. They are
+    waited on together with psutil.wait_procs until ``grace_s``. Only what is
+    still alive after that is killed. Blocks for at most grace_s + kill_wait_s.
+
+    Returns {"outcomes": {account_id: STOPPED | KILLED | STUCK | GONE},
+    "elapsed_s": float}.
+    """
+    t0 = time.perf_counter()
+    outcomes, trees = {}, {}       # trees: account id -> [psutil.Process]
+    ids = [a.id for a in accounts]
+    with _stopping_lock:
+        for aid in ids:
+            _stopping[aid] = _stopping.get(aid, 0) + 1
+    try:
+        _shutdown(accounts, grace_s, kill_wait_s, outcomes, trees)
+    finally:
+        with _stopping_lock:
+            for aid in ids:
+                n = _stopping.pop(aid, 1) - 1
+                if n:
+                    _stopping[aid] = n      # an overlapping shutdown() is still stopping it
+    elapsed = time.perf_counter() - t0
+    for acc in accounts:
+        jr.journal.record(jr.STOP, acc, outcome=outcomes.get(acc.id, GONE), elapsed_s=round(elapsed, 2))
+    return {"outcomes": outcomes, "elapsed_s": elapsed}
+
+
+def _shutdown(accounts, grace_s, kill_wait_s, outcomes, trees):
+    for acc in accounts:
+        proc = _running.get(acc.id)
+        if proc is None:
+            outcomes[acc.id] = GONE
+            continue
+        try:
+            trees[acc.id] = [proc] + proc.children(recursive=True)
+        except psutil.NoSuchProcess:
+            outcomes[acc.id] = GONE
+            _forget(acc.id)
+
+    procs = {p.pid: p for tree in trees.values() for p in tree}
+    with perf.stage("shutdown"):
+        if sys.platform == "win32":
+            _post_close(set(procs))
+        else:
+            for p in procs.values():
+                try:
+                    p.terminate()
+                except psutil.Error:
+                    pass        # already gone; anything else alive is escalated below
+        _, alive = psutil.wait_procs(list(procs.values()), timeout=grace_s)
+        escalated = {p.pid for p in alive}
+        for p in alive:
+            try:
+                p.kill()
+            except psutil.Error:
+                pass
+        _, stuck = psutil.wait_procs(alive, timeout=kill_wait_s) if alive else ([], [])
+    stuck = {p.pid for p in stuck}
+    perf.count("shutdown.escalated", len(escalated))
+
+    for aid, tree in trees.items():
+        pids = {p.pid for p in tree}
+        if pids & stuck:
+            outcomes[aid] = STUCK
+            continue
+        outcomes[aid] = KILLED if pids & escalated else STOPPED
+        _forget(aid)
+
+
+def _post_close(pids: set):
+    """Windows: post WM_CLOSE to every top-level window owned by ``pids``, like clicking its close button."""
+    user32 = ctypes.windll.user32
+    owner = wt.DWORD()
+
+    @ctypes.WINFUNCTYPE(wt.BOOL, wt.HWND, wt.LPARAM)
+    def _each(hwnd, _):
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+        if owner.value in pids:
+            user32.PostMessageW(hwnd, WM_CLOSE, 0, 0)
+        return True
+
+    user32.EnumWindows(_each, 0)
+
+
+def kill(account: Account, grace_s: float = GRACE_S) -> str:
+    """Stop one client (see shutdown()) and return its outcome."""
+    if account.id not in _running:
+        raise SwitcherError(f"No tracked process for '{account.display_name}'.")
+    outcome = shutdown([account], grace_s)["outcomes"][account.id]
+    if outcome == STUCK:
+        raise SwitcherError(f"'{account.display_name}' did not exit after being killed.")
+    return outcome
 
 
 def is_running(account: Account) -> bool:
@@ -373,10 +767,12 @@ def is_running(account: Account) -> bool:
     if proc is None:
         return False
     try:
-        return proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE
+        if proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE:
+            return True
     except psutil.NoSuchProcess:
-        _running.pop(account.id, None)
-        return False
+        pass
+    _lost(account.id)
+    return False
 
 
 def get_pid(account: Account):
@@ -386,7 +782,20 @@ def get_pid(account: Account):
     return None
 
 
+def tracked_processes() -> dict:
+    """account id -> psutil.Process of every client launched or adopted by this switcher."""
+    return dict(_running)
+
+
+def is_safe_file_part(name: str) -> bool:
+    """Whether ``name`` can end a file name as-is: no separators, "..", Windows-reserved or control characters."""
+    if not name or name != name.strip() or name.endswith(".") or ".." in name:
+        return False
+    return not any(ch in '<>:"/\\|?*' or ord(ch) < 32 for ch in name)
+
+
 def new_credentials_filename(display_name: str = "") -> str:
-    if display_name:
+    """A display name that is not safe in a file name gets a random suffix instead."""
+    if display_name and is_safe_file_part(display_name):
         return f"credentials.properties.{display_name}"
     return f"credentials.properties.{uuid.uuid4().hex[:12]}"
@@ -0,0 +1,18 @@
+"""
+conftest.py - Shared test setup
+
+config resolves its folders from APPDATA at import time, so every test
+session runs against a throwaway APPDATA that is removed afterwards.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_APPDATA = tempfile.TemporaryDirectory(prefix="bt_test_")
+os.environ["APPDATA"] = _APPDATA.name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    _APPDATA.cleanup()
@@ -0,0 +1,74 @@
+import os
+
+import config as cfg
+
+
+def _bump(path, text):
+    """Rewrite ``path`` with a later mtime, so the change is visible even on coarse clocks."""
+    st = os.stat(path)
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_read_file_cached_rereads_changed_file(tmp_path):
+    p = tmp_path / "creds"
+    p.write_bytes(b"one")
+    assert cfg.read_file_cached(p) == b"one"
+    _bump(p, "two!")
+    assert cfg.read_file_cached(p) == b"two!"
+
+
+def test_read_file_cached_keeps_pre_read_stat(tmp_path, monkeypatch):
+    p = tmp_path / "creds"
+    p.write_bytes(b"old")
+    real = cfg.Path.read_bytes
+
+    def _racy(self):
+        data = real(self)
+        _bump(p, "new")     # changed after the stat, while being read
+        return data
+    monkeypatch.setattr(cfg.Path, "read_bytes", _racy)
+    assert cfg.read_file_cached(p) == b"old"
+    monkeypatch.setattr(cfg.Path, "read_bytes", real)
+    assert cfg.read_file_cached(p) == b"new"
+
+
+def test_name_cache_follows_the_profile_it_read(tmp_path):
+    creds = tmp_path / "credentials.properties"
+    creds.write_text("JX_SESSION_ID=x\n", encoding="utf-8")
+    prof = tmp_path / "profiles2" / "default.profile"
+    prof.parent.mkdir()
+    prof.write_text("name=Alice\n", encoding="utf-8")
+    assert cfg.read_account_name_from_credentials(creds) == "Alice"
+    _bump(prof, "name=Bob\n")
+    assert cfg.read_account_name_from_credentials(creds) == "Bob"
+
+
+def test_name_from_credentials_text_wins(tmp_path):
+    creds = tmp_path / "credentials.properties"
+    creds.write_text("jx_display_name=Carol\n", encoding="utf-8")
+    assert cfg.read_account_name_from_credentials(creds) == "Carol"
+
+
+def test_jvm_profile_from_dict_coerces_hand_edits():
+    p = cfg.JvmProfile.from_dict({"heap_min_mb": "512", "heap_max_mb": "2048", "auto_heap": 1,
+                                  "thread_stack_kb": "1024"})
+    assert (p.heap_min_mb, p.heap_max_mb, p.auto_heap, p.thread_stack_kb) == (512, 2048, True, 1024)
+    assert p.build_args()[:2] == ["-Xms512m", "-Xmx2048m"]
+
+
+def test_name_cache_sees_another_profile_rewritten_in_place(tmp_path):
+    creds = tmp_path / "credentials.properties"
+    creds.write_text("JX_SESSION_ID=x\n", encoding="utf-8")
+    d = tmp_path / "profiles2"
+    d.mkdir()
+    alice, bob = d / "Alice.profile", d / "Bob.profile"
+    bob.write_text("x\n", encoding="utf-8")
+    alice.write_text("x\n", encoding="utf-8")
+    os.utime(bob, ns=(0, os.stat(alice).st_mtime_ns - 5_000_000_000))
+    assert cfg.read_account_name_from_credentials(creds) == "Alice"
+    dir_stat = os.stat(d).st_mtime_ns
+    bob.write_text("y\n", encoding="utf-8")
+    os.utime(bob, ns=(0, os.stat(alice).st_mtime_ns + 5_000_000_000))
+    assert os.stat(d).st_mtime_ns == dir_stat     # in-place rewrite: the folder looks unchanged
+    assert cfg.read_account_name_from_credentials(creds) == "Bob"
@@ -0,0 +1,105 @@
+import pytest
+
+import config as cfg
+import importer as im
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    d = tmp_path / "profiles"
+    d.mkdir()
+    for name, path in (("APP_DATA_DIR", d), ("PROFILES_DIR", d), ("ACCOUNTS_FILE", d / "accounts.json")):
+        monkeypatch.setattr(cfg, name, path)
+    return d
+
+
+def _creds(folder, fname, name, extra=""):
+    p = folder / fname
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(f"jx_display_name={name}\n{extra}", encoding="utf-8")
+    return p
+
+
+def test_unsafe_names_are_skipped_and_never_written(tmp_path, profiles):
+    src = tmp_path / "src"
+    _creds(src, "credentials.properties.a", "..\\..\\Startup\\x.bat")
+    _creds(src, "credentials.properties.b", "sub/evil")
+    _creds(src, "credentials.properties.c", "Alice")
+    accounts = []
+    plan = im.scan(src, accounts)
+    assert [c.name for c in plan.of(im.NEW)] == ["Alice"]
+    assert len(plan.of(im.SKIPPED)) == 2
+    im.commit(plan, accounts)
+    assert sorted(p.name for p in profiles.iterdir()) == ["accounts.json", "credentials.properties.Alice"]
+    assert not (tmp_path / "Startup").exists()
+
+
+def test_commit_refuses_paths_outside_profiles(tmp_path, profiles):
+    bob = cfg.Account(display_name="Bob", credentials_file="../escape")
+    plan = im.Plan("x", [im.Candidate("x", "x", data=b"k=v", name="Bob", status=im.UPDATE, account=bob)])
+    with pytest.raises(im.BulkImportError):
+        im.commit(plan, [bob], overwrite=True)
+    assert not (tmp_path / "escape").exists()
+
+
+def _saved(profiles, name, extra=""):
+    a = cfg.Account(display_name=name, credentials_file=f"credentials.properties.{name}")
+    _creds(profiles, a.credentials_file, name, extra)
+    return a
+
+
+def test_scan_classifies_each_file(tmp_path, profiles):
+    accounts = [_saved(profiles, "Alice", "k=1\n"), _saved(profiles, "Bob", "k=2\n")]
+    src = tmp_path / "src"
+    (src / "a").mkdir(parents=True)
+    (src / "a" / "credentials.properties.Alice").write_bytes((profiles / "credentials.properties.Alice").read_bytes())
+    _creds(src, "credentials.properties.Bob", "Bob", "k=changed\n")
+    _creds(src, "credentials.properties.Carol", "Carol", "k=3\n")
+    _creds(src, "dupe/credentials.properties.Carol2", "Carol", "k=3\n")
+    _creds(src, "clash/credentials.properties.Dave", "Dave", "k=4\n")
+    _creds(src, "clash2/credentials.properties.Dave", "Dave", "k=5\n")
+    (src / "credentials.properties").write_text("JX_SESSION_ID=x\n", encoding="utf-8")
+    (src / "notes.txt").write_text("not a credentials file", encoding="utf-8")
+    plan = im.scan(src, accounts)
+    got = {c.label.replace("\\", "/"): c.status for c in plan.candidates}
+    assert got == {
+        "a/credentials.properties.Alice": im.DUPLICATE,
+        "credentials.properties.Bob": im.UPDATE,
+        "credentials.properties.Carol": im.NEW,
+        "dupe/credentials.properties.Carol2": im.DUPLICATE,
+        "clash/credentials.properties.Dave": im.NEW,
+        "clash2/credentials.properties.Dave": im.SKIPPED,
+        "credentials.properties": im.SKIPPED,
+    }
+
+
+def test_commit_rechecks_accounts_added_after_the_scan(tmp_path, profiles):
+    src = tmp_path / "src"
+    _creds(src, "credentials.properties.Erin", "Erin", "k=1\n")
+    _creds(src, "credentials.properties.Finn", "Finn", "k=2\n")
+    accounts = []
+    plan = im.scan(src, accounts)
+    assert len(plan.of(im.NEW)) == 2
+    # Meanwhile Erin was added with the same file and Finn under the same name with other credentials
+    erin = _saved(profiles, "Erin", "k=1\n")
+    finn = _saved(profiles, "Finn", "k=old\n")
+    accounts += [erin, finn]
+    rep = im.commit(plan, accounts)
+    assert rep.added == [] and [a.display_name for a in accounts] == ["Erin", "Finn"]
+    assert [label for label, _ in rep.duplicates] == ["credentials.properties.Erin"]
+    assert [label for label, _ in rep.skipped] == ["credentials.properties.Finn"]
+    assert (profiles / finn.credentials_file).read_text(encoding="utf-8") == "jx_display_name=Finn\nk=old\n"
+
+
+def test_commit_all_or_nothing(tmp_path, profiles, monkeypatch):
+    src = tmp_path / "src"
+    _creds(src, "credentials.properties.Gus", "Gus")
+    accounts = []
+    plan = im.scan(src, accounts)
+
+    def _fail(_):
+        raise OSError("disk full")
+    monkeypatch.setattr(cfg, "save_accounts", _fail)
+    with pytest.raises(im.BulkImportError):
+        im.commit(plan, accounts)
+    assert accounts == [] and not list(profiles.glob("credentials.properties*"))
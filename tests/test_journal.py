@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import config as cfg
+import journal as jr
+
+
+class _Clock:
+    def __init__(self, t):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock(1_700_000_000.0)
+    monkeypatch.setattr(jr.time, "time", c)
+    return c
+
+
+@pytest.fixture
+def journal(tmp_path):
+    j = jr.Journal(tmp_path / "journal")
+    yield j
+    j.close()
+
+
+def _acc(name):
+    return cfg.Account(display_name=name, credentials_file=f"credentials.properties.{name}")
+
+
+def test_events_filter_by_time_kind_and_account(journal, clock):
+    a, b = _acc("Alice"), _acc("Bob")
+    journal.record(jr.LAUNCH, a, pid=1)
+    clock.t += 10
+    journal.record(jr.LAUNCH, b, pid=2)
+    clock.t += 10
+    journal.record(jr.STOP, a, outcome="stopped")
+    t0 = clock.t - 20
+    assert [e["kind"] for e in journal.events(t0)] == [jr.LAUNCH, jr.LAUNCH, jr.STOP]
+    assert [e["name"] for e in journal.events(t0, kinds=(jr.LAUNCH,))] == ["Alice", "Bob"]
+    assert [e["kind"] for e in journal.events(t0, account_id=a.id)] == [jr.LAUNCH, jr.STOP]
+    assert [e["name"] for e in journal.events(t0 + 5, until=t0 + 15)] == ["Bob"]
+
+
+def test_segments_roll_over_and_old_ones_are_pruned(journal, clock, monkeypatch):
+    monkeypatch.setattr(journal, "SEGMENT_BYTES", 200)
+    monkeypatch.setattr(journal, "KEEP_SEGMENTS", 3)
+    a = _acc("Alice")
+    for i in range(20):
+        clock.t += 1
+        journal.record(jr.ERROR, a, text="x" * 100, i=i)
+        journal.flush()
+    segs = journal.segments()
+    assert len(segs) == 3
+    kept = [e["i"] for e in journal.events(0)]
+    assert kept == sorted(kept) and kept[-1] == 19
+    recent = list(journal.events(segs[-1][0]))
+    assert recent and all(e["ts"] >= segs[-1][0] for e in recent)
+
+
+def test_failed_flush_keeps_the_batch(journal, clock, monkeypatch):
+    a = _acc("Alice")
+    journal.record(jr.LAUNCH, a, pid=1)
+    real = journal._segment
+
+    def _fail(ts, size):
+        raise OSError("disk full")
+    monkeypatch.setattr(journal, "_segment", _fail)
+    journal.flush()
+    journal.record(jr.STOP, a, outcome="stopped")
+    monkeypatch.setattr(journal, "_segment", real)
+    journal.flush()
+    path = journal.segments()[-1][1]
+    assert [json.loads(ln)["kind"] for ln in path.read_text().splitlines()] == [jr.LAUNCH, jr.STOP]
+
+
+def test_failed_flush_queue_is_bounded(journal, clock, monkeypatch):
+    monkeypatch.setattr(journal, "MAX_QUEUE", 5)
+
+    def _fail(ts, size):
+        raise OSError("disk full")
+    monkeypatch.setattr(journal, "_segment", _fail)
+    for i in range(8):
+        journal.record(jr.ERROR, text=str(i))
+        journal.flush()
+    assert [e["text"] for e in journal._queue] == ["3", "4", "5", "6", "7"]
+
+
+def test_login_is_recorded_once_per_launch(journal, clock):
+    a = _acc("Alice")
+    journal.login(a)            # not launched by us
+    journal.record(jr.LAUNCH, a, pid=1)
+    clock.t += 42
+    journal.login(a)
+    journal.login(a)
+    logins = list(journal.events(0, kinds=(jr.LOGIN,)))
+    assert len(logins) == 1 and logins[0]["launch_to_login_s"] == 42.0
@@ -0,0 +1,46 @@
+import socket
+
+import metrics
+import perf
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _stage_lines(exp):
+    return [l for l in exp.registry.render().decode().splitlines()
+            if l.startswith("babytank_stage_seconds") and not l.startswith("#")]
+
+
+def test_stage_timings_without_diagnostics():
+    assert not perf.ENABLED
+    exp = metrics.Exporter()
+    exp.start(_free_port(), lambda: [])
+    try:
+        with perf.stage("scan"):
+            pass
+        with perf.stage("http"):          # only exported while Diagnostics records it
+            pass
+        exp.collect()
+        lines = _stage_lines(exp)
+        assert 'babytank_stage_seconds_count{stage="scan"} 1' in lines
+        assert not any('stage="http"' in l for l in lines)
+    finally:
+        exp.stop()
+    assert "scan" not in perf._watch
+
+
+def test_restart_stops_the_old_collector():
+    exp = metrics.Exporter()
+    port = _free_port()
+    exp.start(port, lambda: [])
+    first = exp._stop
+    exp.start(port, lambda: [])
+    try:
+        assert first.is_set() and not exp._stop.is_set()
+        assert [len(fns) for name, fns in perf._watch.items() if name in metrics.STAGES] == [1] * len(metrics.STAGES)
+    finally:
+        exp.stop()
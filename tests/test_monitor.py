@@ -0,0 +1,72 @@
+import socket
+
+import monitor as mon
+
+
+class _Resp:
+    status = 200
+
+    def __init__(self, body=b"{}", fail=None):
+        self.body, self.fail = body, fail
+
+    def read(self):
+        if self.fail:
+            raise self.fail
+        return self.body
+
+
+class _Conn:
+    def __init__(self, sent, request_error=None, resp=None):
+        self.sent, self.request_error, self.resp = sent, request_error, resp or _Resp()
+
+    def request(self, method, path, body=None, headers=None):
+        if self.request_error:
+            raise self.request_error
+        self.sent.append((method, path))
+
+    def getresponse(self):
+        if isinstance(self.resp, Exception):
+            raise self.resp
+        return self.resp
+
+    def close(self):
+        pass
+
+
+def _pool(monkeypatch, *conns):
+    """Hand out ``conns`` in order; the first counts as a reused idle connection."""
+    queue = list(conns)
+    monkeypatch.setattr(mon, "_checkout", lambda key, host, port, timeout: (queue.pop(0), len(queue) == len(conns) - 1))
+    monkeypatch.setattr(mon, "_checkin", lambda key, c: None)
+    return queue
+
+
+def test_stale_idle_connection_is_retried(monkeypatch):
+    sent = []
+    _pool(monkeypatch, _Conn(sent, resp=mon.http.client.RemoteDisconnected("closed")), _Conn(sent))
+    assert mon._request(7070, "POST", "/pause", {}, parse=False) == (200, b"{}")
+    assert sent == [("POST", "/pause"), ("POST", "/pause")]
+
+
+def test_broken_pipe_on_send_is_retried(monkeypatch):
+    sent = []
+    _pool(monkeypatch, _Conn(sent, request_error=BrokenPipeError()), _Conn(sent))
+    assert mon._request(7070, "GET", "/status") == (200, {})
+    assert sent == [("GET", "/status")]
+
+
+def test_timeout_after_send_is_not_retried(monkeypatch):
+    sent = []
+    left = _pool(monkeypatch, _Conn(sent, resp=socket.timeout("timed out")), _Conn(sent))
+    assert mon._request(7070, "POST", "/plugins/start", {}, parse=False) is None
+    assert sent == [("POST", "/plugins/start")] and len(left) == 1
+
+
+def test_reset_while_reading_and_bad_json_are_not_retried(monkeypatch):
+    sent = []
+    left = _pool(monkeypatch, _Conn(sent, resp=_Resp(fail=ConnectionResetError())), _Conn(sent))
+    assert mon._request(7070, "POST", "/profit/reset", {}, parse=False) is None
+    assert len(left) == 1
+    left = _pool(monkeypatch, _Conn(sent, resp=_Resp(b"not json")), _Conn(sent))
+    assert mon._request(7070, "GET", "/status") is None
+    assert len(left) == 1
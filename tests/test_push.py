@@ -0,0 +1,127 @@
+import monitor as mon
+
+
+class _Clock:
+    def __init__(self, t):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _hub(monkeypatch, t0):
+    clock = _Clock(t0)
+    monkeypatch.setattr(mon.time, "time", clock)
+    hub = mon.PushHub()
+    hub._streams[7070] = {"sock": None, "status": None, "at": 0.0, "plugins": None, "logs": []}
+    return hub, clock
+
+
+def test_partial_delta_keeps_uptime_base(monkeypatch):
+    hub, clock = _hub(monkeypatch, 1000.0)
+    hub._apply(7070, "status", {"playerName": "Bot", "hp": 50, "uptimeSeconds": 100})
+    clock.t += 120
+    assert hub.snapshot(7070)["status"]["uptimeSeconds"] == 220
+    hub._apply(7070, "status", {"hp": 40})
+    snap = hub.snapshot(7070)["status"]
+    assert snap["hp"] == 40 and snap["uptimeSeconds"] == 220
+    clock.t += 10
+    assert hub.snapshot(7070)["status"]["uptimeSeconds"] == 230
+
+
+def test_uptime_in_delta_rebases(monkeypatch):
+    hub, clock = _hub(monkeypatch, 1000.0)
+    hub._apply(7070, "status", {"uptimeSeconds": 100})
+    clock.t += 60
+    hub._apply(7070, "status", {"uptimeSeconds": 5})      # client restarted
+    assert hub.snapshot(7070)["status"]["uptimeSeconds"] == 5
+
+
+def test_first_status_without_uptime(monkeypatch):
+    hub, clock = _hub(monkeypatch, 1000.0)
+    hub._apply(7070, "status", {"hp": 10})
+    clock.t += 30
+    assert hub.snapshot(7070)["status"]["uptimeSeconds"] == 30
+
+
+def test_log_tail_is_bounded(monkeypatch):
+    hub, _ = _hub(monkeypatch, 0.0)
+    hub._apply(7070, "status", {"uptimeSeconds": 1})
+    hub._apply(7070, "log", [f"line {i}" for i in range(hub.LOG_KEEP + 10)])
+    logs = hub.snapshot(7070)["logs"]
+    assert len(logs) == hub.LOG_KEEP and logs[-1] == f"line {hub.LOG_KEEP + 9}"
+
+
+def test_unknown_port_is_ignored(monkeypatch):
+    hub, _ = _hub(monkeypatch, 0.0)
+    hub._apply(9999, "status", {"hp": 1})
+    assert hub.snapshot(9999) is None
+
+
+class _FailingConnection:
+    def __init__(self, *args, **kw):
+        pass
+
+    def request(self, *args, **kw):
+        raise ConnectionResetError("reset by peer")
+
+    def close(self):
+        pass
+
+
+class _EmptyStream:
+    status = 200
+
+    def getheader(self, name):
+        return "text/event-stream"
+
+    def readline(self):
+        return b""
+
+
+class _ClosingConnection(_FailingConnection):
+    sock = None
+
+    def request(self, *args, **kw):
+        self.sock = type("S", (), {"settimeout": lambda self, t: None})()
+
+    def getresponse(self):
+        return _EmptyStream()
+
+
+def _subscribe_threads(monkeypatch, hub, port):
+    started = []
+
+    class _Thread:
+        def __init__(self, target, args, **kw):
+            self.target, self.args = target, args
+
+        def start(self):
+            started.append(self.args)
+            self.target(*self.args)
+
+    monkeypatch.setattr(mon.threading, "Thread", _Thread)
+    hub.subscribe(port)
+    return started
+
+
+def test_failed_stream_backs_off(monkeypatch):
+    monkeypatch.setattr(mon.http.client, "HTTPConnection", _FailingConnection)
+    hub = mon.PushHub()
+    assert _subscribe_threads(monkeypatch, hub, 7070) == [(7070,)]
+    assert hub._failures[7070] == 1
+    assert _subscribe_threads(monkeypatch, hub, 7070) == []     # no new thread during the backoff
+
+    hub._refused[7070] = 0              # backoff over: the next failure waits twice as long
+    now = mon.time.monotonic()
+    assert _subscribe_threads(monkeypatch, hub, 7070) == [(7070,)]
+    assert hub._failures[7070] == 2
+    assert hub._refused[7070] - now >= 2 * hub.RETRY_FAILED_S - 0.5
+
+
+def test_stream_closing_without_events_backs_off(monkeypatch):
+    monkeypatch.setattr(mon.http.client, "HTTPConnection", _ClosingConnection)
+    hub = mon.PushHub()
+    assert _subscribe_threads(monkeypatch, hub, 7071) == [(7071,)]
+    assert hub._failures[7071] == 1 and 7071 not in hub._streams
+    assert _subscribe_threads(monkeypatch, hub, 7071) == []
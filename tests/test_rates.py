@@ -0,0 +1,85 @@
+import rates as rt
+
+T0 = 1_000_000.0
+
+
+def _status(profit, xp=None, up=None):
+    s = {"profitGp": profit}
+    if xp is not None:
+        s["totalXp"] = xp
+    if up is not None:
+        s["uptimeSeconds"] = up
+    return s
+
+
+def _run(tracker, points, acct=1):
+    """points: (seconds from T0, status)."""
+    for t, st in points:
+        tracker.observe(acct, st, now=T0 + t)
+
+
+def test_steady_gain_rates():
+    tr = rt.RateTracker()
+    _run(tr, [(t, _status(1000 * t // 60, up=600 + t)) for t in range(0, 301, 30)])
+    r = tr.rates(1, now=T0 + 300)["profit"]
+    assert r["5m"] == 60_000
+    assert r["1h"] == 60_000
+
+
+def test_no_rate_before_min_span():
+    tr = rt.RateTracker()
+    _run(tr, [(0, _status(0, up=0)), (30, _status(500, up=30))])
+    assert tr.rates(1, now=T0 + 30)["profit"]["5m"] is None
+
+
+def test_first_status_is_session_not_window():
+    tr = rt.RateTracker()
+    _run(tr, [(0, _status(50_000, up=3600)), (120, _status(50_000, up=3720))])
+    r = tr.rates(1, now=T0 + 120)["profit"]
+    assert r["5m"] == 0
+    assert r["session"] > 0
+
+
+def test_expected_reset_counts_new_value():
+    tr = rt.RateTracker()
+    _run(tr, [(0, _status(10_000, up=100)), (60, _status(12_000, up=160))])
+    tr.expect_reset(1)
+    _run(tr, [(120, _status(300, up=220))])
+    assert tr.rates(1, now=T0 + 120)["profit"]["5m"] == (2000 + 300) * 3600 / 120
+
+
+def test_small_drop_is_a_loss():
+    tr = rt.RateTracker()
+    _run(tr, [(0, _status(10_000, up=100)), (120, _status(9_000, up=220))])
+    assert tr.rates(1, now=T0 + 120)["profit"]["5m"] == -1000 * 3600 / 120
+
+
+def test_uptime_dip_with_counters_intact_is_not_a_restart():
+    tr = rt.RateTracker()
+    _run(tr, [(0, _status(100_000_000, up=220)), (60, _status(100_001_000, up=100)),
+              (120, _status(100_002_000, up=230))])
+    r = tr.rates(1, now=T0 + 120)["profit"]
+    assert r["5m"] == 2000 * 3600 / 120
+
+
+def test_restart_never_books_the_counter_as_window_gain():
+    tr = rt.RateTracker()
+    _run(tr, [(0, _status(5_000, up=100)), (60, _status(6_000, up=160)),
+              (120, _status(4_000, up=10)), (180, _status(5_000, up=70))])
+    r = tr.rates(1, now=T0 + 180)["profit"]
+    assert r["5m"] == 2000 * 3600 / 180
+
+
+def test_long_uptime_drop_is_a_restart_even_with_flat_counters():
+    tr = rt.RateTracker()
+    _run(tr, [(0, _status(0, xp=1000, up=7200)), (60, _status(0, xp=1000, up=5))])
+    r = tr.rates(1, now=T0 + 120)
+    assert tr._accounts[1].session_start == T0 + 55
+    assert r["xp"]["5m"] == 0
+
+
+def test_forget_drops_account():
+    tr = rt.RateTracker()
+    _run(tr, [(0, _status(0, up=0))])
+    tr.forget(1)
+    assert tr.rates(1) == {}
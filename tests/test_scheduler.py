@@ -0,0 +1,80 @@
+import config as cfg
+import monitor as mon
+import scheduler as sched
+
+
+def _acc(name, port=0):
+    return cfg.Account(display_name=name, credentials_file=f"{name}.properties", http_port=port)
+
+
+def _scheduler(accs):
+    return sched.Scheduler(lambda: accs, cfg.Settings)
+
+
+def test_login_states_one_scan_for_all_booting(monkeypatch):
+    a, b, c = _acc("Alpha"), _acc("Bravo"), _acc("Charlie", 7071)
+    calls = []
+
+    def scan(ports=None, detail=None):
+        calls.append(ports)
+        return {7070: {"status": {"playerName": "alpha ", "loginState": "LOGGED_IN"}},
+                7071: {"status": {"playerName": "Charlie", "loginState": "LOGIN_SCREEN"}},
+                7072: {"status": {"playerName": "Charlie", "loginState": "LOGGED_IN"}}}
+
+    monkeypatch.setattr(mon, "central_scan", scan)
+    states = sched.Scheduler._login_states([a, b, c])
+    assert calls == [None]                  # one sweep, not one per account
+    assert states == {a.id: "LOGGED_IN", c.id: "LOGIN_SCREEN"}
+
+
+def test_login_states_fixed_ports_only(monkeypatch):
+    a, b = _acc("Alpha", 7071), _acc("Bravo", 7075)
+    calls = []
+    monkeypatch.setattr(mon, "central_scan", lambda ports=None, detail=None: calls.append(set(ports)) or {})
+    assert sched.Scheduler._login_states([a, b]) == {}
+    assert calls == [{7071, 7075}]
+    assert sched.Scheduler._login_states([]) == {}
+    assert len(calls) == 1
+
+
+def test_tick_frees_boot_slot_on_login(monkeypatch):
+    a, b = _acc("Alpha"), _acc("Bravo")
+    s = _scheduler([a, b])
+    s._booting = {a.id: 100.0, b.id: 100.0}
+    events = []
+    s._on_event = lambda kind, acc, text: events.append((kind, acc.id))
+    scans = []
+
+    def scan(ports=None, detail=None):
+        scans.append(ports)
+        return {7070: {"status": {"playerName": "Alpha", "loginState": "LOGGED_IN"}}}
+
+    monkeypatch.setattr(mon, "central_scan", scan)
+    monkeypatch.setattr(s, "desired", lambda now: {})
+    s.tick(110.0)
+    assert len(scans) == 1
+    assert list(s._booting) == [b.id]
+    assert events == [("login", a.id)]
+
+
+def test_tick_stops_expired_sessions_in_one_shutdown(monkeypatch):
+    import switcher as sw
+    a, b, c = _acc("Alpha"), _acc("Bravo"), _acc("Charlie")
+    s = _scheduler([a, b, c])
+    s._owned = {a.id: 100.0, b.id: 100.0, c.id: 500.0}
+    events = []
+    s._on_event = lambda kind, acc, text: events.append((kind, acc.id))
+    calls = []
+
+    def shutdown(accs, *args, **kw):
+        calls.append([x.id for x in accs])
+        return {"outcomes": {a.id: sw.STOPPED, b.id: sw.STUCK}, "elapsed_s": 0.0}
+
+    monkeypatch.setattr(sw, "is_running", lambda acc: True)
+    monkeypatch.setattr(sw, "shutdown", shutdown)
+    monkeypatch.setattr(mon, "central_scan", lambda ports=None, detail=None: {})
+    monkeypatch.setattr(s, "desired", lambda now: {c.id: 500.0})
+    s.tick(200.0)
+    assert calls == [[a.id, b.id]]
+    assert list(s._owned) == [c.id]
+    assert events == [("stop", a.id), ("error", b.id)]
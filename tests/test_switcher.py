@@ -0,0 +1,15 @@
+import switcher as sw
+
+
+def test_heap_from_args_units():
+    assert sw._heap_from_args(["-Xmx536870912"]) == 512        # no unit: bytes
+    assert sw._heap_from_args(["-Xmx1048576k"]) == 1024
+    assert sw._heap_from_args(["-Xmx768m"]) == 768
+    assert sw._heap_from_args(["-Xmx2G"]) == 2048
+    assert sw._heap_from_args(["-Xmx1t"]) == 1024 * 1024
+
+
+def test_heap_from_args_last_wins_and_bad_values():
+    assert sw._heap_from_args(["-Xmx1g", "-Xms512m", "-Xmx3g"]) == 3072
+    assert sw._heap_from_args(["-Xmxlots", "-Xms1g"]) == 0
+    assert sw._heap_from_args([]) == 0